@@ -133,6 +133,9 @@ def unregister():
 
     unregister_as_classes()
 
+    from .utils.osc_sender import OSCSender
+    OSCSender.stop()
+
 def unregister_as_classes():
     from .extendables.lighting_consoles import unregister as unregister_lighting_consoles
     unregister_lighting_consoles()
@@ -7,6 +7,8 @@ import bpy
 from ..space_common import draw_text_or_group_input
 from ..parameters import draw_parameters_mini
 from ..utils import get_orb_icon
+from ...maintenance.logging import LogBuffer, LOG_BUFFER_SIZE
+from ...maintenance.profiler import FrameProfiler
 
 DISASTER_THRESHOLD = 3
 
@@ -286,4 +288,38 @@ def draw_service_mode(self, context):
     col = layout.column(heading="Main")
     col.prop(scene, "print_event_manager")
     col.prop(scene, "print_orb")
-    col.prop(scene, "print_time")
\ No newline at end of file
+    col.prop(scene, "print_time")
+
+    # Log buffer
+    row = layout.row(align=True)
+    row.label(text=f"Recent log: {len(LogBuffer.entries)}/{LOG_BUFFER_SIZE}")
+    row.operator("alva_object.dump_log", text="Dump", icon='TEXT')
+    row.operator("alva_object.clear_log", text="", icon='TRASH')
+
+    # Profiler
+    col = layout.column(heading="Profiler")
+    col.prop(scene, "profile_frames")
+    draw_frame_profiler(layout)
+
+
+def draw_frame_profiler(layout):
+    stats = FrameProfiler.stats()
+    if not stats:
+        return
+
+    box = layout.box()
+    row = box.row()
+    for heading in ("Stage", "p50 ms", "p95 ms", "p99 ms"):
+        row.label(text=heading)
+
+    for name, row_stats in stats.items():
+        row = box.row()
+        row.label(text=name)
+        row.label(text=f"{row_stats['p50_ms']:.2f}")
+        row.label(text=f"{row_stats['p95_ms']:.2f}")
+        row.label(text=f"{row_stats['p99_ms']:.2f}")
+
+    row = box.row(align=True)
+    row.operator("alva_object.export_profile", text="CSV", icon='EXPORT').file_format = 'CSV'
+    row.operator("alva_object.export_profile", text="JSON", icon='EXPORT').file_format = 'JSON'
+    row.operator("alva_object.reset_profile", text="", icon='TRASH')
\ No newline at end of file
@@ -101,6 +101,10 @@ def draw_network(self, context, column):
         row.prop(scene.scene_props, "str_osc_ip_address", text="")
         row.prop(scene.scene_props, "int_osc_port", text=":")
         row.prop(scene.scene_props, "int_argument_size", text="x")
+
+        row = box.row()
+        row.enabled = not scene.scene_props.use_alva_core
+        row.prop(scene.scene_props, "osc_tcp_framing", text="TCP")
     
     # Video &
     elif vt == 'option_video' and not core:
@@ -11,6 +11,7 @@ from .influence import find_influencer_cpv
 from .mix import find_mixer_cpv
 from .stop import check_flags
 from ..maintenance.logging import alva_log
+from ..maintenance.profiler import FrameProfiler
 from .publish.update_others import UpdateOtherSelections
 
 '''
@@ -25,13 +26,17 @@ compared to one another for common simplification and harmonization to avoid spa
 messages and to batch commands together.
 '''
 
+CONTROLLER_TYPES = ("Influencer", "Key", "Brush", "Fixture", "Pan/Tilt Fixture", "Pan/Tilt", "group", "strip", "Stage Object", "mixer")
+PROFILER_STAGES = {controller_type: f"cpv_{controller_type}" for controller_type in CONTROLLER_TYPES}  # Built once, not every CPV
+
+
 def time_logger(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        alva_log("cpv_generator", f"CPV Initial: {args[0].property_name}, {args[0]}")
+        alva_log("cpv_generator", lambda: f"CPV Initial: {args[0].property_name}, {args[0]}")
         start = time.time()
         result = func(*args, **kwargs)
-        alva_log('time', f"TIME: cpv_generator took {time.time() - start:.4f} seconds")
+        alva_log('time', lambda: f"TIME: cpv_generator took {time.time() - start:.4f} seconds")
         return result
     return wrapper
 
@@ -63,7 +68,8 @@ class CPVGenerator:
     def execute(self):
         if self.should_stop: return
         UpdateOtherSelections(self.context, self.parent, self.property_name).execute()
-        self.cpv_functions[self.controller_type]()
+        with FrameProfiler.stage(PROFILER_STAGES[self.controller_type]):
+            self.cpv_functions[self.controller_type]()
 
 
 def test_cpv_generator(SENSITIVITY): # Return True for fail, False for pass
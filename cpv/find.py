@@ -85,14 +85,18 @@ class Find:
 
     def trigger_downstream_nodes(self, parent, attribute_name, new_value):
         """Receives a bpy object and returns nothing"""
-        for output_socket in parent.outputs:
-            if output_socket.bl_idname == 'LightingOutputType':
-                connected_nodes = FindConnectedNodes(output_socket, is_input=False).execute()
-                for connected_node in connected_nodes:
-                    if connected_node.bl_idname == "group_controller_type":
-                        setattr(connected_node, f"alva_{attribute_name}", getattr(parent, f"alva_{attribute_name}"))
-                    elif connected_node.bl_idname == "mixer_type":
-                        connected_node.mirror_upstream_group_controllers()
+        if not NodeGraphIndex.start_propagating():
+            return  # Already inside a downstream pass, which covers everything downstream of parent too
+
+        try:
+            output_sockets = [socket for socket in parent.outputs if socket.bl_idname == 'LightingOutputType']
+            for connected_node in NodeGraphIndex.find_downstream_in_order(output_sockets):
+                if connected_node.bl_idname == "group_controller_type":
+                    setattr(connected_node, f"alva_{attribute_name}", getattr(parent, f"alva_{attribute_name}"))
+                elif connected_node.bl_idname == "mixer_type":
+                    connected_node.mirror_upstream_group_controllers()
+        finally:
+            NodeGraphIndex.stop_propagating()
                         
         
     #-------------------------------------------------------------------------------------------------------------------------------------------
@@ -135,16 +139,19 @@ class Find:
     def find_nodes(scene):
         if not scene.scene_props.enable_nodes:
             return []
-        node_trees = set()
         nodes = []
+        for node_tree in Find.find_node_trees():
+            for node in node_tree.nodes:
+                nodes.append(node)
+        return nodes
+
+    def find_node_trees():
+        node_trees = set()
         if bpy.context.scene.world and bpy.context.scene.world.node_tree:
             node_trees.add(bpy.context.scene.world.node_tree)
         for node_tree in bpy.data.node_groups:
             node_trees.add(node_tree)
-        for node_tree in node_trees:
-            for node in node_tree.nodes:
-                nodes.append(node)
-        return nodes
+        return node_trees
     
     def find_parameter_popup_draw_func(parameter_as_idname):
         parameter_class = find_extendables_class('parameters', parameter_as_idname)
@@ -153,71 +160,292 @@ class Find:
             return parameter_class.draw_popup
     
 
-class FindConnectedNodes:
-    def __init__(self, original_socket, is_input):
-        self.original_socket = original_socket
-        self.socket_attr = 'from_socket' if is_input else 'to_socket'
-        self.LINKABLE_NODE_TYPES = ['group_controller_type', 'mixer_type']
-        self.is_input = is_input
-        self.connected_nodes = []
-
-    def execute(self):
-        start_time = time.time()
-        self.socket_to_links(self.original_socket)
-        alva_log('time', f"TIME: FindConnectedNodes took {time.time() - start_time} seconds\n")
-        return self.connected_nodes
+DYNAMIC_IDENTITIES = ["Influencer", "Brush", "Key"]
+
+
+class ControllerRegistry:
+    '''
+    Every frame change outside of playback, the event manager needs the list of every controller
+    (objects, animation strips, and nodes) to see which of their animated properties changed.
+    Find.find_controllers builds that list by walking every object in the scene, every strip, and
+    every node in every node tree. Scrubbing a 2,000 object scene did that on every single frame,
+    even though the list of controllers almost never changes while you scrub.
+
+    So we walk the scene once and keep the answer:
+
+        _controllers:         objects + animation strips + nodes, same as Find.find_controllers
+        _mixers_and_motors:   the mixer and motor nodes out of those
+        _dynamic_candidates:  objects that might need trigger_special_update every frame
+                              (influencers, brushes, keys, and anything with a SEM channel)
+
+    Returning the exact same list every time also lets AnimatedPropertyIndex see that nothing
+    changed with an "is" check instead of comparing 2,000 items.
+
+    Only a few things can change these lists, and we throw them away (invalidate) for each:
+
+        - Objects added or removed: the event manager invalidates when the depsgraph says a
+          collection changed.
+        - Strips added, removed, or turned into animation strips: the motif type updater
+          invalidates, and so does the event manager when StripIndex.invalidate_if_strips_changed()
+          finds the strips changed on a scene update. Other scene updates (which happen for almost
+          any edit) leave the registry alone.
+        - Nodes added or removed: NodeBase.update() and NodeBase.free() invalidate, and so does
+          the event manager when the depsgraph says a node tree changed.
+        - An object becomes or stops being an influencer, brush, or key (controller_ids_updater),
+          or gets a SEM channel (sem_updater).
+        - The enable_objects/strips/nodes toggles change, or a different scene asks.
+        - Undo, redo, and file load.
+
+    Those explicit invalidations are what keep us safe. Nodes and strips aren't IDs, so holding
+    on to a deleted one and touching it later can crash Blender. The object, strip, and node
+    counts are also checked on every call, but only as a backup: deleting one node and adding
+    another leaves the count the same.
+
+    Whether a dynamic candidate is actually animated is still checked every frame, since
+    keyframes can be added at any time and that list is short.
+
+    Objects with drivers are kept in DriverIndex (utils/event_utils.py) instead.
+    '''
+    _scene_name = None
+    _signature = None
+    _is_valid = False
+    _controllers = []
+    _mixers_and_motors = []
+    _dynamic_candidates = []
+
+    @classmethod
+    def find_controllers(cls, scene):
+        '''Same as Find.find_controllers, without walking the scene every time. Don't modify the lists it returns.'''
+        cls._ensure_valid(scene)
+        return cls._controllers, cls._mixers_and_motors
+
+    @classmethod
+    def find_dynamic_objects(cls, scene):
+        '''Animated influencers, brushes, keys, and SEM objects.'''
+        cls._ensure_valid(scene)
+        return [obj for obj in cls._dynamic_candidates if obj.animation_data]
+
+
+    @classmethod
+    def _ensure_valid(cls, scene):
+        signature = cls._find_signature(scene)
+        if not cls._is_valid or cls._scene_name != scene.name or cls._signature != signature:
+            cls.rebuild(scene, signature)
 
-    def socket_to_links(self, socket, socket_index=None):
-        if not socket.links:
-            return 
-        
-        for i, link in enumerate(socket.links):
-            node = self.node_from_link(link)
+    @staticmethod
+    def _find_signature(scene):
+        '''Cheap counts, as a backup to the explicit invalidations. Equal counts don't mean nothing changed.'''
+        scene_props = scene.scene_props
+        sequence_editor = getattr(scene, "sequence_editor", None)
+        return (
+            scene_props.enable_objects,
+            scene_props.enable_strips,
+            scene_props.enable_nodes,
+            len(scene.objects),
+            len(sequence_editor.sequences_all) if sequence_editor else 0,
+            sum(len(node_tree.nodes) for node_tree in Find.find_node_trees())
+        )
+
+    @classmethod
+    def rebuild(cls, scene, signature=None):
+        cls._controllers, cls._mixers_and_motors = Find.find_controllers(scene)
+        cls._dynamic_candidates = [
+            obj for obj in scene.objects
+            if obj.object_identities_enum in DYNAMIC_IDENTITIES or obj.int_alva_sem != 0
+        ]
+        cls._scene_name = scene.name
+        cls._signature = signature if signature is not None else cls._find_signature(scene)
+        cls._is_valid = True
+
+    @classmethod
+    def invalidate(cls):
+        cls._is_valid = False
+        cls._controllers = []
+        cls._mixers_and_motors = []
+        cls._dynamic_candidates = []
+
+
+LINKABLE_NODE_TYPES = ['group_controller_type', 'mixer_type']
+
+
+class NodeGraphIndex:
+    '''
+    Group controllers and mixers pass things to each other over node links. Every time you move a
+    slider on a group controller, we need to know every controller and mixer downstream of it, and
+    mixers need to know every group controller upstream of them. We used to find those by walking
+    the links one by one, every time, checking "have I seen this node yet?" against a list (which
+    gets slower the more nodes you've seen), and digging through node groups to find their Group
+    Input node. On big controller trees, every slider move re-walked the whole graph.
+
+    But the links only change when someone connects or disconnects something, so we remember the
+    walk instead:
+
+        _neighbors:  {(socket, is_input): [nodes linked directly to it]}
+                     Node groups are flattened: a link into a group node is followed to the same
+                     socket on the group's Group Input (or Group Output, going upstream), and on
+                     to whatever is connected inside. Nested groups work the same way.
+
+        _connected:  {(socket, is_input): [every controller and mixer reachable from it]}
+                     Same order as the old walk. Other nodes (like reroutes) are passed through
+                     but not listed, and each node is only visited once, so loops can't make
+                     the walk go forever.
+
+        _rank:       {node: position in topological order}
+                     Topological order means every node comes after everything upstream of it.
+                     When a change goes downstream, we update nodes in this order, so a mixer
+                     mirrors its group controllers only after all of them have the new value,
+                     and everything downstream gets updated in one pass.
+
+    While a change is being passed downstream, any nested trigger_downstream_nodes (from the
+    updaters of the nodes we're updating) is skipped, since the outer pass already covers
+    everything downstream of them.
+
+    The whole index is thrown away when a lighting node sees its tree's links or nodes change
+    (NodeBase.update) and on undo, redo, and file load. As a backup, it is also rebuilt if the
+    number of links in any node tree changes.
+    '''
+    _neighbors = {}
+    _connected = {}
+    _rank = None
+    _link_counts = None
+    _is_propagating = False
+
+    @classmethod
+    def find_connected_nodes(cls, socket, is_input):
+        '''Every group controller and mixer reachable from socket, upstream if is_input, else downstream.'''
+        cls._ensure_valid()
+        key = (socket, is_input)
+        if key not in cls._connected:
+            connected_nodes = []
+            cls._visit(socket, is_input, set(), connected_nodes)
+            cls._connected[key] = connected_nodes
+        return list(cls._connected[key])
+
+    @classmethod
+    def find_downstream_in_order(cls, sockets):
+        '''Everything downstream of any of sockets, once each, in topological order.'''
+        downstream = {}
+        for socket in sockets:
+            downstream.update(dict.fromkeys(cls.find_connected_nodes(socket, is_input=False)))
+        rank = cls._find_rank()
+        return sorted(downstream, key=lambda node: rank.get(node, len(rank)))
+
+    @classmethod
+    def _visit(cls, socket, is_input, seen, connected_nodes):
+        for node in cls._find_neighbors(socket, is_input):
+            if node in seen:
+                continue
+            seen.add(node)
+            if node.bl_idname in LINKABLE_NODE_TYPES:
+                connected_nodes.append(node)
+            for next_socket in node.inputs if is_input else node.outputs:
+                cls._visit(next_socket, is_input, seen, connected_nodes)
+
+    @classmethod
+    def _find_neighbors(cls, socket, is_input):
+        key = (socket, is_input)
+        if key in cls._neighbors:
+            return cls._neighbors[key]
+
+        cls._neighbors[key] = []  # In case a group links back into itself
+        neighbors = []
+        for link in socket.links:
+            connected_socket = link.from_socket if is_input else link.to_socket
+            connected_node = connected_socket.node
 
-            if node:
-                self.connected_nodes.append(node)
-                self.process_downstream_socket_recursive(node)
+            if connected_node.bl_idname == 'ShaderNodeGroup':
+                internal_socket = NodeGraphIndex._find_group_socket(connected_node, connected_socket, is_input)
+                if internal_socket is not None:
+                    neighbors.extend(cls._find_neighbors(internal_socket, is_input))
+            else:
+                neighbors.append(connected_node)
 
-    def node_from_link(self, link):
-        connected_socket = getattr(link, self.socket_attr)
-        connected_node = connected_socket.node
+        cls._neighbors[key] = neighbors
+        return neighbors
 
-        if not self.validate_node(connected_node):
-            if connected_node.bl_idname == 'ShaderNodeGroup':
-                socket_list = connected_node.outputs if self.is_input else connected_node.inputs
-                socket_index = self.find_socket_index(connected_socket, socket_list)
-                self.process_group_node(connected_node, socket_index)
-                return
-        
-        return connected_node
-    
-    def find_socket_index(self, target_socket, sockets_list):
-        """Find the index of the target socket in its node's inputs or outputs."""
-        for i, socket in enumerate(sockets_list):
-            if socket == target_socket:
-                return i
-        raise ValueError(f"Socket {target_socket.name} not found in node {target_socket.node.name}")
-        
-    def validate_node(self, node):
-        if node in self.connected_nodes:
-            return False
-        
-        if str(node.bl_idname) not in self.LINKABLE_NODE_TYPES:
+    @staticmethod
+    def _find_group_socket(group_node, group_socket, is_input):
+        '''The socket inside the group that matches group_socket on the outside.'''
+        if not group_node.node_tree:
+            return None
+        outer_sockets = group_node.outputs if is_input else group_node.inputs
+        boundary_type = 'GROUP_OUTPUT' if is_input else 'GROUP_INPUT'
+        boundary_node = next((node for node in group_node.node_tree.nodes if node.type == boundary_type), None)
+        if not boundary_node:
+            return None
+
+        socket_index = next((i for i, socket in enumerate(outer_sockets) if socket == group_socket), None)
+        inner_sockets = boundary_node.inputs if is_input else boundary_node.outputs
+        if socket_index is None or socket_index >= len(inner_sockets):
+            return None
+        return inner_sockets[socket_index]
+
+    @classmethod
+    def _find_rank(cls):
+        '''Kahn's algorithm over every node in every tree, with groups flattened. Nodes caught in a loop go last.'''
+        if cls._rank is not None:
+            return cls._rank
+
+        nodes = [node for node_tree in Find.find_node_trees() for node in node_tree.nodes if node.bl_idname != 'ShaderNodeGroup']
+        downstream = {
+            node: list(dict.fromkeys(
+                neighbor for socket in node.outputs for neighbor in cls._find_neighbors(socket, is_input=False)
+            ))
+            for node in nodes
+        }
+        upstream_counts = dict.fromkeys(downstream, 0)
+        for neighbors in downstream.values():
+            for neighbor in neighbors:
+                upstream_counts[neighbor] = upstream_counts.get(neighbor, 0) + 1
+
+        order = [node for node, count in upstream_counts.items() if count == 0]
+        for node in order:  # order grows while we walk it
+            for neighbor in downstream.get(node, ()):
+                upstream_counts[neighbor] -= 1
+                if upstream_counts[neighbor] == 0:
+                    order.append(neighbor)
+
+        ranked = set(order)
+        order.extend(node for node in upstream_counts if node not in ranked)
+        cls._rank = {node: rank for rank, node in enumerate(order)}
+        return cls._rank
+
+
+    @classmethod
+    def start_propagating(cls):
+        '''Returns False if a downstream pass is already running.'''
+        if cls._is_propagating:
             return False
-        
+        cls._is_propagating = True
         return True
-    
-    def process_downstream_socket_recursive(self, node, node_group=False):
-        for next_socket in node.inputs if self.is_input else node.outputs:
-            self.socket_to_links(next_socket)
 
-    def process_group_node(self, group_node, socket_index):
-        group_node_tree = group_node.node_tree
-        group_input_node = next((n for n in group_node_tree.nodes if n.type == 'GROUP_INPUT'), None)
+    @classmethod
+    def stop_propagating(cls):
+        cls._is_propagating = False
 
-        if not group_input_node:
-            return
-        
-        internal_sockets = group_input_node.inputs if self.is_input else group_input_node.outputs
-        internal_socket = internal_sockets[socket_index]
-        self.socket_to_links(internal_socket)
\ No newline at end of file
+
+    @classmethod
+    def _ensure_valid(cls):
+        link_counts = tuple(len(node_tree.links) for node_tree in Find.find_node_trees())
+        if cls._link_counts != link_counts:
+            cls.invalidate()
+            cls._link_counts = link_counts
+
+    @classmethod
+    def invalidate(cls):
+        cls._neighbors = {}
+        cls._connected = {}
+        cls._rank = None
+        cls._link_counts = None
+
+
+class FindConnectedNodes:
+    def __init__(self, original_socket, is_input):
+        self.original_socket = original_socket
+        self.is_input = is_input
+
+    def execute(self):
+        start_time = time.time()
+        connected_nodes = NodeGraphIndex.find_connected_nodes(self.original_socket, self.is_input)
+        alva_log('time', lambda: f"TIME: FindConnectedNodes took {time.time() - start_time} seconds\n")
+        return connected_nodes
@@ -2,22 +2,34 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from ..utils.cpv_utils import simplify_channels_list
+import numpy as np   # type: ignore
 
-ARGS_BEFORE_CPV = 2
+from ..utils.cpv_utils import simplify_channels_list
 
 # Alva Logging for this script is actually done from the event_manager.py script.
 
+'''
+The harmonizer receives a ChangeRequestTable (see publish/request_buffer.py), which holds all of
+a frame's CPV requests as NumPy columns instead of a list of tuples. That lets each step below be
+a handful of whole-array operations instead of a Python loop over every request:
+
+    remove_duplicates:         Sorted unique over (channel, parameter, value) rows.
+    highest_takes_precedence:  Sort by (channel, parameter, value), keep the last row per group.
+    democracy:                 Grouped mean of values over (channel, parameter).
+    simplify:                  Group channels that share everything else, then "1 Thru 3 + 10".
+
+Every step keeps requests in the order they first showed up, same as the old dict-based version.
+'''
+
 
 class Harmonizer:
     def remove_duplicates(change_requests):
-        seen = set()
-        result = []
-        for item in change_requests:
-            if item not in seen:
-                seen.add(item[ARGS_BEFORE_CPV:])
-                result.append(item)
-        return result
+        if len(change_requests) == 0:
+            return change_requests
+        
+        keys = change_requests.group_keys('channels', 'property_ids', 'values', 'widths')
+        _, first_rows = np.unique(keys, axis=0, return_index=True)
+        return change_requests.take(np.sort(first_rows))
     
     
     def democracy(no_duplicates):
@@ -26,17 +38,29 @@ class Harmonizer:
 
     def highest_takes_precedence(no_duplicates):
         '''Standard HTP (Highest Takes Precedence) protocol mode'''
-        request_dict = {}
+        if len(no_duplicates) == 0:
+            return no_duplicates
+
+        rows = np.arange(len(no_duplicates))
+        channels = no_duplicates.channels
+        property_ids = no_duplicates.property_ids
+        values = no_duplicates.values
 
-        for generator, Parameter, c, p, v in no_duplicates:
-            key = (c, p)  # Key based on channel and parameter only
-            if key in request_dict:
-                if v > request_dict[key][4]:  # Compare the value
-                    request_dict[key] = (generator, Parameter, c, p, v)
-            else:
-                request_dict[key] = (generator, Parameter, c, p, v)
+        # np.lexsort sorts by the LAST key first. Ties on value go to whoever asked first.
+        value_keys = [values[:, i] for i in reversed(range(values.shape[1]))]
+        order = np.lexsort([-rows] + value_keys + [property_ids, channels])
 
-        no_conflicts = list(request_dict.values())
+        sorted_channels = channels[order]
+        sorted_property_ids = property_ids[order]
+        is_new_group = np.ones(len(order), dtype=bool)
+        is_new_group[1:] = (sorted_channels[1:] != sorted_channels[:-1]) | (sorted_property_ids[1:] != sorted_property_ids[:-1])
+
+        group_starts = np.flatnonzero(is_new_group)
+        group_ends = np.append(group_starts[1:], len(order)) - 1
+
+        winners = order[group_ends]
+        first_appearances = np.minimum.reduceat(order, group_starts)
+        no_conflicts = no_duplicates.take(winners[np.argsort(first_appearances)])
         
         return no_conflicts
 
@@ -45,19 +69,23 @@ class Harmonizer:
         ''' Finds any instances where everything but channel number is the same 
             between multiple requests and combines them using "thru" and "+".
         '''
-        simplified_dict = {}
+        if len(no_conflicts) == 0:
+            return []
 
-        for generator, Parameter, c, p, v in no_conflicts:
-            key = (generator, Parameter, p, v)  # Include generator and Parameter in the key
-            if key in simplified_dict:
-                simplified_dict[key][2].append(int(c))  # Store channels as integers for easier sorting
-            else:
-                simplified_dict[key] = (generator, Parameter, [int(c)], p, v)
+        keys = no_conflicts.group_keys('generator_ids', 'parameter_ids', 'property_ids', 'values', 'widths')
+        _, first_rows, group_ids = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        channel_groups = _split_by_group(no_conflicts.channels, group_ids.reshape(-1))
 
         simplified = []
-        for (generator, Parameter, p, v), (generator, Parameter, channels, p, v) in simplified_dict.items():
-            combined_channels_str = simplify_channels_list(channels)
-            simplified.append((generator, Parameter, combined_channels_str, p, v))
+        for group_id in np.argsort(first_rows):
+            row = first_rows[group_id]
+            simplified.append((
+                no_conflicts.generators[no_conflicts.generator_ids[row]],
+                no_conflicts.parameters[no_conflicts.parameter_ids[row]],
+                simplify_channels_list(channel_groups[group_id].tolist()),
+                no_conflicts.property_names[no_conflicts.property_ids[row]],
+                no_conflicts.raw_values[row]
+            ))
 
         return simplified
     
@@ -66,91 +94,47 @@ class Democracy:
     '''Democratic mode where each request has equal influence'''
     def __init__(self, no_duplicates):
         self.no_duplicates = no_duplicates
-        self.request_dict = {}
-        self.no_conflicts = []  
+        self.first_rows = None
+        self.group_ids = None
+        self.averaged_values = None
 
 
     def execute(self):
-        '''Processes all requests and returns an averaged, conflict-free list of tuples.'''
-        self._populate_request_dict()
-        self._generate_no_conflicts_list()
-        return self.no_conflicts
-
-    def _populate_request_dict(self):
-        '''Populates the request dictionary with summed values and counts for averaging.'''
-        for generator, parameter, channel, parameter_name, value in self.no_duplicates:
-            request_key = (channel, parameter_name)
-            
-            if self._is_new_request(request_key):
-                self._initialize_request_entry(request_key, generator, parameter)
-            
-            self._increment_request_count(request_key)
-            self._update_request_sum(request_key, value)
-
-    def _is_new_request(self, request_key):
-        '''Checks if the request key is not yet in the dictionary.'''
-        return request_key not in self.request_dict
-    
-    def _initialize_request_entry(self, request_key, generator, parameter):
-        '''Initializes a new entry in the request dictionary.'''
-        self.request_dict[request_key] = {
-            'count': 0,
-            'sum': 0,
-            'generator': generator,
-            'parameter': parameter
-        }
-
-    def _increment_request_count(self, request_key):
-        '''Increments the count of requests for the given key.'''
-        self.request_dict[request_key]['count'] += 1
-
-    def _update_request_sum(self, request_key, value):
-        '''Updates the accumulated value (sum) for the given key.'''
-        if self._is_color_value(value):
-            self._ensure_color_sum_initialized(request_key, value)
-            self._add_color_value_to_sum(request_key, value)
-        else:
-            self._add_numeric_value_to_sum(request_key, value)
-
-    def _ensure_color_sum_initialized(self, request_key, value):
-        '''Ensures the sum entry for colors is a tuple of zeros if not already initialized.'''
-        if not isinstance(self.request_dict[request_key]['sum'], tuple):
-            self.request_dict[request_key]['sum'] = (0,) * len(value)
-
-    def _add_color_value_to_sum(self, request_key, value):
-        '''Adds a color tuple to the current accumulated sum.'''
-        current_sum = self.request_dict[request_key]['sum']
-        self.request_dict[request_key]['sum'] = tuple(
-            channel_sum + new_value for channel_sum, new_value in zip(current_sum, value)
-        )
-
-    def _add_numeric_value_to_sum(self, request_key, value):
-        '''Adds a numeric value to the current accumulated sum.'''
-        self.request_dict[request_key]['sum'] += value
-
-    def _is_color_value(self, value):
-        '''Checks if the provided value is a color (tuple).'''
-        return isinstance(value, tuple)
-
-    def _generate_no_conflicts_list(self):
-        '''Creates the final list of averaged requests.'''
-        for (channel, parameter_name), request_data in self.request_dict.items():
-            averaged_value = self._calculate_average_value(
-                request_data['sum'], request_data['count']
-            )
-            self.no_conflicts.append((
-                request_data['generator'], 
-                request_data['parameter'], 
-                channel, 
-                parameter_name, 
-                averaged_value
-            ))
-
-    def _calculate_average_value(self, accumulated_value, count):
-        '''Calculates the average value from the accumulated sum.'''
-        if self._is_color_value(accumulated_value):
-            return tuple(channel_sum / count for channel_sum in accumulated_value)
-        return accumulated_value / count
+        '''Processes all requests and returns an averaged, conflict-free table.'''
+        if len(self.no_duplicates) == 0:
+            return self.no_duplicates
+        
+        self._find_groups()
+        self._average_values()
+        return self._generate_no_conflicts_table()
+
+    def _find_groups(self):
+        '''Every (channel, parameter) pair is one vote count.'''
+        keys = self.no_duplicates.group_keys('channels', 'property_ids')
+        _, self.first_rows, group_ids = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        self.group_ids = group_ids.reshape(-1)
+
+    def _average_values(self):
+        '''Grouped mean. Colors are averaged slot by slot since they are just more columns.'''
+        order = np.argsort(self.group_ids, kind='stable')
+        group_starts = np.flatnonzero(np.r_[True, self.group_ids[order][1:] != self.group_ids[order][:-1]])
+        sums = np.add.reduceat(self.no_duplicates.values[order], group_starts, axis=0)
+        counts = np.diff(np.append(group_starts, len(order)))
+        self.averaged_values = sums / counts[:, np.newaxis]
+
+    def _generate_no_conflicts_table(self):
+        '''The first request in each group speaks for the group, carrying the averaged value.'''
+        order = np.argsort(self.first_rows)
+        representatives = self.no_duplicates.take(self.first_rows[order])
+        return representatives.with_values(self.averaged_values[order])
+
+
+def _split_by_group(column, group_ids):
+    '''Returns one array per group id (0, 1, 2...), holding that group's entries in original order.'''
+    order = np.argsort(group_ids, kind='stable')
+    sorted_group_ids = group_ids[order]
+    group_starts = np.flatnonzero(sorted_group_ids[1:] != sorted_group_ids[:-1]) + 1
+    return np.split(column[order], group_starts)
     
 
 def test_harmonizer(SENSITIVITY): # Return True for fail, False for pass
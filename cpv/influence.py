@@ -3,12 +3,16 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import bpy
-from mathutils import Vector, kdtree
+from mathutils import Vector
 import time
 import math
+import numpy as np   # type: ignore
 
 from .publish.publish import Publish, CPV
+from .split_color import ColorSplitter
 from ..maintenance.logging import alva_log
+from ..utils.cpv_utils import FixtureSpatialIndex
+from .influence_memory import InfluencerMemory
 
 PARAMETER_NOT_FOUND_DEFAULT = 'alva_intensity'
 WHITE_COLOR = (1, 1, 1)
@@ -58,6 +62,7 @@ class InfluenceCPV:
         self.property_name = Generator.property_name
         self.controller_type = Generator.controller_type
         self.parameter_property_group = self._get_property_group_by_parameter(self.parent, Generator.property_name)
+        self.memory = InfluencerMemory.get(self.parent, Generator.property_name, self.parameter_property_group)
         self._is_releasing = self._is_releasing_channels()
 
     def _make_parent_real(self):
@@ -97,6 +102,7 @@ class InfluenceCPV:
         Initialize(self).execute(new_channels, new_channels_values)
         Maintain(self).execute(maintain_channels, values)
         Release(self).execute(release_channels)
+        self.memory.flush()  # Now, not later, so the undo step for this move includes it. See influence_memory.py.
         if DEBUG: alva_log('time', f"TIME: find_influencer_cpv took {time.time() - start} seconds")
 
 
@@ -143,18 +149,21 @@ class SetGroups:
     def execute(self):
         start = time.time()
         _current_channels, values = self._find_current_channels()
-        _stored_channels = [chan.channel_object for chan in self.influencer.parameter_property_group]
+        memory = self.influencer.memory
+        _stored_channels = memory.channel_objects()
+        _current_lookup = set(_current_channels)
 
         if DEBUG: alva_log('time', f"TIME: find_influencer_current_channels took {time.time() - start} seconds")
         if DEBUG: alva_log("influence", f"{RED}SetGroups._execute | Current channels: {[obj.name for obj in _current_channels]}\nSetGroups._execute | Stored Channels: {[obj.name for obj in _stored_channels]}")
 
-        new_channels = [chan for chan in _current_channels if chan not in _stored_channels]
-        release_channels = [chan for chan in _stored_channels if chan not in _current_channels]
-        maintain_channels = [chan for chan in _current_channels if chan in _stored_channels] if self.is_maintaining else []
+        new_channels = [chan for chan in _current_channels if chan not in memory]
+        release_channels = [chan for chan in _stored_channels if chan not in _current_lookup]
+        maintain_channels = [chan for chan in _current_channels if chan in memory] if self.is_maintaining else []
 
         # Align values with new_channels
         if self.influencer.controller_type == "Key":
-            new_channels_values = [values[_current_channels.index(chan)] for chan in new_channels]
+            values_by_channel = dict(zip(_current_channels, values))
+            new_channels_values = [values_by_channel[chan] for chan in new_channels]
         else: 
             new_channels_values = None
 
@@ -180,27 +189,17 @@ class SetGroups:
         return None
         
     def _harmonize_influence_field(self, light_objects, influencers, strengths):
-        harmonized_channels = []
-        harmonized_values = []
-
-        light_influence_map = {}
-
-        # Aggregate influences per light
-        for light, influencer, strength in zip(light_objects, influencers, strengths):
-            if light not in light_influence_map:
-                light_influence_map[light] = []
-            light_influence_map[light].append((influencer, strength))
-
-        # Blend influences for each light
-        for light, influence_data in light_influence_map.items():
-            blended_value = sum(
-                data[1] * getattr(data[0], f"alva_{self.influencer.property_name}", 0)
-                for data in influence_data
-            )
-            harmonized_channels.append(light)
-            harmonized_values.append(blended_value)
+        '''Each light's value is every Key's value weighted by how strongly that Key pulls on the light.'''
+        key_values = np.array(
+            [getattr(influencer, f"alva_{self.influencer.property_name}", 0) for influencer in influencers],
+            dtype=np.float64
+        )
+        blended_values = strengths @ key_values
+
+        harmonized_channels = list(light_objects)
+        harmonized_values = [tuple(value) for value in blended_values.tolist()] if blended_values.ndim == 2 else blended_values.tolist()
 
-        if DEBUG: alva_log("influence", f"{GREEN}SetGroups._harmonize_influence_field | Harmonized channels: {[chan.name for chan in harmonized_channels]}\nSetGroups._harmonize_influence_field | Harmonized values: {[round(value, 2) for value in harmonized_values]}")
+        if DEBUG: alva_log("influence", f"{GREEN}SetGroups._harmonize_influence_field | Harmonized channels: {[chan.name for chan in harmonized_channels]}\nSetGroups._harmonize_influence_field | Harmonized values: {np.round(blended_values, 2).tolist()}")
 
         return harmonized_channels, harmonized_values
 
@@ -237,15 +236,17 @@ class Initialize:
 
     def execute(self, new_channels, values):
         if values: # 3D gradient mode
-            list(map(self._initiate_channel, new_channels, values))
+            splits = split_gradient_colors(self.influencer, self.property_name, new_channels, values)
+            list(map(self._initiate_channel, new_channels, values, splits))
         else:
             list(map(self._initiate_channel, new_channels))
 
-    def _initiate_channel(self, channel_object, value=None):
+    def _initiate_channel(self, channel_object, value=None, split=None):
         channel_number = self._get_initiate_channel_number(channel_object)
         value = self._determine_initiate_value(value)
-        Publish(self.influencer, self.influencer.Parameter, channel_number, self.property_name, value, sender=CPV).execute()
-        self._set_memory_item(self.influencer.parameter_property_group, channel_object, value)
+        property_name, publish_value = split if split else (self.property_name, value)
+        Publish(self.influencer, self.influencer.Parameter, channel_number, property_name, publish_value, sender=CPV).execute()
+        self.influencer.memory.set(channel_object, value)
         if DEBUG: alva_log("influence", f"{BLUE}Initialize._initiate_channel | Channel {channel_number} | Value: {round(value, 2)}, Property name: {self.property_name}")
 
     def _get_initiate_channel_number(self, channel_object):
@@ -254,13 +255,6 @@ class Initialize:
     def _determine_initiate_value(self, input_value=None):
         return input_value if input_value else getattr(self.influencer.parent, f"alva_{self.influencer.property_name}")
 
-    def _set_memory_item(self, collection, channel_object, value):
-        new_channel = collection.add()
-        new_channel.channel_object = channel_object
-        if self.influencer.property_name == "color":
-            new_channel.current_influence_color = value
-        else:
-            new_channel.current_influence = value
 
 
 class Maintain:
@@ -314,14 +308,14 @@ class Maintain:
 
     def execute(self, maintain_channels, values):
         if values:
-            list(map(self._maintain_channel, maintain_channels, values))
+            splits = split_gradient_colors(self.influencer, self.influencer.property_name, maintain_channels, values)
+            list(map(self._maintain_channel, maintain_channels, values, splits))
         else:
             list(map(self._maintain_channel, maintain_channels))
 
-    def _maintain_channel(self, channel_object, value=None):
+    def _maintain_channel(self, channel_object, value=None, split=None):
         channel_number = self._get_maintain_channel_number(channel_object)
-        memory_item = self._get_memory_item(channel_object)
-        stored_value = self._determine_stored_value(memory_item)
+        stored_value = self._determine_stored_value(channel_object)
         current_value = self._determine_current_value(value)
         needed_change, is_positive = self._determine_needed_change(stored_value, current_value)
         new_memory_value = self._determine_new_memory_value(current_value)
@@ -330,25 +324,15 @@ class Maintain:
         if DEBUG: alva_log("influence", f"{BLUE}Maintain._maintain_channel | Channel {channel_number} | (Stored value: {round(stored_value, 2)}, Current value: {round(current_value, 2)}, Needed change: {round(needed_change, 2)}, is_positive: {GREEN if is_positive else RED}{is_positive}{BLUE}, New memory value: {round(new_memory_value, 2)}, Property name: {self.property_name}, Must proceed: {GREEN if must_proceed else RED}{must_proceed}{RESET})")
 
         if must_proceed:
-            Publish(self.influencer, self.influencer.Parameter, channel_number, self.property_name, needed_change, sender=CPV).execute()
-            self._update_memory_item(memory_item, new_memory_value)
-
-    def _get_memory_item(self, channel_object):
-        return next(
-            (item for item in self.influencer.parameter_property_group if item.channel_object == channel_object),
-            None
-        )
+            property_name, publish_value = split if split else (self.property_name, needed_change)
+            Publish(self.influencer, self.influencer.Parameter, channel_number, property_name, publish_value, sender=CPV).execute()
+            self.influencer.memory.set(channel_object, new_memory_value)
 
     def _get_maintain_channel_number(self, channel_object):
         return channel_object.list_group_channels[0].chan
     
-    def _determine_stored_value(self, memory_item):
-        prop = "current_influence" if self.influencer.property_name != "color" else "current_influence_color"
-        value = (getattr(memory_item, prop))
-        if self.influencer.property_name == "color":
-            return value
-        else:
-            return value
+    def _determine_stored_value(self, channel_object):
+        return self.influencer.memory.get(channel_object)
     
     def _determine_current_value(self, input_value=None):
         return input_value if input_value else getattr(self.influencer.parent, f"alva_{self.influencer.property_name}")
@@ -377,25 +361,14 @@ class Maintain:
         else:
             self.property_name = influencer.property_name
 
-    def _update_memory_item(self, memory_item, new_value):
-        collection = self.influencer.parameter_property_group
-        index = self._find_index(collection, memory_item)
 
-        if index is not None:
-            item = collection[index]
-            if self.influencer.property_name == "color":
-                item.current_influence_color = new_value
-            else:
-                item.current_influence = new_value
-
-    @staticmethod
-    def _find_index(collection, memory_item):
-        index = None
-        for i, item in enumerate(collection):
-            if item == memory_item:
-                index = i
-                break
-        return index
+def split_gradient_colors(influencer, property_name, channel_objects, values):
+    '''Key gradients give every light its own color, so we split them all in one batch (see split_color.py).
+       Returns one (property name, split value) per light, or Nones when there's nothing to split.'''
+    if property_name != "color":
+        return [None] * len(channel_objects)
+    channels = [channel_object.list_group_channels[0].chan for channel_object in channel_objects]
+    return ColorSplitter.split_many(influencer, property_name, channels, values[:len(channels)])
 
 
 class Release:
@@ -429,54 +402,31 @@ class Release:
 
     def _release_channel_from_all(self, channel_object):
         channel_number = self._get_release_channel_number(channel_object)
-        memory_item = self._get_memory_item(channel_object)
-        value = self._determine_release_value(memory_item)
+        value = self._determine_release_value(channel_object)
         Publish(self.influencer, self.influencer.Parameter, channel_number, self._property_name, value, sender=CPV).execute()
-        self._remove_memory_item(memory_item)
+        self.influencer.memory.remove(channel_object)
 
     def _release_channel_from_memory(self, channel_object):  # So that brushes can target the same obj many times
-        memory_item = self._get_memory_item(channel_object)
-        self._remove_memory_item(memory_item)
-
-    def _get_memory_item(self, channel_object):
-        return next(
-            (item for item in self.influencer.parameter_property_group if item.channel_object == channel_object),
-            None
-        )
+        self.influencer.memory.remove(channel_object)
 
     def _get_release_channel_number(self, channel_object):
         return channel_object.list_group_channels[0].chan
     
-    def _determine_release_value(self, memory_item):
+    def _determine_release_value(self, channel_object):
         if self.influencer.property_name != "color":
-            return memory_item.current_influence
+            return self.influencer.memory.get(channel_object)
         else:
             return self.influencer.parent.alva_color_restore
 
-    def _remove_memory_item(self, memory_item):
-        collection = self.influencer.parameter_property_group
-        index = self._find_index(collection, memory_item)
-
-        if index is not None:
-            collection.remove(index)
-
-    @staticmethod
-    def _find_index(collection, memory_item):
-        index = None
-        for i, item in enumerate(collection):
-            if item == memory_item:
-                index = i
-                break
-        return index
-
 
 class FindObjectsInside:
+    '''Finds the fixtures inside the influencer's bounding box. The heavy lifting (and the KD-tree) 
+       lives in FixtureSpatialIndex, which is shared by every influencer.'''
     def __init__(self, parent):
         self.parent = parent
         self.bbox_corners = self._get_bbox_corners()
         self.bbox_min = self._get_bbox_min()
         self.bbox_max = self._get_bbox_max()
-        self.kd_tree, self.object_map = self._build_kd_tree()
 
     def _get_bbox_corners(self):
         return [Vector(corner) for corner in self.parent.bound_box]
@@ -491,93 +441,61 @@ class FindObjectsInside:
                        max(corner.y for corner in self.bbox_corners),
                        max(corner.z for corner in self.bbox_corners)))
 
-    def _build_kd_tree(self):
-        """Builds a KD-tree and maps indices to objects."""
-        objects = [
-            obj for obj in bpy.data.objects
-            if obj.type == 'MESH' and not obj.hide_viewport
-        ]
-        kd = kdtree.KDTree(len(objects))
-        object_map = {}
-
-        for index, obj in enumerate(objects):
-            local_location = self.parent.matrix_world.inverted() @ obj.location
-            kd.insert(local_location, index)
-            object_map[index] = obj  # Map index to the Blender object
-
-        kd.balance()
-        return kd, object_map
-    
-    def _get_key_vectors(self):
-        return {
-            (0, 0, 0): .75,
-            (10, 0, 0): .75
-        }
-    
-    def _extrapolate_bbox(self):
-        return Vector((min(corner.x for corner in self.bbox_corners),
-                       min(corner.y for corner in self.bbox_corners),
-                       min(corner.z for corner in self.bbox_corners)))
-
 
     def execute(self):
         lights_inside = self._get_lights_inside()
         return lights_inside
 
     def _get_lights_inside(self):
-        """Query the KD-tree to find objects within the bounding sphere of the bounding box."""
-        # Calculate center and radius of bounding sphere
-        bbox_center = (self.bbox_min + self.bbox_max) / 2
-        bbox_radius = max((corner - bbox_center).length for corner in self.bbox_corners)
-
-        result = set()
-        # KDTree.find_range returns (location, index, distance)
-        for result_item in self.kd_tree.find_range(bbox_center, bbox_radius):
-            index = result_item[1]  # Extract index from the result
-            obj = self.object_map[index]
-            if self._is_valid_light_object(obj):
-                result.add(obj)
-        return result
+        candidates = FixtureSpatialIndex.find_inside_box(self.parent.matrix_world, self.bbox_min, self.bbox_max)
+        return {obj for obj in candidates if self._is_valid_light_object(obj)}
 
     def _is_valid_light_object(self, obj):
-        return (
-            obj.type == 'MESH'
-            and not obj.hide_viewport
-            and len(obj.list_group_channels) == 1
-            and obj.name != self.parent.name
-            and self._is_inside_precomputed_bbox(obj)
-        )
-
-    def _is_inside_precomputed_bbox(self, obj):
-        """Check if an object's location is within the precomputed bounding box."""
-        obj_loc_local = self.parent.matrix_world.inverted() @ obj.location
-        return all(
-            self.bbox_min[i] <= obj_loc_local[i] <= self.bbox_max[i]
-            for i in range(3)
-        )
+        try:
+            return (
+                obj.type == 'MESH'
+                and not obj.hide_viewport
+                and len(obj.list_group_channels) == 1
+                and obj.name != self.parent.name
+            )
+        except ReferenceError:  # Deleted since the index was built
+            FixtureSpatialIndex.invalidate()
+            return False
     
 
-class FindInfluenceField:  
+class FindInfluenceField:
+    '''
+    Key influencers work like little magnets. Every fixture near a Key gets pulled toward that Key's
+    value, more strongly the closer it is, and several Keys can pull on the same fixture at once.
+
+    Rather than asking "how strong is this Key on this fixture?" one pair at a time, we line all the
+    fixture positions up in one array and all the Key positions up in another, and NumPy works out
+    every distance at once. That gives a strength table (matrix) with one row per fixture and one
+    column per Key:
+
+                  Key 1   Key 2   Key 3
+        Fixture A  0.8     0       0
+        Fixture B  0.2     0.5     0
+        Fixture C  0       0       0     <-- not touched by anyone, so it gets dropped
+
+    A strength is 0 when the fixture is farther away than the Key's radius (the sum of its scale,
+    times INFLUENCE_RADIUS_MULTIPLIER), and it goes negative when the Key is erasing.
+    '''
     def __init__(self, parent):
         self.parent = parent  # The influencer object (3D mesh) whose field we're evaluating.
         self.influencers = self._find_all_relevant_influencers()
         if DEBUG: alva_log("influence", f"{BLUE}FindInfluencerField.__init__ | Relevant influencers: {[obj.name for obj in self.influencers]}")
 
     def execute(self):
-        light_objects = []
-        influencers = []
-        strengths = []
-
-        # Iterate over all lights in the scene
-        for light in self._find_all_lights_in_scene():
-            for influencer in self.influencers:
-                strength = self._calculate_strength(light, influencer)
-                if abs(strength) > 0:  # Only include if within the range of influence
-                    light_objects.append(light)
-                    influencers.append(influencer)
-                    strengths.append(strength)
+        '''Returns (lights touched by at least one Key, the Keys, strength matrix of shape (lights, Keys)).'''
+        lights = self._find_all_lights_in_scene()
+        if not lights or not self.influencers:
+            return [], self.influencers, np.zeros((0, len(self.influencers)))
 
-        return light_objects, influencers, strengths
+        strengths = self._calculate_strengths(lights, self.influencers)
+        is_touched = np.any(strengths != 0, axis=1)
+        light_objects = [light for light, touched in zip(lights, is_touched) if touched]
+        return light_objects, self.influencers, strengths[is_touched]
 
     def _find_all_relevant_influencers(self):
         # Return all "Key" influencer meshes in the same Blender collection
@@ -595,23 +513,31 @@ class FindInfluenceField:
         if DEBUG: alva_log("influence", f"FindInfluencerField._find_all_lights_in_scene | Lights: {[obj.name for obj in lights]}")
         return lights
 
-    def _calculate_strength(self, light, influencer):
+    @staticmethod
+    def _gather(objects):
+        locations = np.array([obj.location[:] for obj in objects], dtype=np.float64).reshape(len(objects), 3)
+        scale_sums = np.array([sum(obj.scale) for obj in objects], dtype=np.float64)
+        return locations, scale_sums
+
+    def _calculate_strengths(self, lights, influencers):
         # Strength depends on proximity and scale
-        distance = (light.location - influencer.location).length
-        influence_radius = sum(influencer.scale) * INFLUENCE_RADIUS_MULTIPLIER  # Average scale defines the radius
-        light_sensitivity = sum(light.scale) * LIGHT_SENSITIVITY_MULTIPLIER
+        light_locations, light_scales = self._gather(lights)
+        influencer_locations, influencer_scales = self._gather(influencers)
+        is_erasing = np.array([influencer.is_erasing for influencer in influencers], dtype=bool)
 
-        if distance > influence_radius:
-            return 0  # Out of range
-        
-        strength = max(0, (1 - (distance / influence_radius)) * light_sensitivity)
+        distances = np.linalg.norm(light_locations[:, np.newaxis, :] - influencer_locations[np.newaxis, :, :], axis=2)
+        influence_radii = influencer_scales * INFLUENCE_RADIUS_MULTIPLIER  # Average scale defines the radius
+        light_sensitivities = light_scales * LIGHT_SENSITIVITY_MULTIPLIER
 
-        if influencer.is_erasing:
-            strength *= -1
+        is_in_range = distances <= influence_radii
+        with np.errstate(divide='ignore', invalid='ignore'):
+            falloff = np.where(is_in_range, 1 - distances / influence_radii, 0)
+        strengths = np.maximum(0, np.nan_to_num(falloff) * light_sensitivities[:, np.newaxis])
+        strengths[:, is_erasing] *= -1
 
-        if DEBUG: alva_log("influence", f"FindInfluencerField._calculate_strength | {light.name} | Distance: {round(distance, 2)}, Influence radius: {round(influence_radius, 2)}, Light sensitivity: {round(light_sensitivity, 2)}, Strength: {round(strength, 2)}")
+        if DEBUG: alva_log("influence", f"FindInfluencerField._calculate_strengths | Lights: {[light.name for light in lights]}\nKeys: {[influencer.name for influencer in influencers]}\nStrengths:\n{np.round(strengths, 2)}")
 
-        return strength
+        return strengths
 
 
 '''
@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Influencers have to remember what they did to each fixture (see DOCUMENTATION CODE A1 in
+influence.py). That memory lives in a CollectionProperty on the influencer object, so that it's
+saved with the .blend file and follows undo.
+
+The trouble is that a CollectionProperty is just a list. To ask "what did I do to fixture 12?"
+we had to walk the whole list and compare every item, and we asked that for every fixture inside
+the influencer, every time it moved. Twice as many fixtures meant four times as much walking.
+
+So now, while you're working, the real memory is a plain Python dictionary:
+
+    {fixture object: value we already applied}
+
+Looking something up in a dictionary takes the same tiny amount of time whether it holds 2
+fixtures or 2,000. The CollectionProperty becomes a copy that we bring up to date (flush):
+
+    1. As soon as an influencer finishes working out its changes (end of InfluenceCPV.execute),
+       and again at the end of every depsgraph update and frame change, so it's always written
+       before Blender records the undo step for whatever moved the influencer. If it were
+       written any later, that undo step would hold the influencer's new position with its old
+       memory, and after Ctrl+Z the next move would subtract values that were never applied.
+    2. Right before the file is saved (save_pre), so the .blend always has the real memory.
+
+A flush only writes the fixtures that were added, changed, or removed since the last one. The
+store remembers which row of the CollectionProperty belongs to which fixture, so a changed value
+goes straight into its own row, a new fixture gets a row added on the end, and a removed fixture's
+row is filled with the last row and the last row dropped. Nothing ever rescans or rebuilds the
+list. So a flush with nothing new costs nothing, and dragging a big influencer across a few
+fixtures only writes those few.
+
+Undo, redo, and loading a file swap out all of Blender's data underneath us, which makes every
+object we were holding on to stale. When that happens we throw the dictionaries away (reset), and
+they are loaded again from the CollectionProperty the next time an influencer needs them.
+'''
+
+
+class InfluencerMemory:
+    _stores = {}  # {(influencer object, parameter name): InfluencerMemoryStore}
+
+    @classmethod
+    def get(cls, influencer_object, parameter_name, collection):
+        key = (influencer_object, parameter_name)
+        store = cls._stores.get(key)
+        if store is None:
+            store = InfluencerMemoryStore(collection, parameter_name == "color")
+            cls._stores[key] = store
+        return store
+
+    @classmethod
+    def flush_all(cls):
+        '''Writes every changed memory to its CollectionProperty, and forgets influencers that were deleted.'''
+        for key, store in list(cls._stores.items()):
+            try:
+                key[0].name  # Raises ReferenceError if the influencer is gone
+                store.flush()
+            except ReferenceError:
+                del cls._stores[key]
+
+    @classmethod
+    def reset(cls):
+        cls._stores = {}
+
+
+class InfluencerMemoryStore:
+    '''One influencer's memory for one parameter. Works like a small dictionary of fixtures.'''
+    def __init__(self, collection, is_color):
+        self.collection = collection
+        self.is_color = is_color
+        self._values = {}
+        self._rows = {}  # {fixture object: index of its item in the collection}
+        self._changed = set()
+        self._removed = set()
+
+        for index, item in enumerate(collection):
+            if item.channel_object is not None:
+                self._values[item.channel_object] = self._read_item(item)
+                self._rows[item.channel_object] = index
+
+    def _read_item(self, item):
+        if self.is_color:
+            return tuple(item.current_influence_color)
+        return item.current_influence
+
+    def _write_item(self, item, channel_object, value):
+        item.channel_object = channel_object
+        if self.is_color:
+            item.current_influence_color = value
+        else:
+            item.current_influence = value
+
+    @property
+    def is_dirty(self):
+        return bool(self._changed or self._removed)
+
+    def __contains__(self, channel_object):
+        return channel_object in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def channel_objects(self):
+        return list(self._values)
+
+    def get(self, channel_object, default=None):
+        return self._values.get(channel_object, default)
+
+
+    def set(self, channel_object, value):
+        value = tuple(value) if self.is_color else value
+        if channel_object in self._values and self._values[channel_object] == value:
+            return
+        self._values[channel_object] = value
+        self._changed.add(channel_object)
+        self._removed.discard(channel_object)
+
+    def remove(self, channel_object):
+        if self._values.pop(channel_object, None) is not None:
+            self._removed.add(channel_object)
+            self._changed.discard(channel_object)
+
+
+    def flush(self):
+        if not self.is_dirty:
+            return
+
+        for channel_object in self._removed:
+            self._remove_row(channel_object)
+
+        for channel_object in self._changed:
+            index = self._rows.get(channel_object)
+            if index is None:
+                item = self.collection.add()
+                self._rows[channel_object] = len(self.collection) - 1
+            else:
+                item = self.collection[index]
+            self._write_item(item, channel_object, self._values[channel_object])
+
+        self._changed.clear()
+        self._removed.clear()
+
+    def _remove_row(self, channel_object):
+        '''Fills the fixture's row with the last row and drops the last row, so no other row moves.'''
+        index = self._rows.pop(channel_object, None)
+        if index is None:
+            return
+        last_index = len(self.collection) - 1
+        if index != last_index:
+            last_item = self.collection[last_index]
+            moved_object = last_item.channel_object
+            self._write_item(self.collection[index], moved_object, self._read_item(last_item))
+            if self._rows.get(moved_object) == last_index:
+                self._rows[moved_object] = index
+        self.collection.remove(last_index)
@@ -4,13 +4,13 @@
 
 import bpy
 import numpy as np   # type: ignore
-from typing import List, Tuple, Union
+from typing import List
 import time
-import mathutils
 
 from ..assets.sli import SLI 
 from ..maintenance.logging import alva_log
 from .publish.publish import Publish, CPV
+from .split_color import ColorSplitter
 
 # pyright: reportInvalidTypeForm=false
 
@@ -25,6 +25,16 @@ def find_mixer_cpv(Generator, Parameter):
 
 
 class MixCPV:
+    '''
+    The mixer spreads a handful of user choices (the keys) across a whole group of channels.
+
+    Everything below works on NumPy arrays from start to finish. Keys come in as a (N,) array for
+    single-number parameters like intensity, or a (N, 3) array for colors, one row per key. Each
+    step (subdivide, compress, interpolate, pattern, pose) hands the next step an array of the
+    same kind, so colors never get split into separate red/green/blue lists and glued back
+    together. Only at the very end, right before publishing, does each row become a normal
+    float or (r, g, b) tuple again.
+    '''
     def __init__(self, Generator, Parameter):
         self.parent = Generator.parent
         self.Parameter = Parameter
@@ -37,8 +47,7 @@ class MixCPV:
         parent = self.parent
         parameter = self.property_name
         channels = self.channels_list
-        values_list = parent.parameters
-        values = [getattr(choice, parameter) for choice in values_list]
+        keys = self.keys_to_array([getattr(choice, parameter) for choice in parent.parameters])
         subdivisions = parent.int_subdivisions
         mode = parent.mix_method_enum
         param_mode = parameter
@@ -46,10 +55,10 @@ class MixCPV:
         offset = self.apply_offset_sensitivity(parent)
 
         if mode == "option_gradient":
-            channels, values = self.Interpolate().execute(values, subdivisions, channels, offset, param_mode)
+            channels, values = self.Interpolate().execute(keys, subdivisions, channels, offset, param_mode)
 
         elif mode == "option_pattern":
-            values = self.Patternize().execute(values, channels, param_mode, offset)
+            values = self.Patternize().execute(keys, channels, param_mode, offset)
 
         elif mode == "option_pose":
             values = self.Pose().execute(channels, param_mode, parent)
@@ -57,15 +66,34 @@ class MixCPV:
         else:
             SLI.SLI_assert_unreachable()
 
-        alva_log('mix', f"MAIN. mix.py is returning: {channels, values}")
-        for channel, value in zip(channels, values):
-            Publish(self, self.Parameter, channel, parameter, value, sender=CPV).execute()
+        alva_log('mix', lambda: f"MAIN. mix.py is returning: {channels, values}")
+        if values.ndim == 2:  # Colors. Split the whole gradient at once instead of one fixture at a time.
+            for channel, (property_name, value) in zip(channels, ColorSplitter.split_many(self, "color", channels, values)):
+                Publish(self, self.Parameter, channel, property_name, value, sender=CPV).execute()
+        else:
+            for channel, value in zip(channels, self.array_to_values(values)):
+                Publish(self, self.Parameter, channel, parameter, value, sender=CPV).execute()
 
-        alva_log('time', f"TIME: mix_my_values took {time.time() - start_time} seconds\n")
+        alva_log('time', lambda: f"TIME: mix_my_values took {time.time() - start_time} seconds\n")
     
     @staticmethod
     def apply_offset_sensitivity(parent):
         return parent.float_offset * OFFSET_SENSITIVITY
+
+    @staticmethod
+    def keys_to_array(keys) -> np.ndarray:
+        '''Colors (mathutils.Color or tuples) become rows of an (N, 3) array, numbers become an (N,) array.'''
+        if keys and not isinstance(keys[0], (int, float)):
+            return np.array([tuple(key) for key in keys], dtype=np.float64).reshape(len(keys), -1)
+        return np.asarray(keys, dtype=np.float64)
+
+    @staticmethod
+    def array_to_values(values: np.ndarray) -> list:
+        '''The one and only place the arrays turn back into plain Python values for the publisher.'''
+        values = np.asarray(values)
+        if values.ndim == 2:
+            return [tuple(row) for row in values.tolist()]
+        return values.tolist()
     
 
     class Interpolate:
@@ -83,13 +111,14 @@ class MixCPV:
             values = self.interpolate_keys_to_values(channels, keys, offset, param_mode)
             return channels, values
         
-        def subdivide_values(self, subdivisions: int, values: List[Union[float, mathutils.Color]]) -> List[Union[float, mathutils.Color]]:
-            if subdivisions > 0:
-                for _ in range(subdivisions):
-                    values += values
-            return values
+        def subdivide_values(self, subdivisions: int, keys: np.ndarray) -> np.ndarray:
+            '''Each subdivision doubles the keys, so [A, B] with 2 subdivisions becomes [A, B, A, B, A, B, A, B].'''
+            if subdivisions <= 0:
+                return keys
+            repeats = 2 ** subdivisions
+            return np.tile(keys, (repeats,) + (1,) * (keys.ndim - 1))
         
-        def compress_keys(self, keys: List[Union[float, Tuple[float, float, float]]], num_channels: int, param_mode: str) -> List[Union[float, Tuple[float, float, float]]]:
+        def compress_keys(self, keys: np.ndarray, num_channels: int, param_mode: str) -> np.ndarray:
             """
             All we're trying to do is basically compress the keys to get them to fit into a smaller number 
             of keys if we have more keys than channels.
@@ -101,78 +130,65 @@ class MixCPV:
             So it should say ok, divide the number of keys by the number of channels (sample size). That's 2. 
             Then it should average the first 2 (50), average the next 2 (0), and then average the final pair 
             (50).
+
+            When the keys divide evenly, that's just a reshape into (channels, sample size) and a mean. 
+            When they don't, the groups are slightly different sizes, so we add each group up with 
+            np.add.reduceat and divide by how big each group was.
             """
-            if len(keys) < num_channels:
+            num_keys = len(keys)
+            if num_keys < num_channels:
                 return keys
-            
+
             if num_channels == 0:
-                sample_size = 1
-            else:
-                sample_size = len(keys) / num_channels  # Determine how many keys per channel
-
-            compressed_keys = []
-
-            for i in range(num_channels):
-                start = int(i * sample_size)
-                end = int((i + 1) * sample_size)
-                group = keys[start:end]
-
-                if param_mode == "color":
-                    averaged_key = mathutils.Color((
-                        sum(color.r for color in group) / len(group),
-                        sum(color.g for color in group) / len(group),
-                        sum(color.b for color in group) / len(group),
-                    ))
-                else:
-                    averaged_key = sum(group) / len(group)
-                
-                compressed_keys.append(averaged_key)
-
-            return compressed_keys
+                return keys[:0]
+
+            if num_keys % num_channels == 0:
+                sample_size = num_keys // num_channels
+                return keys.reshape((num_channels, sample_size) + keys.shape[1:]).mean(axis=1)
+
+            starts = (np.arange(num_channels) * num_keys / num_channels).astype(np.int64)
+            group_sizes = np.diff(np.append(starts, num_keys))
+            sums = np.add.reduceat(keys, starts, axis=0)
+            return sums / group_sizes.reshape((-1,) + (1,) * (keys.ndim - 1))
         
-        def interpolate_keys_to_values(self, channels: List[int], keys: List[Union[float, mathutils.Color]], offset: float, param_mode: str) -> List[Union[float, mathutils.Color]]:
-            alva_log("mix", f"\nMIXER SESSION:\nINTERP. Input channels: {channels}\nINTERP. Input keys: {keys}\nINTERP. Offset: {offset}")
+        def interpolate_keys_to_values(self, channels: List[int], keys: np.ndarray, offset: float, param_mode: str) -> np.ndarray:
+            '''
+            Spreads the keys evenly across the channels and blends between neighbors. The keys loop 
+            around, so the offset can slide the whole gradient along the channels and the last key 
+            blends back into the first one. Works on rows, so colors blend all three parts at once.
+            '''
+            alva_log("mix", lambda: f"\nMIXER SESSION:\nINTERP. Input channels: {channels}\nINTERP. Input keys: {keys}\nINTERP. Offset: {offset}")
 
             num_keys = len(keys)
             fractional_offset = offset * num_keys
 
             interpolation_points = (np.linspace(0, num_keys - 1, len(channels)) + fractional_offset) % num_keys
 
-            if param_mode == "alva_color":
-                reds = [key.r for key in keys]
-                greens = [key.g for key in keys]
-                blues = [key.b for key in keys]
-
-                interpolated_reds = np.interp(interpolation_points, range(num_keys), reds, period=num_keys)
-                interpolated_greens = np.interp(interpolation_points, range(num_keys), greens, period=num_keys)
-                interpolated_blues = np.interp(interpolation_points, range(num_keys), blues, period=num_keys)
+            lower = np.floor(interpolation_points)
+            blend = (interpolation_points - lower).reshape((-1,) + (1,) * (keys.ndim - 1))
+            lower = lower.astype(np.int64) % num_keys
+            upper = (lower + 1) % num_keys
 
-                interpolated_values = [
-                    mathutils.Color((r, g, b))
-                    for r, g, b in zip(interpolated_reds, interpolated_greens, interpolated_blues)
-                ]
-            else:
-                interpolated_values = np.interp(interpolation_points, range(num_keys), keys, period=num_keys).tolist()
+            interpolated_values = keys[lower] * (1 - blend) + keys[upper] * blend
 
-            alva_log("mix", f"INTERP. Interpolated values with offset: {interpolated_values}")
+            alva_log("mix", lambda: f"INTERP. Interpolated values with offset: {interpolated_values}")
             return interpolated_values
     
 
     class Patternize:
-        def execute(self, values: List[float], 
-                    channels: List[int], param: str, offset: float) -> List[float]:
+        def execute(self, keys: np.ndarray, channels: List[int], param: str, offset: float) -> np.ndarray:
             '''Alternate between choice without interpolating betweens, creating a choppy pattern'''
-            num_values = len(values)
-            mixed_values = [values[i % num_values] for i in range(len(channels))]
-            offset_steps = int(offset * len(channels))
-            mixed_values = mixed_values[-offset_steps:] + mixed_values[:-offset_steps]
-
-            if param == "color":
-                mixed_values = [(r, g, b) for r, g, b in mixed_values]
+            num_channels = len(channels)
+            mixed_values = keys[np.arange(num_channels) % len(keys)]
+            offset_steps = int(offset * num_channels)
+            if abs(offset_steps) < num_channels:
+                mixed_values = np.roll(mixed_values, offset_steps, axis=0)
             return mixed_values
         
     class Pose:
-        def execute(self, channels: List[int], param_mode: str, parent) -> List[float]:
+        POSE_PARAMETERS = ['alva_intensity', 'alva_color', 'alva_pan', 'alva_tilt', 'alva_zoom', 'alva_iris']
+
+        def execute(self, channels: List[int], param_mode: str, parent) -> np.ndarray:
             '''Instead of pushing Lang through time you might have wound up pushing time through Lang.'''
             poses = parent.parameters
             num_poses = len(poses)
@@ -186,30 +202,13 @@ class MixCPV:
             pose_index = int(progress * (num_poses - 1)) % num_poses
             next_pose_index = (pose_index + 1) % num_poses
             blend_factor = (progress * (num_poses - 1)) % 1
-            
-            mixed_values = {
-                'alva_intensity': [],
-                'alva_color': [],
-                'alva_pan': [],
-                'alva_tilt': [],
-                'alva_zoom': [],
-                'alva_iris': []
-            }
-
-            for param in mixed_values.keys():
-                value1 = getattr(poses[pose_index], param)
-                value2 = getattr(poses[next_pose_index], param)
-
-                if param == 'alva_color':
-                    mixed_value = tuple(v1 * (1 - blend_factor) + v2 * blend_factor for v1, v2 in zip(value1, value2))
-                    mixed_values[param] = [(mixed_value[0], mixed_value[1], mixed_value[2])] * len(channels)
-                else:
-                    mixed_value = value1 * (1 - blend_factor) + value2 * blend_factor
-                    mixed_values[param] = [mixed_value] * len(channels)
-
-            scaled_values = self.scale_motor(parent, param_mode, mixed_values, motor_node)
-
-            return scaled_values['alva_color']
+
+            param = param_mode if param_mode in self.POSE_PARAMETERS else 'alva_color'
+            poses_to_blend = MixCPV.keys_to_array([getattr(poses[pose_index], param), getattr(poses[next_pose_index], param)])
+            mixed_value = poses_to_blend[0] * (1 - blend_factor) + poses_to_blend[1] * blend_factor
+
+            mixed_values = np.tile(mixed_value, (len(channels),) + (1,) * mixed_value.ndim)
+            return self.scale_motor(parent, param_mode, mixed_values, motor_node)
             
         def find_motor_node(self, mixer_node: bpy.types.Node) -> bpy.types.Node:
             """Find the motor node connected to the mixer node."""
@@ -224,23 +223,14 @@ class MixCPV:
                                 return connected_node
             return None
 
-        def scale_motor(self, parent: bpy.types.Node, param_mode: str, mixed_values: List[float], motor_node: bpy.types.Node) -> List[float]:
+        def scale_motor(self, parent: bpy.types.Node, param_mode: str, mixed_values: np.ndarray, motor_node: bpy.types.Node) -> np.ndarray:
             """Scale the mixed values based on the motor node's scale."""
             if motor_node:
                 float_scale = motor_node.float_scale
             else:
                 float_scale = 1
 
-            if param_mode == "color" and "alva_color" in mixed_values:
-                mixed_values['alva_color'] = [
-                    (r * float_scale, g * float_scale, b * float_scale) for r, g, b in mixed_values['alva_color']
-                ]
-            elif param_mode != "color":
-                for key, values in mixed_values.items():
-                    if isinstance(values[0], (int, float)):
-                        mixed_values[key] = [v * float_scale for v in values]
-
-            return mixed_values
+            return mixed_values * float_scale
 
 
 def test_mixer(SENSITIVITY): # Return True for fail, False for pass
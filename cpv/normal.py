@@ -3,7 +3,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from .find import Find 
-from .publish.publish import Publish, CPV
+from .publish.publish import GroupPublish
 
 
 def find_normal_cpv(Generator, Parameter):
@@ -31,5 +31,5 @@ class NormalCPV:
             Find().trigger_downstream_nodes(self.parent, self.property_name, self.value)
 
     def publish(self):
-        for channel in self.parent.list_group_channels:
-            Publish(self, self.Parameter, channel.chan, self.property_name, self.value, sender=CPV).execute()
\ No newline at end of file
+        channels = [channel.chan for channel in self.parent.list_group_channels]
+        GroupPublish(self, self.Parameter, channels, self.property_name, self.value).execute()
\ No newline at end of file
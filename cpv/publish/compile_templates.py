@@ -0,0 +1,104 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import re
+from functools import lru_cache
+
+'''
+Lighting consoles tell Sorcerer how to talk to them with argument templates like
+"# at $ Enter". The # is the channel and the $ is the value. Color templates use
+$1, $2, $3, etc. because they have more than one value.
+
+We used to fill those in with a chain of str.replace() calls on the raw template
+strings for every single CPV request. That's fine for one slider move, but during
+playback the publisher can see thousands of CPV requests per frame, and it was
+re-finding and re-replacing the exact same templates over and over again.
+
+So instead, we "compile" every template exactly once, when the console is registered
+through spy.utils.as_register_class(). Compiling just means turning the template into
+a normal Python format string ("{0} at {1} Enter") so that filling it in is a single
+str.format() call. The compiled templates are stored in COMPILED_ARGUMENT_TEMPLATES
+in spy_utils.py, keyed by (console as_idname, property_name). That way the publisher
+does one dictionary lookup and one format call per CPV.
+
+Templates that can change at runtime (like the special strobe/gobo/prism arguments
+that come from the fixture's own string properties) go through the same compiler,
+which remembers what it already compiled.
+'''
+
+COLOR_PROFILES = {
+    # Absolute Arguments
+    "rgb": ["$1", "$2", "$3"],
+    "cmy": ["$1", "$2", "$3"],
+    "rgbw": ["$1", "$2", "$3", "$4"],
+    "rgba": ["$1", "$2", "$3", "$4"],
+    "rgbl": ["$1", "$2", "$3", "$4"],
+    "rgbaw": ["$1", "$2", "$3", "$4", "$5"],
+    "rgbam": ["$1", "$2", "$3", "$4", "$5"],
+
+    # Raise Arguments
+    "raise_rgb": ["$1", "$2", "$3"],
+    "raise_cmy": ["$1", "$2", "$3"],
+    "raise_rgbw": ["$1", "$2", "$3", "$4"],
+    "raise_rgba": ["$1", "$2", "$3", "$4"],
+    "raise_rgbl": ["$1", "$2", "$3", "$4"],
+    "raise_rgbaw": ["$1", "$2", "$3", "$4", "$5"],
+    "raise_rgbam": ["$1", "$2", "$3", "$4", "$5"],
+
+    # Lower Arguments
+    "lower_rgb": ["$1", "$2", "$3"],
+    "lower_cmy": ["$1", "$2", "$3"],
+    "lower_rgbw": ["$1", "$2", "$3", "$4"],
+    "lower_rgba": ["$1", "$2", "$3", "$4"],
+    "lower_rgbl": ["$1", "$2", "$3", "$4"],
+    "lower_rgbaw": ["$1", "$2", "$3", "$4", "$5"],
+    "lower_rgbam": ["$1", "$2", "$3", "$4", "$5"]
+}
+
+TEMPLATE_DICTIONARIES = ['absolute', 'increase', 'decrease']
+NUMBERED_VALUE = re.compile(r"\$(\d)")
+MAX_DYNAMIC_TEMPLATES = 512
+
+
+class ArgumentTemplate:
+    def __init__(self, template, is_color=False):
+        self.template = template
+        self.is_color = is_color
+        self._num_values = self._count_values()
+        self._format = self._compile().format
+
+    def _count_values(self):
+        if not self.is_color:
+            return 1
+        return max((int(number) for number in NUMBERED_VALUE.findall(self.template)), default=0)
+
+    def _compile(self):
+        format_string = self.template.replace("{", "{{").replace("}", "}}").replace("#", "{0}")
+        if self.is_color:
+            return NUMBERED_VALUE.sub(r"{\1}", format_string)
+        return format_string.replace("$", "{1}")
+
+
+    def format(self, channel, value):
+        if not self.is_color:
+            return self._format(channel, value)
+
+        values = tuple(value)
+        if len(values) < self._num_values:
+            values += tuple(f"${i}" for i in range(len(values) + 1, self._num_values + 1))
+        return self._format(channel, *values)
+
+
+@lru_cache(maxsize=MAX_DYNAMIC_TEMPLATES)
+def compile_argument_template(template, is_color=False):
+    return ArgumentTemplate(template, is_color)
+
+
+def compile_console_templates(LightingConsole):
+    '''Returns {property_name: ArgumentTemplate} for every argument the console knows about.'''
+    compiled = {}
+    for dictionary_name in TEMPLATE_DICTIONARIES:
+        for property_name, template in getattr(LightingConsole, dictionary_name, {}).items():
+            compiled[property_name] = compile_argument_template(template, property_name in COLOR_PROFILES)
+    return compiled
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from ...utils.cpv_utils import expand_channels_string
+
+'''
+Picture a slow fade: intensity goes from 40 to 41 over two seconds. The fcurve moves a tiny bit
+every frame, so every frame the controller makes a CPV request. But Eos only takes whole numbers
+(rounding_points = 0), so after rounding, about 59 out of 60 of those frames say "Channel 1 at
+40" again. The console already knows that. We were telling it anyway.
+
+The console mirror remembers what we last told the console, for each channel and parameter:
+
+    {(console, channel, parameter): rounded value we last sent}
+
+FormOSC asks the mirror right after rounding. If the console was already told that value, the
+message is dropped. If not, the mirror writes down the new value and the message goes out.
+
+A few details:
+
+    1. Harmonized requests can be for many channels at once ("1 Thru 24"). We only drop those if
+       every one of those channels already has the value. Otherwise the whole thing goes out.
+
+    2. raise_ and lower_ are changes, not values. "Raise 5 by 10" is never a repeat. And after one,
+       we no longer know the channel's actual value, so we forget what we remembered for it.
+
+    3. Each parameter can have a deadband (FixtureParameter.deadband, 0 by default). If the new value
+       is within deadband of what we last sent, we don't send it. Because we compare against what
+       we last SENT, not what was last asked for, a slow drift still gets sent once it adds up.
+
+    4. Somebody can change things on the console without Sorcerer knowing. So the mirror only
+       lives for one playback session. It's only used for harmonized frames (the event manager's
+       path), never for somebody moving a slider by hand, and it's cleared when playback starts,
+       after every frame that wasn't part of playback (scrubbing), and whenever the .blend is
+       loaded, undone, or redone. The first frame after that sends everything again.
+
+    5. The mirror writes down a value when FormOSC asks, before the message actually goes out.
+       That's only safe because harmonized frames are sent without a coalesce key, so the
+       background sender never replaces or drops them (see osc_sender.py).
+'''
+
+RELATIVE_PREFIXES = ("raise_", "lower_")
+
+
+class ConsoleMirror:
+    _last_sent = {}  # {(console as_idname, channel, property_name): rounded value}
+
+    @classmethod
+    def should_send(cls, console_id, channels, property_name, value, deadband=0):
+        '''Returns False if the console already has this value (within deadband). Otherwise remembers it and returns True.'''
+        channel_numbers = expand_channels_string(channels)
+
+        if property_name.startswith(RELATIVE_PREFIXES):
+            absolute_name = property_name.split("_", 1)[1]
+            for channel in channel_numbers:
+                cls._last_sent.pop((console_id, channel, absolute_name), None)
+            return True
+
+        keys = [(console_id, channel, property_name) for channel in channel_numbers]
+        if keys and all(cls._is_within_deadband(cls._last_sent.get(key), value, deadband) for key in keys):
+            return False
+
+        for key in keys:
+            cls._last_sent[key] = value
+        return True
+
+    @staticmethod
+    def _is_within_deadband(last_value, value, deadband):
+        if last_value is None:
+            return False
+        if isinstance(value, tuple):
+            return len(value) == len(last_value) and all(abs(a - b) <= deadband for a, b in zip(value, last_value))
+        return abs(value - last_value) <= deadband
+
+
+    @classmethod
+    def reset(cls):
+        cls._last_sent = {}
@@ -2,53 +2,41 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-ABSOLUTE = 'absolute'
-RAISE = 'raise'
-LOWER = 'lower'
+from ...utils.spy_utils import COMPILED_ARGUMENT_TEMPLATES
+from .compile_templates import compile_argument_template
 
 
 class FindArgumentTemplate:
+    '''
+    Finds the compiled argument template for this CPV's console and property name.
+    Absolute, raise_, and lower_ templates were all compiled into the same lookup when
+    the console was registered, so the property name alone tells us which one we want.
+    '''
     def __init__(self, LightingConsole, Publisher, Parameter):
         self.LightingConsole = LightingConsole
         self.Publisher = Publisher
         self.Parameter = Parameter
 
-        self.set_mode = self._find_set_mode()
-        self.argument_dict = self._get_argument_dict()
-    
-    def _find_set_mode(self):
-        if "raise_" in self.Publisher.property_name:
-            return RAISE
-        if "lower_" in self.Publisher.property_name:
-            return LOWER
-        return ABSOLUTE
-    
-    def _get_argument_dict(self):
-        if self.set_mode == ABSOLUTE:
-            return self.LightingConsole.absolute
-        if self.set_mode == RAISE:
-            return self.LightingConsole.increase
-        return self.LightingConsole.lower
-    
 
     def execute(self):
         argument_template = self.find_argument()
         special_argument_func = self._find_special_argument_func()
         if special_argument_func:
-            argument_template = special_argument_func(self.Publisher.patch_controller, argument_template, self.Publisher.value)
+            special_template = special_argument_func(self.Publisher.patch_controller, argument_template.template, self.Publisher.value)
+            argument_template = compile_argument_template(special_template, argument_template.is_color)
         return argument_template
-    
+
     def find_argument(self):
-        argument = self.argument_dict.get(self.Publisher.property_name, None)
-        
+        argument = COMPILED_ARGUMENT_TEMPLATES.get((self.LightingConsole.as_idname, self.Publisher.property_name), None)
+
         if argument:
             return argument
-        
+
         if hasattr(self.Parameter, "argument_if_not_found"):
-            return getattr(self.Parameter, "argument_if_not_found")
-        
-        return f"Argument not found for {self.Publisher.property_name}"
-    
+            return compile_argument_template(getattr(self.Parameter, "argument_if_not_found"), self.Publisher._is_color)
+
+        return compile_argument_template(f"Argument not found for {self.Publisher.property_name}")
+
     def _find_special_argument_func(self):
         if hasattr(self.Parameter, "add_special_osc_argument"):
-            return getattr(self.Parameter, "add_special_osc_argument")
\ No newline at end of file
+            return getattr(self.Parameter, "add_special_osc_argument")
@@ -2,34 +2,8 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-COLOR_PROFILES = {
-    # Absolute Arguments
-    "rgb": ["$1", "$2", "$3"],
-    "cmy": ["$1", "$2", "$3"],
-    "rgbw": ["$1", "$2", "$3", "$4"],
-    "rgba": ["$1", "$2", "$3", "$4"],
-    "rgbl": ["$1", "$2", "$3", "$4"],
-    "rgbaw": ["$1", "$2", "$3", "$4", "$5"],
-    "rgbam": ["$1", "$2", "$3", "$4", "$5"],
-
-    # Raise Arguments
-    "raise_rgb": ["$1", "$2", "$3"],
-    "raise_cmy": ["$1", "$2", "$3"],
-    "raise_rgbw": ["$1", "$2", "$3", "$4"],
-    "raise_rgba": ["$1", "$2", "$3", "$4"],
-    "raise_rgbl": ["$1", "$2", "$3", "$4"],
-    "raise_rgbaw": ["$1", "$2", "$3", "$4", "$5"],
-    "raise_rgbam": ["$1", "$2", "$3", "$4", "$5"],
-
-    # Lower Arguments
-    "lower_rgb": ["$1", "$2", "$3"],
-    "lower_cmy": ["$1", "$2", "$3"],
-    "lower_rgbw": ["$1", "$2", "$3", "$4"],
-    "lower_rgba": ["$1", "$2", "$3", "$4"],
-    "lower_rgbl": ["$1", "$2", "$3", "$4"],
-    "lower_rgbaw": ["$1", "$2", "$3", "$4", "$5"],
-    "lower_rgbam": ["$1", "$2", "$3", "$4", "$5"]
-}
+from .compile_templates import compile_argument_template
+from .console_mirror import ConsoleMirror
 
 
 class FormOSC:
@@ -37,42 +11,49 @@ class FormOSC:
         self.Publisher = Publisher
         self.parameter = Publisher.property_name
 
-        self._address = LightingConsole.osc_address
+        self._address = compile_argument_template(LightingConsole.osc_address)
         self._rounding_points = LightingConsole.rounding_points
         self._format_value_function = LightingConsole.format_value
+        self._console_id = LightingConsole.as_idname
+        self._deadband = getattr(Publisher.Parameter, "deadband", 0)
 
-        if not self.Publisher._is_color:
-            self.channel = self.format_channel(Publisher.channel)
-            self.value = self.format_value(Publisher.value)
+        self.channel = self.format_channel(Publisher.channel)
 
     def format_channel(self, channel):
         return str(channel)
-    
+
+    def round_value(self, value):
+        return round(value, self._rounding_points)
+
     def format_value(self, value):
-        value = round(value, self._rounding_points)
+        value = self.round_value(value)
         value = self._format_value_function(value)
         return value
 
 
     def execute(self):
+        '''Returns (None, None) if the console already has this value. See console_mirror.py.'''
+        if self._is_harmonized() and not self._console_needs_it():
+            return None, None
         if self.Publisher._is_color:
             return self._format_color_object()
-        argument = self._find_argument()
-        address = self._find_address()
+        value = self.format_value(self.Publisher.value)
+        argument = self.Publisher.argument_template.format(self.channel, value)
+        address = self._address.format(self.channel, value)
         return argument, address
-    
+
+    def _is_harmonized(self):
+        '''Only harmonized frames go through the mirror. Slider moves always go out.'''
+        return getattr(self.Publisher, "_is_already_harmonized", False)
+
+    def _console_needs_it(self):
+        if self.Publisher._is_color:
+            rounded = tuple(self.round_value(val) for val in self.Publisher.value)
+        else:
+            rounded = self.round_value(self.Publisher.value)
+        return ConsoleMirror.should_send(self._console_id, self.Publisher.channel, self.parameter, rounded, self._deadband)
+
     def _format_color_object(self):
-        property_name = self.Publisher.property_name
         formatted_values = [self.format_value(val) for val in self.Publisher.value]
-        argument = self.Publisher.argument_template.replace("#", self.format_channel(self.Publisher.channel))
-        
-        for i, formatted_value in enumerate(formatted_values):
-            argument = argument.replace(COLOR_PROFILES[property_name][i], str(formatted_value))
-
-        return argument, self._address
-    
-    def _find_argument(self):
-        return self.Publisher.argument_template.replace("#", self.channel).replace("$", self.value)
-    
-    def _find_address(self):
-        return self._address.replace("#", self.channel).replace("$", self.value)
\ No newline at end of file
+        argument = self.Publisher.argument_template.format(self.channel, formatted_values)
+        return argument, self._address.template
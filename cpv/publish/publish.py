@@ -6,11 +6,15 @@ import bpy
 
 from ...utils.osc import OSC
 from ..split_color import ColorSplitter
+from .console_mirror import RELATIVE_PREFIXES
 from .form_osc import FormOSC
 from .prepare import Prepare
+from .request_buffer import ChangeRequestBuffer
 from ...utils.spy_utils import REGISTERED_LIGHTING_CONSOLES
+from ...utils.cpv_utils import PatchIndex, simplify_channels_list
+from ...utils.channel_set import ChannelSet
     
-change_requests = []
+change_requests = ChangeRequestBuffer()
 
 VERSIONS_OF_UNSPLIT_COLOR = ['color', 'raise_color', 'lower_color']
 
@@ -48,11 +52,15 @@ class Publish:
         return isinstance(self.Parameter.default, tuple)
 
     def find_my_patch_controller(self):
-        if self.Generator.controller_type not in ["Fixture", "Pan/Tilt Fixture"]:
-            for obj in bpy.data.objects:
-                if obj.object_identities_enum == "Fixture" and obj.list_group_channels[0].chan == self.channel:
-                    return obj
-        return self.Generator.parent
+        return self.find_patch_controller(self.Generator, self.channel)
+
+    @staticmethod
+    def find_patch_controller(Generator, channel):
+        if Generator.controller_type not in ["Fixture", "Pan/Tilt Fixture"]:
+            patch_controller = PatchIndex.find(channel)
+            if patch_controller is not None:
+                return patch_controller
+        return Generator.parent
     
     @staticmethod
     def find_installed_lighting_console_data_class(console_mode=None):
@@ -62,6 +70,10 @@ class Publish:
 
     @property
     def _in_playback_or_frame_change(self):
+        return Publish.in_playback_or_frame_change()
+
+    @staticmethod
+    def in_playback_or_frame_change():
         scene = bpy.context.scene.scene_props
         return scene.is_playing or scene.in_frame_change
     
@@ -96,15 +108,107 @@ class Publish:
 
         if self._should_return_tuple_to_event_manager:
             return full_argument, address
+
+        if full_argument is None:  # The console already has this value
+            return
         
         self._send_now(full_argument, address)
 
     def _add_to_collection(self):
-        global change_requests
-        change_requests.append((self.Generator, self.Parameter, self.channel, self.property_name, self.value))
+        change_requests.append(self.Generator, self.Parameter, self.channel, self.property_name, self.value)
     
     def _send_now(self, full_argument, address):
-        OSC.send_osc_lighting(address, full_argument, user=0)
+        # raise_ and lower_ are changes, not values, so a newer one must never replace an older one
+        is_relative = self.property_name.startswith(RELATIVE_PREFIXES)
+        coalesce_key = None if is_relative else (self.channel, self.property_name)
+        OSC.send_osc_lighting(address, full_argument, user=0, coalesce_key=coalesce_key)
+
+
+class GroupPublish:
+    '''
+    When somebody drags a group controller's slider outside of playback, NormalCPV used to make
+    one Publish per channel in the group, and each one sent its own OSC message. A 100 channel
+    group meant 100 UDP packets every time the slider moved, all saying the same thing:
+
+        Chan 1 at 50 Enter, Chan 2 at 50 Enter, ... Chan 100 at 50 Enter
+
+    This sends "Chan 1 Thru 100 at 50 Enter" once instead, the same way the harmonizer already
+    combines channels during playback.
+
+    The catch is that a channel's value isn't always the same as the group's. Some things depend
+    on each fixture's own settings (its patch controller):
+
+        1. Dynamic min/max. Pan 50 on a fixture with pan_max 270 is a different number than on
+           one with pan_max 540. See map.py.
+        2. Color. The color is split for each fixture's color profile and white balance, so an
+           RGB fixture and an RGBW fixture get different values and even different templates.
+        3. Special arguments, like strobe or prism commands that come from the fixture's own
+           string properties.
+
+    So first we sort the channels into batches by just those settings. Every fixture in a batch
+    would have gotten the exact same message except for its channel number, so each batch goes
+    out as one Publish for all of its channels. A channel that doesn't match anybody goes out on
+    its own, same as before. Most groups are one kind of fixture, so most groups are one batch.
+
+    During playback and frame change, CPV requests go to the harmonizer one channel at a time
+    (it needs to compare channels across controllers), so there we skip all this and do it the
+    normal way.
+    '''
+    def __init__(self, Generator, Parameter, channels, property_name, value):
+        self.Generator = Generator
+        self.Parameter = Parameter
+        self.channels = channels
+        self.property_name = property_name
+        self.value = value
+        self._is_unsplit_color = isinstance(Parameter.default, tuple) and property_name.replace("alva_", "") in VERSIONS_OF_UNSPLIT_COLOR
+
+
+    def execute(self):
+        if len(self.channels) < 2 or Publish.in_playback_or_frame_change():
+            for channel in self.channels:
+                Publish(self.Generator, self.Parameter, channel, self.property_name, self.value, sender=CPV).execute()
+            return
+
+        for patch_controller, channels in self._find_batches():
+            if len(channels) == 1:
+                Publish(self.Generator, self.Parameter, channels[0], self.property_name, self.value, sender=CPV).execute()
+            else:
+                BatchedPublish(self.Generator, self.Parameter, channels, patch_controller, self.property_name, self.value).execute()
+
+    def _find_batches(self):
+        '''Returns [(first patch controller, [channels])], one per different set of fixture settings, in channel order.'''
+        batches = {}
+        for channel in self.channels:
+            patch_controller = Publish.find_patch_controller(self.Generator, channel)
+            signature = self._find_patch_signature(patch_controller)
+            if signature not in batches:
+                batches[signature] = (patch_controller, [])
+            batches[signature][1].append(channel)
+        return list(batches.values())
+
+    def _find_patch_signature(self, patch_controller):
+        '''Everything about this fixture that could make its message different from another's.'''
+        signature = []
+        if hasattr(self.Parameter, 'dynamic_min') and hasattr(self.Parameter, 'dynamic_max'):
+            signature.append(getattr(patch_controller, self.Parameter.dynamic_min, None))
+            signature.append(getattr(patch_controller, self.Parameter.dynamic_max, None))
+        if self._is_unsplit_color:
+            signature.append(getattr(patch_controller, "color_profile_enum", None))
+            signature.append(tuple(getattr(patch_controller, "alva_white_balance", ())))
+        if hasattr(self.Parameter, 'add_special_osc_argument'):
+            signature.append(self.Parameter.add_special_osc_argument(patch_controller, "", self.value))
+        return tuple(signature)
+
+
+class BatchedPublish(Publish):
+    '''A Publish for many channels at once, as "1 Thru 48". patch_controller speaks for all of them.'''
+    def __init__(self, Generator, Parameter, channels, patch_controller, property_name, value):
+        self._batch_patch_controller = patch_controller
+        channel = simplify_channels_list(ChannelSet.from_channels(channels))
+        super().__init__(Generator, Parameter, channel, property_name, value, sender=CPV)
+
+    def find_my_patch_controller(self):
+        return self._batch_patch_controller
 
 
 def test_publisher(SENSITIVITY): # Return True for fail, False for pass
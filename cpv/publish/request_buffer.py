@@ -0,0 +1,173 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import numpy as np   # type: ignore
+
+'''
+During playback and frame change, every controller drops its CPV requests in here instead of
+sending them right away. Then, in frame_change_post, the harmonizer looks at all of them at once.
+
+A plain list of (Generator, Parameter, channel, parameter, value) tuples works, but the harmonizer
+then has to walk that list in Python and rebuild dictionaries of tuples several times per frame.
+With several mixers and influencers overlapping, that's tens of thousands of tuple operations
+every frame.
+
+So instead, we store the requests "struct of arrays" style. Instead of one list of rows, we keep
+one column per field:
+
+    channels:      [1, 2, 3, 1, ...]                    (integers)
+    property_ids:  [0, 0, 0, 1, ...]                    (each property name gets an integer id)
+    values:        [[50, 0, 0], [50, 0, 0], ...]        (floats, color tuples padded with zeros)
+    widths:        [1, 1, 1, 3, ...]                    (how many of those value slots are real)
+
+Now, "find the highest value for each channel/parameter" is a sort and a slice over whole
+arrays instead of a Python loop. See harmonize.py for the operations themselves.
+
+Generators and Parameters are Python objects that NumPy can't do math on, so they are interned
+into small tables and the columns only hold their integer ids. We also keep the original raw
+values so that anything the harmonizer passes through unchanged is published exactly as it came in.
+'''
+
+MAX_VALUE_WIDTH = 5  # rgbaw and rgbam are the widest values we send
+
+
+class ChangeRequestBuffer:
+    '''Collects CPV requests during a frame. Appending is cheap; freeze() builds the arrays once.'''
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._generators = _InternTable()
+        self._parameters = _InternTable()
+        self._property_names = _InternTable()
+        self._generator_ids = []
+        self._parameter_ids = []
+        self._channels = []
+        self._property_ids = []
+        self._raw_values = []
+
+    def append(self, Generator, Parameter, channel, property_name, value):
+        self._generator_ids.append(self._generators.intern(Generator))
+        self._parameter_ids.append(self._parameters.intern(Parameter))
+        self._channels.append(channel)
+        self._property_ids.append(self._property_names.intern(property_name))
+        self._raw_values.append(value)
+
+    def __len__(self):
+        return len(self._channels)
+
+    def __iter__(self):
+        return iter(self.freeze())
+
+
+    def freeze(self):
+        num_requests = len(self._channels)
+        values = np.zeros((num_requests, MAX_VALUE_WIDTH), dtype=np.float64)
+        widths = np.ones(num_requests, dtype=np.int64)
+
+        for row, value in enumerate(self._raw_values):
+            if isinstance(value, tuple):
+                widths[row] = len(value)
+                values[row, :len(value)] = value
+            else:
+                values[row, 0] = value
+
+        return ChangeRequestTable(
+            generators=self._generators.objects,
+            parameters=self._parameters.objects,
+            property_names=self._property_names.objects,
+            generator_ids=np.asarray(self._generator_ids, dtype=np.int64),
+            parameter_ids=np.asarray(self._parameter_ids, dtype=np.int64),
+            channels=np.asarray(self._channels, dtype=np.int64),
+            property_ids=np.asarray(self._property_ids, dtype=np.int64),
+            values=values,
+            widths=widths,
+            raw_values=list(self._raw_values)
+        )
+
+
+class ChangeRequestTable:
+    '''Frozen, columnar view of a frame's CPV requests. Every column has one entry per request.'''
+    def __init__(self, generators, parameters, property_names, generator_ids, parameter_ids,
+                 channels, property_ids, values, widths, raw_values):
+        self.generators = generators
+        self.parameters = parameters
+        self.property_names = property_names
+        self.generator_ids = generator_ids
+        self.parameter_ids = parameter_ids
+        self.channels = channels
+        self.property_ids = property_ids
+        self.values = values
+        self.widths = widths
+        self.raw_values = raw_values
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield (
+                self.generators[self.generator_ids[row]],
+                self.parameters[self.parameter_ids[row]],
+                int(self.channels[row]),
+                self.property_names[self.property_ids[row]],
+                self.raw_values[row]
+            )
+
+    def take(self, rows):
+        '''Returns a new table with only the given rows, in the given order.'''
+        return ChangeRequestTable(
+            generators=self.generators,
+            parameters=self.parameters,
+            property_names=self.property_names,
+            generator_ids=self.generator_ids[rows],
+            parameter_ids=self.parameter_ids[rows],
+            channels=self.channels[rows],
+            property_ids=self.property_ids[rows],
+            values=self.values[rows],
+            widths=self.widths[rows],
+            raw_values=[self.raw_values[row] for row in rows]
+        )
+
+    def with_values(self, values):
+        '''Returns a copy of this table where every row's value was replaced (used by averaging).'''
+        raw_values = [
+            tuple(float(v) for v in row_values[:width]) if isinstance(raw_value, tuple) else float(row_values[0])
+            for row_values, width, raw_value in zip(values, self.widths, self.raw_values)
+        ]
+        return ChangeRequestTable(
+            generators=self.generators,
+            parameters=self.parameters,
+            property_names=self.property_names,
+            generator_ids=self.generator_ids,
+            parameter_ids=self.parameter_ids,
+            channels=self.channels,
+            property_ids=self.property_ids,
+            values=values,
+            widths=self.widths,
+            raw_values=raw_values
+        )
+
+    def group_keys(self, *column_names):
+        '''Stacks the named columns side by side so rows can be grouped with np.unique(axis=0).'''
+        columns = []
+        for column_name in column_names:
+            column = getattr(self, column_name)
+            columns.append(column if column.ndim == 2 else column[:, np.newaxis])
+        return np.hstack([column.astype(np.float64) for column in columns]) if columns else np.empty((len(self), 0))
+
+
+class _InternTable:
+    '''Gives each distinct object a small integer id, so columns can hold ints instead of objects.'''
+    def __init__(self):
+        self.objects = []
+        self._ids = {}
+
+    def intern(self, obj):
+        try:
+            return self._ids[obj]
+        except KeyError:
+            self._ids[obj] = len(self.objects)
+            self.objects.append(obj)
+            return self._ids[obj]
@@ -2,6 +2,57 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from functools import lru_cache
+
+import numpy as np   # type: ignore
+
+from ..utils.cpv_utils import color_object_to_tuple_and_scale_up
+
+'''
+Blender thinks in red, green, and blue. Lots of fixtures don't. An RGBW fixture has a white
+emitter too, an RGBAW has amber and white, a CMY fixture subtracts color instead of adding it.
+The ColorSplitter turns Blender's color into whatever the fixture actually has, and then applies
+the fixture's white balance.
+
+This used to be the most expensive thing we did per fixture: build a dictionary of converters,
+scale the color up twice, and do the converter's math in Python, for every fixture, every frame.
+Two things make it cheap now:
+
+    1. A lookup table (the LUT). The console only ever sees values rounded to its rounding_points
+       (whole numbers for Eos). So we round the color and white balance to that first, and then
+       remember the answer for (profile, color, white balance). A fixture holding still, or 40
+       fixtures all getting the same color from one influencer, only does the math once. The LUT
+       keeps the LUT_SIZE most recently used answers.
+
+    2. A batch version (split_many). A mixer gradient gives every fixture its own color, so there's
+       nothing to remember. Instead, split_many takes all the colors at once as one NumPy array,
+       sorts the fixtures by (profile, white balance), and does each converter's math on a whole
+       column of colors in one go. The array versions of the converters below follow the one-color
+       versions step by step, so both paths give exactly the same numbers.
+
+White balance only scales the first three values (red, green, blue or cyan, magenta, yellow).
+Amber, white, lime, and mint come through as the converter made them.
+'''
+
+LUT_SIZE = 65536
+BALANCED = (100, 100, 100)
+SUBTRACTIVE_PROFILES = {'cmy'}
+RELATIVE_PREFIXES = ('raise_', 'lower_')
+
+# {profile: (converter name, number of values, which values come out as whole numbers)}
+PROFILE_CONVERTERS = {
+    'rgb': ('rgb_converter', 3, ()),
+    'rgba': ('rgba_converter', 4, (3,)),
+    'rgbw': ('rgbw_converter', 4, (3,)),
+    'rgbaw': ('rgbaw_converter', 5, (3, 4)),
+    'rgbl': ('rgbl_converter', 4, (3,)),
+    'cmy': ('cmy_converter', 3, (0, 1, 2)),
+    'rgbam': ('rgbam_converter', 5, (3, 4))
+}
+
+AMBER_TARGET = (100, 50, 0)
+WHITE_TARGET = (100, 100, 100)
+
 
 class ColorSplitter:
     def __init__(self, generator, publisher):
@@ -9,136 +60,126 @@ class ColorSplitter:
         self.publisher = publisher
 
     def execute(self):
-        pf = getattr(self.publisher.patch_controller, "color_profile_enum")
-
-        profile_converters = {
-            # Absolute Arguments
-            'rgba': (self.rgba_converter, 4),
-            'rgbw': (self.rgbw_converter, 4),
-            'rgbaw': (self.rgbaw_converter, 5),
-            'rgbl': (self.rgbl_converter, 4),
-            'cmy': (self.cmy_converter, 3),
-            'rgbam': (self.rgbam_converter, 5),
-
-            # Raise Arguments
-            'raise_rgba': (self.rgba_converter, 4),
-            'raise_rgbw': (self.rgbw_converter, 4),
-            'raise_rgbaw': (self.rgbaw_converter, 5),
-            'raise_rgbl': (self.rgbl_converter, 4),
-            'raise_cmy': (self.cmy_converter, 3),
-            'raise_rgbam': (self.rgbam_converter, 5),
-
-            # Lower Arguments
-            'lower_rgba': (self.rgba_converter, 4),
-            'lower_rgbw': (self.rgbw_converter, 4),
-            'lower_rgbaw': (self.rgbaw_converter, 5),
-            'lower_rgbl': (self.rgbl_converter, 4),
-            'lower_cmy': (self.cmy_converter, 3),
-            'lower_rgbam': (self.rgbam_converter, 5)
-        }
-
-        mode = pf.replace("option_", "")
-        corrected_key = self.publisher.property_name.replace("color", mode)
-
-        is_subtractive = corrected_key in ['cmy', 'raise_cmy', 'lower_cmy']
-
-        white_balance = getattr(self.publisher.patch_controller, "alva_white_balance")
-        from ..utils.cpv_utils import color_object_to_tuple_and_scale_up
-        white_balance = color_object_to_tuple_and_scale_up(white_balance)
-
-        color_value = color_object_to_tuple_and_scale_up(self.publisher.value)
-
-        if corrected_key in ['rgb', 'raise_rgb', 'lower_rgb']: # No need to split
-            balanced = self.balance_white(white_balance, color_value, is_subtractive)
-            return corrected_key, balanced
-            
-        elif corrected_key in profile_converters: # Must split
-            converter, num_values = profile_converters[corrected_key]
-            converted_values = converter(*color_value[:3])
-            balanced = self.balance_white(white_balance, converted_values, is_subtractive)
-            return corrected_key, balanced[:num_values]
-        
-        else: raise ValueError(f"Unknown color profile: {corrected_key}")
-    
-
-    def calculate_closeness(self, rgb_input, target_rgb, sensitivity=1.0):
+        patch_controller = self.publisher.patch_controller
+        corrected_key, profile = self.find_corrected_key(self.publisher.property_name, patch_controller)
+        rounding_points = self._find_rounding_points(getattr(self.publisher, "LightingConsole", None))
+
+        color = quantize(color_object_to_tuple_and_scale_up(self.publisher.value), rounding_points)
+        white_balance = quantize(color_object_to_tuple_and_scale_up(patch_controller.alva_white_balance), rounding_points)
+        return corrected_key, split_one_color(profile, color, white_balance)
+
+    @staticmethod
+    def find_corrected_key(property_name, patch_controller):
+        '''"raise_color" on an RGBW fixture becomes ("raise_rgbw", "rgbw").'''
+        mode = patch_controller.color_profile_enum.replace("option_", "")
+        corrected_key = property_name.replace("color", mode)
+        profile = corrected_key
+        for prefix in RELATIVE_PREFIXES:
+            if profile.startswith(prefix):
+                profile = profile[len(prefix):]
+        if profile not in PROFILE_CONVERTERS:
+            raise ValueError(f"Unknown color profile: {corrected_key}")
+        return corrected_key, profile
+
+    @staticmethod
+    def _find_rounding_points(LightingConsole):
+        return getattr(LightingConsole, "rounding_points", 0)
+
+
+    @classmethod
+    def split_many(cls, Generator, property_name, channels, colors):
+        '''
+        Splits one color per channel, all at once. colors is anything NumPy can make an (N, 3) array
+        out of, in Blender's 0-1 scale. Returns [(corrected property name, values), ...], one per
+        channel, ready to hand to Publish in place of ("color", color).
+        '''
+        from .publish.publish import Publish
+
+        if not channels:
+            return []
+
+        rounding_points = cls._find_rounding_points(Publish.find_installed_lighting_console_data_class())
+        colors = np.round(np.asarray(colors, dtype=np.float64).reshape(len(channels), 3) * 100, rounding_points)
+
+        patch_controllers = [Publish.find_patch_controller(Generator, channel) for channel in channels]
+        groups = {}  # {(corrected key, profile, white balance): [rows]}
+        for row, patch_controller in enumerate(patch_controllers):
+            corrected_key, profile = cls.find_corrected_key(property_name, patch_controller)
+            white_balance = quantize(color_object_to_tuple_and_scale_up(patch_controller.alva_white_balance), rounding_points)
+            groups.setdefault((corrected_key, profile, white_balance), []).append(row)
+
+        results = [None] * len(channels)
+        for (corrected_key, profile, white_balance), rows in groups.items():
+            split_rows = split_color_array(profile, colors[rows], white_balance)
+            for row, values in zip(rows, split_rows):
+                results[row] = (corrected_key, values)
+        return results
+
+
+    @staticmethod
+    def calculate_closeness(rgb_input, target_rgb, sensitivity=1.0):
         diff = sum(abs(input_c - target_c) for input_c, target_c in zip(rgb_input, target_rgb))
         normalized_diff = diff / (300 * sensitivity)
         closeness_score = max(0, min(1, 1 - normalized_diff))
         return closeness_score
 
 
-    def rgb_converter(self, red, green, blue):
+    @staticmethod
+    def rgb_converter(red, green, blue):
         return red, green, blue
-        
-            
-    def rgba_converter(self, red, green, blue):
+
+
+    @staticmethod
+    def rgba_converter(red, green, blue):
         # Calculate the influence of red and the lack of green on the amber component.
         red_influence = red / 100
         green_deficit = 1 - abs(green - 50) / 50
         amber_similarity = red_influence * green_deficit
         white_similarity = min(red, green, blue) / 100
-        
+
         if amber_similarity > white_similarity:
             amber = round(amber_similarity * 100)
         else:
             amber = round(75 * white_similarity)
-            
+
         return red, green, blue, amber
 
-        
-    def rgbw_converter(self, red, green, blue):
+
+    @staticmethod
+    def rgbw_converter(red, green, blue):
         white_similarity = min(red, green, blue) / 100
         white_peak = 75 + (25 * white_similarity)  # Peaks at 100 for pure white.
 
         white = round(white_peak * white_similarity)
-        
+
         return red, green, blue, white
 
 
-    def rgbaw_converter(self, red, green, blue):
-        amber_sensitivity=1.0
-        white_sensitivity=1.0
-        
-        # Define pure color values for comparison
-        pure_colors = {
-            'amber': (100, 50, 0),
-            'white': (100, 100, 100),
-            'red': (100, 0, 0),
-            'green': (0, 100, 0),
-            'blue': (0, 0, 100)
-        }
-        
-        # Calculate closeness scores for each target color, specifying sensitivity where needed.
-        scores = {}
-        for color, rgb in pure_colors.items():
-            if color == 'amber':
-                scores[color] = self.calculate_closeness((red, green, blue), rgb, amber_sensitivity)
-            elif color == 'white':
-                scores[color] = self.calculate_closeness((red, green, blue), rgb, white_sensitivity)
-            else:
-                scores[color] = self.calculate_closeness((red, green, blue), rgb)
-                
-        amber = round(scores['amber'] * 100)
-        white = round(scores['white'] * 100)
+    @staticmethod
+    def rgbaw_converter(red, green, blue):
+        # Only amber and white are new emitters. Red, green, and blue pass straight through.
+        amber = round(ColorSplitter.calculate_closeness((red, green, blue), AMBER_TARGET) * 100)
+        white = round(ColorSplitter.calculate_closeness((red, green, blue), WHITE_TARGET) * 100)
 
         return red, green, blue, amber, white
 
 
-    def rgbl_converter(self, red, green, blue):
+    @staticmethod
+    def rgbl_converter(red, green, blue):
         lime = 0
-        
+
         # Lime peaks at 100 for yellow (100, 100, 0) and white (100, 100, 100).
         if red == 100 and green == 100:
             lime = 100
         # For other combinations, calculate lime based on the lesser of red and green, but only if blue is not dominant.
         elif blue < red and blue < green:
             lime = round((min(red, green) / 100) * 100)
-        
+
         return red, green, blue, lime
 
 
-    def rgbam_converter(self, red, green, blue):
+    @staticmethod
+    def rgbam_converter(red, green, blue):
         # Handle exact targets with conditional logic.
         if (red, green, blue) == (0, 0, 0):  # Black
             amber, mint = 0, 0
@@ -158,16 +199,17 @@ class ColorSplitter:
             proximity_to_white = min(red, green, blue) / 100
             amber = round(100 * proximity_to_white)
             mint = round(100 * proximity_to_white)
-            
+
             # Adjust for proximity to the specific mint peak color.
             if green == 100 and red > 0 and blue > 0:
                 mint_peak_proximity = min(red / 58, blue / 14)
                 mint = round(100 * mint_peak_proximity)
-        
+
         return red, green, blue, amber, mint
 
 
-    def cmy_converter(self, red, green, blue):
+    @staticmethod
+    def cmy_converter(red, green, blue):
         # Define a tolerance for near-maximum RGB values to treat them as 1.
         tolerance = 0.01
         red_scaled = red / 100.0
@@ -180,24 +222,140 @@ class ColorSplitter:
         yellow = int((1 - min(blue_scaled + tolerance, 1)) * 100)
 
         return cyan, magenta, yellow
-    
-
-    def balance_white(self, white_balance, converted_values, is_subtractive=False):
-        if white_balance != (100, 100, 100): # Must balance
-            if is_subtractive:
-                balanced_values = tuple(
-                    min(max(100 - ((100 - cv) * wb / 100), 0), 100)
-                    for cv, wb in zip(converted_values, white_balance)
-                )
-            else:
-                balanced_values = tuple(
-                    int(cv * wb / 100) for cv, wb in zip(converted_values, white_balance)
-                )
-            return balanced_values
-            
-        else: # No need to balance
+
+
+    @staticmethod
+    def balance_white(white_balance, converted_values, is_subtractive=False):
+        if white_balance == BALANCED: # No need to balance
             return converted_values
 
+        if is_subtractive:
+            balanced_values = tuple(
+                min(max(100 - ((100 - cv) * wb / 100), 0), 100)
+                for cv, wb in zip(converted_values, white_balance)
+            )
+        else:
+            balanced_values = tuple(
+                int(cv * wb / 100) for cv, wb in zip(converted_values, white_balance)
+            )
+        return balanced_values + tuple(converted_values[len(white_balance):])
+
+
+def quantize(values, rounding_points):
+    return tuple(float(round(value, rounding_points)) for value in values)
+
+
+@lru_cache(maxsize=LUT_SIZE)
+def split_one_color(profile, color, white_balance):
+    '''The LUT. color and white_balance must already be quantized, or nothing will ever repeat.'''
+    converter_name, num_values, _ = PROFILE_CONVERTERS[profile]
+    converted_values = getattr(ColorSplitter, converter_name)(*color[:3])
+    balanced = ColorSplitter.balance_white(white_balance, converted_values, profile in SUBTRACTIVE_PROFILES)
+    return tuple(balanced[:num_values])
+
+
+# Array versions of the converters. Each takes red, green, and blue columns and returns an (N, values) array.
+def _closeness_array(red, green, blue, target):
+    diff = np.abs(red - target[0]) + np.abs(green - target[1]) + np.abs(blue - target[2])
+    return np.clip(1 - diff / 300, 0, 1)
+
+
+def _rgb_array(red, green, blue):
+    return np.column_stack((red, green, blue))
+
+
+def _rgba_array(red, green, blue):
+    amber_similarity = (red / 100) * (1 - np.abs(green - 50) / 50)
+    white_similarity = np.minimum(np.minimum(red, green), blue) / 100
+    amber = np.where(amber_similarity > white_similarity, np.rint(amber_similarity * 100), np.rint(75 * white_similarity))
+    return np.column_stack((red, green, blue, amber))
+
+
+def _rgbw_array(red, green, blue):
+    white_similarity = np.minimum(np.minimum(red, green), blue) / 100
+    white = np.rint((75 + (25 * white_similarity)) * white_similarity)
+    return np.column_stack((red, green, blue, white))
+
+
+def _rgbaw_array(red, green, blue):
+    amber = np.rint(_closeness_array(red, green, blue, AMBER_TARGET) * 100)
+    white = np.rint(_closeness_array(red, green, blue, WHITE_TARGET) * 100)
+    return np.column_stack((red, green, blue, amber, white))
+
+
+def _rgbl_array(red, green, blue):
+    lime = np.where(
+        (red == 100) & (green == 100), 100,
+        np.where((blue < red) & (blue < green), np.rint((np.minimum(red, green) / 100) * 100), 0)
+    )
+    return np.column_stack((red, green, blue, lime))
+
+
+def _rgbam_array(red, green, blue):
+    proximity_to_white = np.minimum(np.minimum(red, green), blue) / 100
+    amber = np.rint(100 * proximity_to_white)
+    mint_peak_proximity = np.minimum(red / 58, blue / 14)
+    mint = np.where((green == 100) & (red > 0) & (blue > 0), np.rint(100 * mint_peak_proximity), amber)
+
+    def is_exactly(r, g, b):
+        return (red == r) & (green == g) & (blue == b)
+
+    exact_targets = [  # Same order as rgbam_converter: first match wins
+        ((0, 0, 0), (0, 0)), ((100, 0, 0), (0, 0)), ((0, 100, 0), (0, 0)), ((0, 0, 100), (0, 0)),
+        ((100, 100, 100), (100, 100)), ((58, 100, 14), (0, 100)), ((100, 50, 0), (100, 0))
+    ]
+    conditions = [is_exactly(*target) for target, _ in exact_targets]
+    amber = np.select(conditions, [result[0] for _, result in exact_targets], default=amber)
+    mint = np.select(conditions, [result[1] for _, result in exact_targets], default=mint)
+    return np.column_stack((red, green, blue, amber, mint))
+
+
+def _cmy_array(red, green, blue):
+    tolerance = 0.01
+    return np.column_stack([
+        np.trunc((1 - np.minimum(value / 100.0 + tolerance, 1)) * 100) for value in (red, green, blue)
+    ])
+
+
+ARRAY_CONVERTERS = {
+    'rgb': _rgb_array,
+    'rgba': _rgba_array,
+    'rgbw': _rgbw_array,
+    'rgbaw': _rgbaw_array,
+    'rgbl': _rgbl_array,
+    'cmy': _cmy_array,
+    'rgbam': _rgbam_array
+}
+
+
+def split_color_array(profile, colors, white_balance):
+    '''colors is an (N, 3) array already scaled to 0-100 and quantized. Returns a list of value tuples.'''
+    _, num_values, whole_number_columns = PROFILE_CONVERTERS[profile]
+    converted = ARRAY_CONVERTERS[profile](colors[:, 0], colors[:, 1], colors[:, 2])
+
+    is_balancing = white_balance != BALANCED
+    if is_balancing:
+        white_balance = np.asarray(white_balance, dtype=np.float64)
+        if profile in SUBTRACTIVE_PROFILES:
+            converted[:, :3] = np.minimum(np.maximum(100 - ((100 - converted[:, :3]) * white_balance / 100), 0), 100)
+            whole_number_columns = tuple(column for column in whole_number_columns if column >= 3)
+        else:
+            converted[:, :3] = np.trunc(converted[:, :3] * white_balance / 100)
+            whole_number_columns = tuple(range(num_values))
+
+    return _to_python_values(converted[:, :num_values], whole_number_columns)
+
+
+def _to_python_values(values, whole_number_columns):
+    '''Matches the one-color path exactly: whole-number emitters come out as int, the rest as float.'''
+    rows = values.tolist()
+    if not whole_number_columns:
+        return [tuple(row) for row in rows]
+    return [
+        tuple(int(value) if column in whole_number_columns else value for column, value in enumerate(row))
+        for row in rows
+    ]
+
 
 def test_split_color(SENSITIVITY): # Return True for fail, False for pass
-    return False
\ No newline at end of file
+    return False
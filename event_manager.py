@@ -7,13 +7,17 @@ from bpy.app.handlers import persistent
 import time
 
 from .assets.dictionaries import Dictionaries
-from .cpv.find import Find
+from .cpv.find import ControllerRegistry, NodeGraphIndex
 from .cpv.harmonize import Harmonizer
-from .maintenance.logging import alva_log
-from .utils.audio_utils import render_volume
-from .utils.event_utils import EventUtils as Utils
+from .cpv.publish.console_mirror import ConsoleMirror
+from .maintenance.logging import alva_log, LogCategories
+from .maintenance.profiler import FrameProfiler
+from .utils.audio_utils import BatchedVolumeRenderer, ClosestPointIndex
+from .utils.cpv_utils import PatchIndex, FixtureSpatialIndex
+from .utils.event_utils import EventUtils as Utils, AnimatedPropertyIndex, DriverIndex
 from .utils.osc import OSC
 from .utils.sequencer_mapping import StripMapper
+from .utils.strip_index import StripIndex
 
 DEBUG = False
 stored_channels = set()
@@ -287,6 +291,7 @@ class EventManager:
         self.old_graph = []
         self.controllers = []
         self.mixers_and_motors = []
+        self.animated_properties = AnimatedPropertyIndex()
         
         
     #-------------------------------------------------------------------------------------------------------------------------------------------
@@ -297,21 +302,12 @@ class EventManager:
         if not hasattr(scene, "sequence_editor") or not scene.sequence_editor:
             return
 
-        sound_object_strips = [list comprehension]
-        for sound_object in sound_object strips:
-            render_volume()
+        BatchedVolumeRenderer(scene).execute()
         '''
         if not hasattr(scene, "sequence_editor") or not scene.sequence_editor:
             return
         
-        for strip in scene.sequence_editor.sequences_all:
-            if strip.type == 'SOUND' and strip.selected_stage_object:
-                sound_object = bpy.data.objects[strip.selected_stage_object.name]
-
-                for speaker_list in sound_object.speaker_list:
-                    if speaker_list.name == strip.name:
-                        for speaker in speaker_list.speakers:
-                            speaker.dummy_volume = render_volume(speaker.speaker_pointer, sound_object, strip.int_sound_cue)
+        BatchedVolumeRenderer(scene).execute()
 
 
     #-------------------------------------------------------------------------------------------------------------------------------------------
@@ -336,8 +332,32 @@ class EventManager:
             Utils.driver_update(updated_objects)
         '''
 
+        if depsgraph and depsgraph.id_type_updated('OBJECT'):
+            PatchIndex.invalidate_if_objects_changed()
+            DriverIndex.invalidate_if_objects_changed()
+            FixtureSpatialIndex.invalidate_if_objects_changed()
+            FixtureSpatialIndex.update_transforms(
+                update.id.original for update in depsgraph.updates
+                if isinstance(update.id, bpy.types.Object) and update.is_updated_transform
+            )
+
+        if depsgraph and depsgraph.id_type_updated('ACTION'):
+            self.animated_properties.invalidate()
+
+        if depsgraph and depsgraph.id_type_updated('COLLECTION'):
+            ControllerRegistry.invalidate()  # Objects may have been added or removed
+
+        if depsgraph and depsgraph.id_type_updated('NODETREE'):
+            ControllerRegistry.invalidate()  # Nodes may have been added or removed
+
+        if depsgraph and depsgraph.id_type_updated('MESH'):
+            ClosestPointIndex.invalidate()  # Audio object mesh may have been edited
+
         if not depsgraph or scene.scene_props.in_frame_change or scene.scene_props.is_playing:
             return
+
+        if depsgraph.id_type_updated('SCENE') and StripIndex.invalidate_if_strips_changed(scene):
+            ControllerRegistry.invalidate()  # Animation strips may have been added or deleted
         
         if DEBUG: alva_log("event_manager", f"Depsgraph POST handler called. in_frame_change: {scene.scene_props.in_frame_change}")
 
@@ -402,8 +422,8 @@ class EventManager:
 
         '''
         Utils.use_harmonizer(True)
-        objects_with_drivers = {obj for obj in scene.objects if obj.animation_data and obj.animation_data.drivers}
-        Utils.check_and_trigger_drivers(objects_with_drivers)
+        objects_with_drivers = DriverIndex.objects_with_drivers(scene)
+        Utils.check_and_trigger_drivers(objects_with_drivers, check_for_changes=False)
         '''
 
 
@@ -412,11 +432,11 @@ class EventManager:
         Utils.use_harmonizer(True)
 
         '''A1:3.1'''
-        objects_with_drivers = {obj for obj in scene.objects if obj.animation_data and obj.animation_data.drivers}
-        Utils.check_and_trigger_drivers(objects_with_drivers)
+        objects_with_drivers = DriverIndex.objects_with_drivers(scene)
+        Utils.check_and_trigger_drivers(objects_with_drivers, check_for_changes=False)  # Drivers don't get edited mid-frame
 
         '''A1:3.2'''
-        dynamic_objects = {obj for obj in scene.objects if obj.animation_data and (obj.object_identities_enum in ["Influencer", "Brush", "Key"] or obj.int_alva_sem != 0)}
+        dynamic_objects = ControllerRegistry.find_dynamic_objects(scene)
         for obj in dynamic_objects:
             Utils.trigger_special_update(obj)
             if obj.int_alva_sem != 0:
@@ -424,20 +444,24 @@ class EventManager:
 
         if not scene.scene_props.is_playing or not self.controllers:
             '''A1:1 and B1:3'''
-            self.controllers, self.mixers_and_motors = Find.find_controllers(scene)
+            with FrameProfiler.stage("find_controllers"):
+                self.controllers, self.mixers_and_motors = ControllerRegistry.find_controllers(scene)
 
         Utils.trigger_special_mixer_props(self.mixers_and_motors)
 
         current_controllers = self.controllers
         if DEBUG: alva_log("event_manager", f"Current controllers: {current_controllers}")
         
-        new_graph = Utils.convert_to_props(scene, current_controllers)
+        with FrameProfiler.stage("convert_to_props"):
+            new_graph = Utils.convert_to_props(scene, current_controllers, self.animated_properties)
         '''A1:2'''
-        updates = Utils.find_updates(self.old_graph, new_graph)
+        with FrameProfiler.stage("find_updates"):
+            updates = Utils.find_updates(self.old_graph, new_graph)
         if DEBUG: alva_log("event_manager", f"Updates: {updates}")
         
         '''A1:4,6'''
-        Utils.fire_updaters(updates)
+        with FrameProfiler.stage("fire_updaters"):
+            Utils.fire_updaters(updates)
         Utils.use_harmonizer(False)
         
         self.old_graph = new_graph
@@ -462,11 +486,13 @@ class EventManager:
         relevant_cue_strip = Utils.find_livemap_cue(scene, current_frame, active_strip)
                         
         if not relevant_cue_strip:
-            scene.livemap_label = "Livemap Cue: "
-            return 
-        
-        '''A1:8'''
-        scene.livemap_label = f"Livemap Cue: {relevant_cue_strip.eos_cue_number}"
+            label = "Livemap Cue: "
+        else:
+            '''A1:8'''
+            label = f"Livemap Cue: {relevant_cue_strip.eos_cue_number}"
+
+        if scene.livemap_label != label:  # Writing it anyway is a scene update, which makes the depsgraph handler recheck every strip
+            scene.livemap_label = label
    
            
     #-------------------------------------------------------------------------------------------------------------------------------------------
@@ -475,6 +501,9 @@ class EventManager:
     def start_timecode_session(self, scene):
         '''DOCUMENTATION CODE C1'''
         scene.scene_props.is_playing = True
+        self.animated_properties.invalidate()  # Fresh index for each playback session
+        ConsoleMirror.reset()  # Console may have been changed by hand since we last sent
+        BatchedVolumeRenderer.reset()
 
         # Go house down.
         '''C1:1'''
@@ -530,6 +559,7 @@ class EventManager:
         
         '''DOCUMENTATION CODE C3'''
         scene.scene_props.is_playing = False
+        ConsoleMirror.reset()  # Playback is over, so the console is anybody's again
         
         # Go house up.
         if scene.house_up_on_stop:
@@ -566,48 +596,75 @@ class EventManager:
 
         '''A2:2'''
         if DEBUG: alva_log("harmonize", f"HARMONIZER SESSION:\nchange_requests: {[request[1:] for request in change_requests]}")
-        no_duplicates = Harmonizer.remove_duplicates(change_requests)
-        if DEBUG: alva_log("harmonize", f"no_duplicates: {[request[1:] for request in no_duplicates]}")
-        if scene.scene_props.is_democratic:
-            no_conflicts = Harmonizer.democracy(no_duplicates)
-            if DEBUG: alva_log("harmonize", f"Democratic. no_conflicts: {[request[1:] for request in no_conflicts]}")
-        else:
-            no_conflicts = Harmonizer.highest_takes_precedence(no_duplicates)
-            if DEBUG: alva_log("harmonize", f"HTP. no_conflicts: {[request[1:] for request in no_conflicts]}")
-        simplified = Harmonizer.simplify(no_conflicts)
+        with FrameProfiler.stage("harmonize"):
+            no_duplicates = Harmonizer.remove_duplicates(change_requests.freeze())
+            if DEBUG: alva_log("harmonize", f"no_duplicates: {[request[1:] for request in no_duplicates]}")
+            if scene.scene_props.is_democratic:
+                no_conflicts = Harmonizer.democracy(no_duplicates)
+                if DEBUG: alva_log("harmonize", f"Democratic. no_conflicts: {[request[1:] for request in no_conflicts]}")
+            else:
+                no_conflicts = Harmonizer.highest_takes_precedence(no_duplicates)
+                if DEBUG: alva_log("harmonize", f"HTP. no_conflicts: {[request[1:] for request in no_conflicts]}")
+            simplified = Harmonizer.simplify(no_conflicts)
         if DEBUG: alva_log("harmonize", f"simplified: {[request[1:] for request in simplified]}\n")
 
         from .cpv.publish.publish import Publish, EVENT_MANAGER
         batch_size = scene.scene_props.int_argument_size
         batch, address = [], None
+        messages = []
 
-        for i, request in enumerate(simplified):
+        for request in simplified:
             '''A2:3'''
-            full_argument, addr = Publish(*request, sender=EVENT_MANAGER, is_already_harmonized=True).execute()
+            with FrameProfiler.stage("publish"):
+                full_argument, addr = Publish(*request, sender=EVENT_MANAGER, is_already_harmonized=True).execute()
+
+            if full_argument is None:  # The console already has this value (see console_mirror.py)
+                continue
 
             if not address:
                 address = addr  # Set address from the first request in batch
             elif address != addr:
                 print(f"Warning: Multiple OSC addresses detected. Sending separately.")
-                '''A2:4'''
-                OSC.send_osc_lighting(address, ", ".join(batch), user=0)
+                messages.append((address, ", ".join(batch)))
                 batch, address = [], addr  # Reset batch with new address
             
             batch.append(full_argument)
 
             '''A2:31'''
-            if len(batch) >= batch_size or i == len(simplified) - 1:
-                '''A2:4'''
-                OSC.send_osc_lighting(address, ", ".join(batch), user=0)
+            if len(batch) >= batch_size:
+                messages.append((address, ", ".join(batch)))
                 batch, address = [], None  # Reset batch
 
+        if batch:
+            messages.append((address, ", ".join(batch)))
+
+        '''A2:4'''
+        with FrameProfiler.stage("osc_enqueue"):  # Only hands messages to the sender thread. The network time isn't in here.
+            self.send_frame_messages(messages)
+
         if not scene.scene_props.is_playing:
             scene.scene_props.in_frame_change = False
+            ConsoleMirror.reset()  # Only playback gets to skip repeats. See console_mirror.py.
 
         '''A2:5'''
         Utils.clear_requests()
         Utils.use_harmonizer(False)
 
+    def send_frame_messages(self, messages):
+        '''Consoles that understand OSC bundles get the whole frame in as few UDP packets as possible.
+           Everyone else gets one message per batch like before.'''
+        if not messages:
+            return
+
+        from .cpv.publish.publish import Publish
+        LightingConsole = Publish.find_installed_lighting_console_data_class()
+
+        if getattr(LightingConsole, "supports_osc_bundles", False):
+            OSC.send_osc_lighting_bundle(messages, user=0)
+        else:
+            for address, argument in messages:
+                OSC.send_osc_lighting(address, argument, user=0)
+
 
 event_manager_instance = EventManager()
 
@@ -628,14 +685,19 @@ def load_macro_buttons(string): # bpy passes string, but we don't need it here.
 
 @persistent
 def on_depsgraph_update_pre(scene):
+    LogCategories.refresh(scene)
     event_manager_instance.render_audio_objects(scene)
 
 @persistent
 def on_depsgraph_update_post(scene, depsgraph):
     event_manager_instance.find_transform_updates_and_trigger_cpv(scene, depsgraph)
+    flush_influencer_memory()
 
 @persistent
 def on_frame_change_pre(scene):
+    LogCategories.refresh(scene)
+    FrameProfiler.enabled = scene.scene_props.profile_frames
+    FrameProfiler.begin_frame()
     start = time.time()
     event_manager_instance.timecode_scrubbing_and_fire_strip_mapping(scene)
     event_manager_instance.fire_parameter_updaters(scene)
@@ -654,6 +716,32 @@ def on_animation_playback_end(scene):
 @persistent
 def on_frame_change_post(scene):
     event_manager_instance.publish_pending_cpv_requests(scene)
+    flush_influencer_memory()
+    FrameProfiler.end_frame()
+
+@persistent
+def on_save_pre(filepath):
+    flush_influencer_memory()
+
+def flush_influencer_memory():
+    '''Right away, so the undo step Blender records after this update has the memory that goes with it.'''
+    from .cpv.influence_memory import InfluencerMemory
+    InfluencerMemory.flush_all()
+
+@persistent
+def on_blend_data_replaced(*args):
+    '''Undo, redo, and file load replace every ID, so runtime caches holding objects must let go.'''
+    from .cpv.influence_memory import InfluencerMemory
+    InfluencerMemory.reset()
+    PatchIndex.invalidate()
+    DriverIndex.invalidate()
+    ControllerRegistry.invalidate()
+    NodeGraphIndex.invalidate()
+    FixtureSpatialIndex.invalidate()
+    ConsoleMirror.reset()
+    BatchedVolumeRenderer.reset()
+    ClosestPointIndex.invalidate()
+    StripIndex.invalidate()
           
                     
 def register():
@@ -664,6 +752,10 @@ def register():
     bpy.app.handlers.frame_change_post.append(on_frame_change_post)
     bpy.app.handlers.animation_playback_pre.append(on_animation_playback)
     bpy.app.handlers.animation_playback_post.append(on_animation_playback_end)
+    bpy.app.handlers.save_pre.append(on_save_pre)
+    bpy.app.handlers.undo_post.append(on_blend_data_replaced)
+    bpy.app.handlers.redo_post.append(on_blend_data_replaced)
+    bpy.app.handlers.load_post.append(on_blend_data_replaced)
 
 
 def unregister():
@@ -673,4 +765,8 @@ def unregister():
     bpy.app.handlers.frame_change_pre.remove(on_frame_change_pre)
     bpy.app.handlers.frame_change_post.remove(on_frame_change_post)
     bpy.app.handlers.animation_playback_pre.remove(on_animation_playback)
-    bpy.app.handlers.animation_playback_post.remove(on_animation_playback_end)
\ No newline at end of file
+    bpy.app.handlers.animation_playback_post.remove(on_animation_playback_end)
+    bpy.app.handlers.save_pre.remove(on_save_pre)
+    bpy.app.handlers.undo_post.remove(on_blend_data_replaced)
+    bpy.app.handlers.redo_post.remove(on_blend_data_replaced)
+    bpy.app.handlers.load_post.remove(on_blend_data_replaced)
\ No newline at end of file
@@ -27,6 +27,7 @@ class CPV_LC_eos(spy.types.LightingConsole):
 
     osc_address = "/eos/newcmd"
     rounding_points = 0
+    supports_osc_bundles = True
 
     absolute = {
         "intensity": "# at $ Enter",
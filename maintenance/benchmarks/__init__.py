@@ -0,0 +1,23 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Headless benchmarks for the CPV pipeline. These run from a normal Python prompt, not inside
+Blender, so they can run the same way on every machine and every release.
+
+From inside the add-on folder:
+
+    python -m maintenance.benchmarks --fixtures 512 --output results.json
+
+It has to be run from there. Running it as part of the add-on package (from the folder above)
+imports the add-on's __init__.py first, which needs the real bpy before fake_bpy can step in.
+
+Run with --help for every option. Results come out as JSON, one entry per scenario.
+
+    fake_bpy.py:   Stand-ins for bpy and mathutils, and a way to import Sorcerer without Blender.
+    rig.py:        Makes up a show of any size: fixtures, group nodes, mixers, and influencers.
+    scenarios.py:  What gets timed, and the runner that times it.
+
+This folder is never imported by the add-on itself.
+'''
@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import ast
+import json
+import platform
+import sys
+
+import numpy as np   # type: ignore
+
+from .fake_bpy import ADDON_ROOT
+from .rig import RigGenerator
+from .scenarios import SCENARIOS, BenchmarkRunner
+
+'''
+Command line entry point. Builds a rig, runs the scenarios on it, and prints (or saves) one JSON
+document, so results from different releases can be lined up by a script instead of by eye.
+'''
+
+
+def find_sorcerer_version():
+    '''Reads bl_info out of the add-on's __init__.py without importing it.'''
+    tree = ast.parse((ADDON_ROOT / "__init__.py").read_text())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "bl_info" for target in node.targets):
+            return ".".join(str(part) for part in ast.literal_eval(node.value)["version"])
+    return None
+
+
+def parse_arguments(argv):
+    scenario_names = [Scenario.name for Scenario in SCENARIOS]
+    parser = argparse.ArgumentParser(description="Time Sorcerer's CPV pipeline on a synthetic rig, outside Blender.")
+    parser.add_argument("--fixtures", type=int, default=256, help="Number of fixtures (one channel each)")
+    parser.add_argument("--groups", type=int, default=8, help="Number of group nodes")
+    parser.add_argument("--mixers", type=int, default=8, help="Number of mixer nodes")
+    parser.add_argument("--influencers", type=int, default=4, help="Number of influencers")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the rig's random values")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per scenario before timing")
+    parser.add_argument("--scenario", action="append", choices=scenario_names, help="Only run this scenario (can be repeated)")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of printing them")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    generator = RigGenerator(args.fixtures, args.groups, args.mixers, args.influencers, args.seed)
+    rig = generator.execute()
+
+    scenario_classes = [Scenario for Scenario in SCENARIOS if not args.scenario or Scenario.name in args.scenario]
+    results = BenchmarkRunner(rig, scenario_classes, args.repeats, args.warmup).execute()
+
+    report = {
+        "sorcerer_version": find_sorcerer_version(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "rig": dict(rig.sizes, seed=args.seed),
+        "repeats": args.repeats,
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
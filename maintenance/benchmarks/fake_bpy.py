@@ -0,0 +1,282 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import sys
+import types
+import importlib
+from pathlib import Path
+
+import numpy as np   # type: ignore
+
+'''
+Sorcerer's CPV code imports bpy and mathutils at the top of almost every file, and those only
+exist inside Blender. To time the CPV pipeline from a normal Python prompt, we slip in small
+stand-ins for both before anything from Sorcerer is imported.
+
+The stand-ins are deliberately dumb:
+
+    - bpy.types.Whatever is an empty class you can subclass and hang attributes on.
+    - bpy.props.WhateverProperty(...) just remembers what it was called with.
+    - bpy.utils.register_class() and friends do nothing.
+    - bpy.context.scene and bpy.data.objects are filled in by the rig generator (rig.py).
+    - mathutils.Vector, Matrix, Color, kdtree.KDTree, and bvhtree.BVHTree are tiny NumPy-backed
+      versions with only the parts CPV and spatial audio use.
+
+None of this is for running Sorcerer. It's only enough for the benchmark scenarios to reach the
+code they time. Never import this from inside the add-on.
+'''
+
+ADDON_PACKAGE = "sorcerer"
+ADDON_ROOT = Path(__file__).resolve().parents[2]
+
+PROPERTY_FUNCTIONS = [
+    "BoolProperty", "BoolVectorProperty", "IntProperty", "IntVectorProperty", "FloatProperty",
+    "FloatVectorProperty", "StringProperty", "EnumProperty", "PointerProperty", "CollectionProperty"
+]
+
+
+class _AutoModule(types.ModuleType):
+    '''A module where any attribute you ask for exists. Classes for CapitalizedNames, no-op functions otherwise.'''
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = type(name, (), {}) if name[:1].isupper() else _noop
+        setattr(self, name, value)
+        return value
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def _make_property(name):
+    def property_function(*args, **kwargs):
+        return (name, kwargs)
+    property_function.__name__ = name
+    return property_function
+
+
+class FakeCollection(list):
+    '''Stands in for bpy.data.objects and CollectionProperty: a list you can also look up by name.'''
+    def __init__(self, items=(), item_factory=types.SimpleNamespace):
+        super().__init__(items)
+        self.item_factory = item_factory
+
+    def get(self, name, default=None):
+        return next((item for item in self if getattr(item, "name", None) == name), default)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return super().__getitem__(key)
+
+    def add(self):
+        item = self.item_factory()
+        self.append(item)
+        return item
+
+    def remove(self, item_or_index):
+        if isinstance(item_or_index, int):
+            del self[item_or_index]
+        else:
+            super().remove(item_or_index)
+
+
+# mathutils -----------------------------------------------------------------------------------------
+class Vector:
+    def __init__(self, values=(0, 0, 0)):
+        self._v = np.array(values, dtype=np.float64)
+
+    x = property(lambda self: self._v[0])
+    y = property(lambda self: self._v[1])
+    z = property(lambda self: self._v[2])
+
+    def __iter__(self):
+        return iter(self._v.tolist())
+
+    def __len__(self):
+        return len(self._v)
+
+    def __getitem__(self, index):
+        return self._v.tolist()[index]
+
+    def __add__(self, other):
+        return Vector(self._v + np.asarray(other, dtype=np.float64))
+
+    def __sub__(self, other):
+        return Vector(self._v - np.asarray(other, dtype=np.float64))
+
+    def __mul__(self, scalar):
+        return Vector(self._v * scalar)
+
+    def __truediv__(self, scalar):
+        return Vector(self._v / scalar)
+
+    def __array__(self, dtype=None, copy=None):
+        return self._v if dtype is None else self._v.astype(dtype)
+
+    def copy(self):
+        return Vector(self._v)
+
+    @property
+    def length(self):
+        return float(np.linalg.norm(self._v))
+
+
+class Color(Vector):
+    r = property(lambda self: self._v[0])
+    g = property(lambda self: self._v[1])
+    b = property(lambda self: self._v[2])
+
+
+class Matrix:
+    def __init__(self, rows=None):
+        self._m = np.identity(4) if rows is None else np.array(rows, dtype=np.float64)
+
+    @classmethod
+    def Translation(cls, location):
+        matrix = cls()
+        matrix._m[:3, 3] = location
+        return matrix
+
+    @classmethod
+    def Diagonal(cls, values):
+        return cls(np.diag(values))
+
+    def __iter__(self):
+        return iter(self._m.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        return self._m if dtype is None else self._m.astype(dtype)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self._m @ other._m)
+        point = np.append(np.asarray(other, dtype=np.float64), 1)
+        return Vector((self._m @ point)[:3])
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self._m))
+
+    def to_scale(self):
+        return Vector(np.linalg.norm(self._m[:3, :3], axis=0))
+
+    def to_translation(self):
+        return Vector(self._m[:3, 3])
+
+    @property
+    def translation(self):
+        return self.to_translation()
+
+
+class KDTree:
+    def __init__(self, size):
+        self._points = []
+        self._indices = []
+
+    def insert(self, point, index):
+        self._points.append(tuple(point))
+        self._indices.append(index)
+
+    def balance(self):
+        self._array = np.array(self._points, dtype=np.float64).reshape(len(self._points), 3)
+
+    def find_range(self, center, radius):
+        distances = np.linalg.norm(self._array - np.asarray(center, dtype=np.float64), axis=1)
+        return [(Vector(self._array[row]), self._indices[row], float(distances[row])) for row in np.nonzero(distances <= radius)[0]]
+
+    def find(self, center):
+        if not len(self._points):
+            return None, None, None
+        distances = np.linalg.norm(self._array - np.asarray(center, dtype=np.float64), axis=1)
+        row = int(np.argmin(distances))
+        return Vector(self._array[row]), self._indices[row], float(distances[row])
+
+
+class BVHTree:
+    '''Only finds the nearest vertex, not the nearest point on a face. Close enough for timing.'''
+    @classmethod
+    def FromPolygons(cls, vertices, polygons):
+        tree = cls()
+        tree._kdtree = KDTree(len(vertices))
+        for index, co in enumerate(vertices):
+            tree._kdtree.insert(co, index)
+        tree._kdtree.balance()
+        return tree
+
+    def find_nearest(self, point):
+        location, index, distance = self._kdtree.find(point)
+        return location, None, index, distance
+
+
+# Installation --------------------------------------------------------------------------------------
+def install():
+    '''Puts the fake bpy and mathutils into sys.modules. Safe to call more than once.'''
+    if "bpy" in sys.modules and getattr(sys.modules["bpy"], "IS_BENCHMARK_FAKE", False):
+        return sys.modules["bpy"]
+
+    bpy = _AutoModule("bpy")
+    bpy.IS_BENCHMARK_FAKE = True
+    bpy.__path__ = []
+
+    bpy.types = _AutoModule("bpy.types")
+    bpy.props = _AutoModule("bpy.props")
+    for name in PROPERTY_FUNCTIONS:
+        setattr(bpy.props, name, _make_property(name))
+    bpy.props.__all__ = list(PROPERTY_FUNCTIONS)
+
+    bpy.utils = _AutoModule("bpy.utils")
+    bpy.utils.__path__ = []
+    bpy.utils.previews = _AutoModule("bpy.utils.previews")
+
+    bpy.app = types.SimpleNamespace(
+        handlers=types.SimpleNamespace(**{name: [] for name in [
+            "load_post", "save_pre", "undo_post", "redo_post", "depsgraph_update_pre", "depsgraph_update_post",
+            "frame_change_pre", "frame_change_post", "animation_playback_pre", "animation_playback_post"]}),
+        timers=types.SimpleNamespace(register=_noop, unregister=_noop, is_registered=lambda function: False),
+        version=(4, 1, 0)
+    )
+    bpy.data = types.SimpleNamespace(objects=FakeCollection(), texts=FakeCollection(), node_groups=FakeCollection())
+    bpy.context = types.SimpleNamespace(scene=None, screen=None)
+    bpy.ops = _AutoModule("bpy.ops")
+    bpy.path = types.SimpleNamespace(abspath=lambda path: path)
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector, mathutils.Color, mathutils.Matrix = Vector, Color, Matrix
+    mathutils.Euler = Vector
+    mathutils.kdtree = types.ModuleType("mathutils.kdtree")
+    mathutils.kdtree.KDTree = KDTree
+    mathutils.bvhtree = types.ModuleType("mathutils.bvhtree")
+    mathutils.bvhtree.BVHTree = BVHTree
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.utils": bpy.utils,
+        "bpy.utils.previews": bpy.utils.previews,
+        "bpy.ops": bpy.ops,
+        "mathutils": mathutils,
+        "mathutils.kdtree": mathutils.kdtree,
+        "mathutils.bvhtree": mathutils.bvhtree
+    })
+    return bpy
+
+
+def import_addon(module_name):
+    '''
+    Imports one of Sorcerer's modules, like import_addon("cpv.mix"), without running the add-on's
+    own __init__.py (that one imports every operator, panel, and handler in the add-on). We make
+    an empty package that points at the add-on folder, so relative imports like
+    "from ..utils.osc import OSC" still work.
+    '''
+    install()
+    if ADDON_PACKAGE not in sys.modules:
+        package = types.ModuleType(ADDON_PACKAGE)
+        package.__path__ = [str(ADDON_ROOT)]
+        sys.modules[ADDON_PACKAGE] = package
+    return importlib.import_module(f"{ADDON_PACKAGE}.{module_name}")
@@ -0,0 +1,219 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import math
+import random
+import types
+
+from .fake_bpy import FakeCollection, Vector, Color, Matrix, install, import_addon
+
+'''
+A benchmark is only as good as the show it runs on. This makes up a show (a "rig") of whatever
+size you ask for, and puts it where Sorcerer expects to find it (bpy.data.objects and
+bpy.context.scene), so the CPV code can't tell it isn't inside Blender.
+
+The rig has:
+
+    - Fixtures. Meshes patched as one channel each, laid out on a square grid 1 meter apart
+      with channels 1, 2, 3... going row by row. Each one gets a color profile, taken in turn
+      from COLOR_PROFILES, so every ColorSplitter converter gets its share of the work.
+    - Group nodes. The fixtures cut into M equal runs of channels, like "1 Thru 24".
+    - Mixer nodes. Each one sits on a group and gets a handful of random keys. They take turns
+      being gradient, pattern, and pose mixers.
+    - Influencers. Boxes a few fixtures wide that start off to one side of the grid. The
+      influence scenario slides them across it, so fixtures keep entering, staying, and leaving.
+
+Everything random comes from one seeded random.Random, so the same sizes and seed always make
+the same rig, and results from two releases can be compared fairly.
+'''
+
+COLOR_PROFILES = [
+    'option_rgb', 'option_rgba', 'option_rgbw', 'option_rgbaw', 'option_rgbl', 'option_cmy', 'option_rgbam'
+]
+MIX_METHODS = ['option_gradient', 'option_pattern', 'option_pose']
+
+DYNAMIC_RANGES = {  # Patch controller min/max properties the mapper reads (see cpv/publish/map.py)
+    "pan_min": -270, "pan_max": 270,
+    "tilt_min": -135, "tilt_max": 135,
+    "zoom_min": 10, "zoom_max": 50,
+    "strobe_min": 0, "strobe_max": 25,
+    "gobo_speed_min": -200, "gobo_speed_max": 200
+}
+
+KEYS_PER_MIXER = 4
+INFLUENCER_SIZE = 4  # meters
+
+
+class FakeObject(types.SimpleNamespace):
+    '''Objects and nodes have to be hashable, since influencer memory uses them as dictionary keys.'''
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
+
+def _channels(numbers):
+    return FakeCollection([types.SimpleNamespace(chan=number) for number in numbers])
+
+
+def _unit_box(size):
+    half = size / 2
+    return [(x, y, z) for x in (-half, half) for y in (-half, half) for z in (-half, half)]
+
+
+class RigGenerator:
+    def __init__(self, fixtures=256, groups=8, mixers=8, influencers=4, seed=0):
+        self.num_fixtures = fixtures
+        self.num_groups = max(1, min(groups, fixtures))
+        self.num_mixers = mixers
+        self.num_influencers = influencers
+        self.random = random.Random(seed)
+        self.grid_width = max(1, math.ceil(math.sqrt(fixtures)))
+
+
+    def execute(self):
+        bpy = install()
+        scene = self._make_scene()
+        fixtures = [self._make_fixture(index) for index in range(self.num_fixtures)]
+        groups = [self._make_group(index, fixtures) for index in range(self.num_groups)]
+        mixers = [self._make_mixer(index, groups) for index in range(self.num_mixers)]
+        influencers = [self._make_influencer(index) for index in range(self.num_influencers)]
+
+        bpy.context.scene = scene
+        bpy.data.objects = FakeCollection(fixtures + influencers)
+        register_extendables()
+        self._reset_addon_caches(scene)
+
+        return types.SimpleNamespace(
+            scene=scene, fixtures=fixtures, groups=groups, mixers=mixers, influencers=influencers,
+            grid_width=self.grid_width, sizes=self.sizes()
+        )
+
+    def sizes(self):
+        return {
+            "fixtures": self.num_fixtures,
+            "groups": self.num_groups,
+            "mixers": self.num_mixers,
+            "influencers": self.num_influencers
+        }
+
+    def _reset_addon_caches(self, scene):
+        '''Sorcerer caches what it found in bpy.data. A new rig means none of that is true anymore.'''
+        cpv_utils = import_addon("utils.cpv_utils")
+        cpv_utils.PatchIndex.invalidate()
+        cpv_utils.FixtureSpatialIndex.invalidate()
+        import_addon("cpv.influence_memory").InfluencerMemory.reset()
+        import_addon("maintenance.logging").LogCategories.refresh(scene)
+
+
+    def _make_scene(self):
+        scene_props = types.SimpleNamespace(
+            console_type_enum='option_eos',
+            is_playing=False,
+            in_frame_change=True,  # CPV requests wait for the harmonizer, like during playback
+            is_democratic=False,
+            service_mode=False,
+            profile_frames=False,
+            str_osc_ip_address="127.0.0.1",
+            int_osc_port=8000
+        )
+        return types.SimpleNamespace(name="Benchmark", scene_props=scene_props, frame_current=1)
+
+    def _make_fixture(self, index):
+        row, column = divmod(index, self.grid_width)
+        location = (float(column), float(row), 0.0)
+        fixture = FakeObject(
+            name=f"Fixture {index + 1}",
+            type='MESH',
+            hide_viewport=False,
+            is_evaluated=False,
+            object_identities_enum="Fixture",
+            list_group_channels=_channels([index + 1]),
+            location=Vector(location),
+            matrix_world=Matrix.Translation(location),
+            users=1,
+            color_profile_enum=COLOR_PROFILES[index % len(COLOR_PROFILES)],
+            alva_white_balance=Color((1, 1, 1)) if index % 4 else Color((1, .9, .8)),
+            alva_intensity=0,
+            alva_color=Color((1, 1, 1))
+        )
+        for property_name, value in DYNAMIC_RANGES.items():
+            setattr(fixture, property_name, value)
+        return fixture
+
+    def _make_group(self, index, fixtures):
+        size = math.ceil(len(fixtures) / self.num_groups)
+        members = fixtures[index * size:(index + 1) * size]
+        return FakeObject(
+            name=f"Group {index + 1}",
+            type='CUSTOM',
+            bl_idname='group_controller_type',
+            list_group_channels=_channels([fixture.list_group_channels[0].chan for fixture in members]),
+            alva_intensity=self.random.uniform(0, 100),
+            alva_color=Color((self.random.random(), self.random.random(), self.random.random()))
+        )
+
+    def _make_mixer(self, index, groups):
+        group = groups[index % len(groups)]
+        keys = [self._make_mixer_key() for _ in range(KEYS_PER_MIXER)]
+        return FakeObject(
+            name=f"Mixer {index + 1}",
+            type='CUSTOM',
+            bl_idname='mixer_type',
+            list_group_channels=group.list_group_channels,
+            parameters=keys,
+            int_subdivisions=index % 3,
+            mix_method_enum=MIX_METHODS[index % len(MIX_METHODS)],
+            float_offset=self.random.uniform(-1, 1),
+            inputs=[]
+        )
+
+    def _make_mixer_key(self):
+        return types.SimpleNamespace(
+            alva_intensity=self.random.uniform(0, 100),
+            alva_color=Color((self.random.random(), self.random.random(), self.random.random())),
+            alva_pan=self.random.uniform(-100, 100),
+            alva_tilt=self.random.uniform(-100, 100),
+            alva_zoom=self.random.uniform(0, 100),
+            alva_iris=self.random.uniform(0, 100)
+        )
+
+    def _make_influencer(self, index):
+        row = (index * self.grid_width) / max(1, self.num_influencers)
+        location = (-INFLUENCER_SIZE, row, 0.0)
+        return FakeObject(
+            name=f"Influencer {index + 1}",
+            type='MESH',
+            hide_viewport=False,
+            is_evaluated=False,
+            is_erasing=False,
+            object_identities_enum="Influencer",
+            list_group_channels=_channels([]),
+            bound_box=_unit_box(INFLUENCER_SIZE),
+            location=Vector(location),
+            matrix_world=Matrix.Translation(location),
+            influencer_list=FakeCollection(item_factory=_make_influencer_list_item),
+            alva_intensity=self.random.uniform(10, 100),
+            alva_color=Color((self.random.random(), self.random.random(), self.random.random())),
+            alva_color_restore=Color((1, 1, 1))
+        )
+
+
+def register_extendables():
+    '''Consoles and parameters normally register when the add-on is enabled. The CPV code looks them up by id.'''
+    import_addon("spy")  # Puts bpy.spy in place for the extendables to find
+    consoles = import_addon("extendables.lighting_consoles")
+    parameters = import_addon("extendables.fixture_parameters")
+    spy_utils = import_addon("utils.spy_utils")
+    if not spy_utils.REGISTERED_LIGHTING_CONSOLES:
+        consoles.register()
+    if not spy_utils.REGISTERED_PARAMETERS:
+        parameters.register()
+
+
+def _make_influencer_list_item():
+    return types.SimpleNamespace(parameter_name="", influenced_object_property_group=FakeCollection())
+
+
+def move_influencer(influencer, x, y):
+    influencer.location = Vector((x, y, 0.0))
+    influencer.matrix_world = Matrix.Translation((x, y, 0.0))
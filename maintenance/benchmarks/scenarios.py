@@ -0,0 +1,355 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import random
+import statistics
+import time
+
+from .fake_bpy import Color, FakeCollection, Matrix, Vector, import_addon
+from .rig import FakeObject, INFLUENCER_SIZE, move_influencer
+
+'''
+Each scenario times one piece of the CPV pipeline on the same synthetic rig (see rig.py).
+
+A scenario has three parts:
+
+    setup():     Get everything ready that the real code would already have by the time it runs,
+                 like a frame's worth of CPV requests for the harmonizer. Not timed.
+    run():       The part we time. Returns how many things it worked on (requests, channels,
+                 fixtures), so results can be reported as "things per second" and compared
+                 across rig sizes.
+    teardown():  Put shared state back, so one scenario can't slow down or speed up the next.
+
+BenchmarkRunner runs each scenario a few times untimed first (warmup, so caches and lazy
+indexes get built like they would be a few frames into playback) and then REPEATS times timed.
+We report the best, median, and mean times. The median is the one to track between releases.
+The best is the closest thing to "how fast can this go", and a mean far above the median means
+something (like garbage collection) is making some runs much slower than others.
+'''
+
+VALUES_SEED = 1
+
+
+class Scenario:
+    name = ""
+    description = ""
+
+    def __init__(self, rig):
+        self.rig = rig
+        self.publish = import_addon("cpv.publish.publish")
+        self.parameters = import_addon("extendables.fixture_parameters")
+
+    def setup(self):
+        pass
+
+    def run(self):
+        raise NotImplementedError
+
+    def teardown(self):
+        self.publish.change_requests.clear()
+
+    def _generator(self, parent, property_name, controller_type):
+        return FakeObject(parent=parent, property_name=property_name, controller_type=controller_type)
+
+    def _fill_change_requests(self):
+        '''One busy frame: every mixer mixes intensity and color, and every group sets both too.'''
+        mix = import_addon("cpv.mix")
+        CPV = self.publish.CPV
+        Publish = self.publish.Publish
+        intensity, color = self.parameters.CPV_FP_intensity, self.parameters.CPV_FP_color
+
+        self.publish.change_requests.clear()
+        for mixer in self.rig.mixers:
+            for Parameter in (intensity, color):
+                generator = self._generator(mixer, f"alva_{Parameter.as_property_name}", "mixer")
+                mix.MixCPV(generator, Parameter).execute(time.time())
+
+        for group in self.rig.groups:
+            for Parameter in (intensity, color):
+                generator = self._generator(group, f"alva_{Parameter.as_property_name}", "group")
+                value = getattr(group, generator.property_name)
+                for channel in group.list_group_channels:
+                    Publish(generator, Parameter, channel.chan, generator.property_name, value, sender=CPV).execute()
+
+
+class HarmonizeHTP(Scenario):
+    name = "harmonize_htp"
+    description = "Freeze one frame of CPV requests and harmonize them with highest takes precedence."
+
+    def setup(self):
+        self.Harmonizer = import_addon("cpv.harmonize").Harmonizer
+        self._fill_change_requests()
+
+    def run(self):
+        no_duplicates = self.Harmonizer.remove_duplicates(self.publish.change_requests.freeze())
+        no_conflicts = self._resolve_conflicts(no_duplicates)
+        self.Harmonizer.simplify(no_conflicts)
+        return len(self.publish.change_requests)
+
+    def _resolve_conflicts(self, no_duplicates):
+        return self.Harmonizer.highest_takes_precedence(no_duplicates)
+
+
+class HarmonizeDemocracy(HarmonizeHTP):
+    name = "harmonize_democracy"
+    description = "Same frame of CPV requests, averaged with democracy mode instead."
+
+    def _resolve_conflicts(self, no_duplicates):
+        return self.Harmonizer.democracy(no_duplicates)
+
+
+class Mix(Scenario):
+    name = "mix_cpv"
+    description = "Every mixer spreads its intensity and color keys across its group."
+
+    def setup(self):
+        self.MixCPV = import_addon("cpv.mix").MixCPV
+        self.jobs = []
+        for mixer in self.rig.mixers:
+            for Parameter in (self.parameters.CPV_FP_intensity, self.parameters.CPV_FP_color):
+                self.jobs.append((self._generator(mixer, f"alva_{Parameter.as_property_name}", "mixer"), Parameter))
+
+    def run(self):
+        self.publish.change_requests.clear()
+        start_time = time.time()
+        for generator, Parameter in self.jobs:
+            self.MixCPV(generator, Parameter).execute(start_time)
+        return len(self.publish.change_requests)
+
+
+class SplitColor(Scenario):
+    name = "color_splitter"
+    description = "Split one color per fixture into that fixture's color profile, with white balance."
+
+    def setup(self):
+        self.ColorSplitter = import_addon("cpv.split_color").ColorSplitter
+        values = random.Random(VALUES_SEED)
+        self.publishers = [
+            FakeObject(
+                patch_controller=fixture,
+                property_name="color",
+                value=Color((values.random(), values.random(), values.random()))
+            )
+            for fixture in self.rig.fixtures
+        ]
+
+    def run(self):
+        for publisher in self.publishers:
+            self.ColorSplitter(None, publisher).execute()
+        return len(self.publishers)
+
+
+class FormOSCPerChannel(Scenario):
+    name = "form_osc"
+    description = "Format intensity, pan, and color OSC for every fixture, one channel at a time."
+
+    def setup(self):
+        self.FormOSC = import_addon("cpv.publish.form_osc").FormOSC
+        self.ConsoleMirror = import_addon("cpv.publish.console_mirror").ConsoleMirror
+        Prepare = import_addon("cpv.publish.prepare").Prepare
+        Publish, EVENT_MANAGER = self.publish.Publish, self.publish.EVENT_MANAGER
+        values = random.Random(VALUES_SEED)
+        self.publishers = []
+
+        for fixture in self.rig.fixtures:
+            requests = [
+                (self.parameters.CPV_FP_intensity, values.uniform(0, 100)),
+                (self.parameters.CPV_FP_pan, values.uniform(-100, 100)),
+                (self.parameters.CPV_FP_color, Color((values.random(), values.random(), values.random())))
+            ]
+            for Parameter, value in requests:
+                property_name = f"alva_{Parameter.as_property_name}"
+                generator = self._generator(fixture, property_name, "Fixture")
+                channel = fixture.list_group_channels[0].chan
+                publisher = Publish(generator, Parameter, channel, property_name, value, sender=EVENT_MANAGER, is_already_harmonized=True)
+                publisher._split_color()
+                publisher.value, publisher.argument_template = Prepare(publisher.LightingConsole, publisher, Parameter).execute()
+                self.publishers.append(publisher)
+
+    def run(self):
+        self.ConsoleMirror.reset()  # Otherwise every run after the first is all repeats
+        for publisher in self.publishers:
+            self.FormOSC(publisher.LightingConsole, publisher).execute()
+        return len(self.publishers)
+
+
+class PublishHarmonized(Scenario):
+    name = "publish_harmonized"
+    description = "Publish a harmonized frame the way the event manager does: split, map, and form OSC."
+
+    def setup(self):
+        Harmonizer = import_addon("cpv.harmonize").Harmonizer
+        self._fill_change_requests()
+        no_duplicates = Harmonizer.remove_duplicates(self.publish.change_requests.freeze())
+        self.simplified = Harmonizer.simplify(Harmonizer.highest_takes_precedence(no_duplicates))
+        self.ConsoleMirror = import_addon("cpv.publish.console_mirror").ConsoleMirror
+
+    def run(self):
+        Publish, EVENT_MANAGER = self.publish.Publish, self.publish.EVENT_MANAGER
+        self.ConsoleMirror.reset()
+        for request in self.simplified:
+            Publish(*request, sender=EVENT_MANAGER, is_already_harmonized=True).execute()
+        return len(self.simplified)
+
+
+class Influence(Scenario):
+    name = "influence_cpv"
+    description = "Slide every influencer across the grid half a meter per run, for intensity and color."
+
+    STEP = .5
+
+    def setup(self):
+        self.InfluenceCPV = import_addon("cpv.influence").InfluenceCPV
+        self.jobs = [
+            (influencer, self._generator(influencer, Parameter.as_property_name, "Influencer"), Parameter)
+            for influencer in self.rig.influencers
+            for Parameter in (self.parameters.CPV_FP_intensity, self.parameters.CPV_FP_color)
+        ]
+        self.start_x = -INFLUENCER_SIZE
+        self.end_x = self.rig.grid_width + INFLUENCER_SIZE
+        self.step = 0
+
+    def run(self):
+        self.publish.change_requests.clear()
+        x = self.start_x + (self.step * self.STEP) % (self.end_x - self.start_x)
+        self.step += 1
+
+        for influencer in self.rig.influencers:
+            move_influencer(influencer, x, influencer.location.y)
+        for _, generator, Parameter in self.jobs:
+            self.InfluenceCPV(generator, Parameter).execute()
+        return len(self.jobs)
+
+    def teardown(self):
+        super().teardown()
+        for influencer in self.rig.influencers:
+            move_influencer(influencer, self.start_x, influencer.location.y)
+        import_addon("cpv.influence_memory").InfluencerMemory.reset()
+
+
+class SpatialAudio(Scenario):
+    name = "spatial_audio"
+    description = "Render every sound object into every speaker, with every object moving a little each run."
+
+    SPEAKERS = 32
+    SOUND_OBJECTS = 12
+    STEP = .25
+
+    def setup(self):
+        self.audio_utils = import_addon("utils.audio_utils")
+        self.osc = import_addon("utils.osc").OSC
+        self._send_osc_audio = self.osc.send_osc_audio
+        self.osc.send_osc_audio = staticmethod(lambda address, argument: None)
+
+        layout = random.Random(VALUES_SEED)
+        speakers = []
+        for number in range(1, self.SPEAKERS + 1):
+            location = (layout.uniform(-10, 10), layout.uniform(-10, 10), layout.uniform(0, 5))
+            speakers.append(FakeObject(
+                name=f"Speaker {number}", int_speaker_number=number, location=Vector(location),
+                scale=(1.0, 1.0, 1.0), matrix_world=Matrix.Translation(location)
+            ))
+
+        self.sound_objects, strips = [], []
+        for number in range(1, self.SOUND_OBJECTS + 1):
+            strip_name = f"Sound {number}"
+            sound_object = FakeObject(name=f"Audio Object {number}", scale=(1.0, 1.0, 1.0), speaker_list=FakeCollection())
+            speaker_list = sound_object.speaker_list.add()
+            speaker_list.name = strip_name
+            speaker_list.speakers = [FakeObject(speaker_pointer=speaker, dummy_volume=0.0) for speaker in speakers]
+            self._move(sound_object, layout.uniform(-10, 10), layout.uniform(-10, 10))
+            self.sound_objects.append(sound_object)
+            strips.append(FakeObject(type='SOUND', name=strip_name, selected_stage_object=sound_object, int_sound_cue=number))
+
+        self.scene = FakeObject(sequence_editor=FakeObject(sequences_all=strips))
+
+    def run(self):
+        for sound_object in self.sound_objects:
+            self._move(sound_object, sound_object.location.x + self.STEP, sound_object.location.y)
+        self.audio_utils.BatchedVolumeRenderer(self.scene).execute()
+        return self.SPEAKERS * self.SOUND_OBJECTS
+
+    def _move(self, sound_object, x, y):
+        sound_object.location = Vector((x, y, 1.0))
+        sound_object.matrix_world = Matrix.Translation((x, y, 1.0))
+
+    def teardown(self):
+        super().teardown()
+        self.osc.send_osc_audio = self._send_osc_audio
+        self.audio_utils.BatchedVolumeRenderer.reset()
+
+
+class GroupSlider(Scenario):
+    name = "group_slider"
+    description = "Drag every group's intensity and color sliders outside of playback, so CPV sends right away."
+
+    def setup(self):
+        self.NormalCPV = import_addon("cpv.normal").NormalCPV
+        self.ConsoleMirror = import_addon("cpv.publish.console_mirror").ConsoleMirror
+        self.osc = self.publish.OSC
+        self._send_osc_lighting = self.osc.send_osc_lighting
+        self.osc.send_osc_lighting = staticmethod(lambda address, argument, user=1, tcp=False, coalesce_key=None: None)
+        self.scene_props = self.rig.scene.scene_props
+        self.scene_props.in_frame_change = False
+        self.jobs = [
+            (self._generator(group, f"alva_{Parameter.as_property_name}", "group"), Parameter)
+            for group in self.rig.groups
+            for Parameter in (self.parameters.CPV_FP_intensity, self.parameters.CPV_FP_color)
+        ]
+
+    def run(self):
+        self.ConsoleMirror.reset()  # Otherwise every run after the first is all repeats
+        for generator, Parameter in self.jobs:
+            self.NormalCPV(generator, Parameter).publish()
+        return sum(len(generator.parent.list_group_channels) for generator, _ in self.jobs)
+
+    def teardown(self):
+        super().teardown()
+        self.osc.send_osc_lighting = self._send_osc_lighting
+        self.scene_props.in_frame_change = True
+        self.ConsoleMirror.reset()
+
+
+SCENARIOS = [HarmonizeHTP, HarmonizeDemocracy, Mix, SplitColor, FormOSCPerChannel, PublishHarmonized, Influence, SpatialAudio, GroupSlider]
+
+
+class BenchmarkRunner:
+    def __init__(self, rig, scenario_classes=SCENARIOS, repeats=20, warmup=2):
+        self.rig = rig
+        self.scenario_classes = scenario_classes
+        self.repeats = max(1, repeats)
+        self.warmup = max(0, warmup)
+
+
+    def execute(self):
+        return [self._run_scenario(Scenario(self.rig)) for Scenario in self.scenario_classes]
+
+    def _run_scenario(self, scenario):
+        scenario.setup()
+        try:
+            for _ in range(self.warmup):
+                scenario.run()
+
+            timings, items = [], 0
+            for _ in range(self.repeats):
+                start = time.perf_counter()
+                items = scenario.run()
+                timings.append(time.perf_counter() - start)
+        finally:
+            scenario.teardown()
+
+        return self._summarize(scenario, timings, items)
+
+    def _summarize(self, scenario, timings, items):
+        median = statistics.median(timings)
+        return {
+            "scenario": scenario.name,
+            "description": scenario.description,
+            "repeats": len(timings),
+            "items": items,
+            "best_ms": min(timings) * 1000,
+            "median_ms": median * 1000,
+            "mean_ms": statistics.fmean(timings) * 1000,
+            "items_per_second": items / median if median > 0 else None
+        }
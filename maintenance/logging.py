@@ -3,6 +3,8 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import bpy
+import time
+from collections import deque
 
 '''
 Currently choosing not to use conventional logging methods because they seem overly complicated. (NEWB ALERT!!! lol)
@@ -85,10 +87,82 @@ scripts = [ # These correspond directly to property names registered to scene, d
 ]
 
 
-def alva_log(script, string):
-    if bpy.context.scene.scene_props.service_mode:
-        if f"print_{script}" in scripts:
-            if getattr(bpy.context.scene.scene_props, f"print_{script}"):
-                print(string)
+LOG_BUFFER_SIZE = 5000
+
+
+class LogCategories:
+    '''
+    alva_log() runs inside some of our hottest code: every CPV, every frame, every influencer. It
+    used to look up bpy.context.scene.scene_props twice per call just to find out that logging was
+    off, which it always is during a show.
+
+    So now we remember which categories are turned on in a plain Python set, and only look at the
+    scene again when refresh() is called. The event manager calls refresh() once per frame and once
+    per depsgraph update (flipping a Service Mode checkbox causes one), so the set is never more
+    than one update behind what you see in the UI.
+    '''
+    known = frozenset(script.replace("print_", "", 1) for script in scripts)
+    enabled = frozenset()
+    is_stale = True
+
+    @classmethod
+    def refresh(cls, scene=None):
+        if scene is None:
+            scene = bpy.context.scene
+        scene_props = scene.scene_props
+        if scene_props.service_mode:
+            cls.enabled = frozenset(category for category in cls.known if getattr(scene_props, f"print_{category}"))
         else:
-            print(f"Logging Error: {script} is not a recognized script name for logging.")
\ No newline at end of file
+            cls.enabled = frozenset()
+        cls.is_stale = False
+
+
+class LogBuffer:
+    '''
+    The last LOG_BUFFER_SIZE log messages, so you can look back at what happened after the fact
+    without having had Blender's command line open. When it's full, the oldest message falls off
+    the front. Dump it from the Service Mode panel into a Text Editor datablock.
+    '''
+    entries = deque(maxlen=LOG_BUFFER_SIZE)
+
+    @classmethod
+    def add(cls, script, message):
+        cls.entries.append((time.time(), script, message))
+
+    @classmethod
+    def clear(cls):
+        cls.entries.clear()
+
+    @classmethod
+    def format(cls):
+        return "\n".join(
+            f"[{time.strftime('%H:%M:%S', time.localtime(timestamp))}.{int(timestamp % 1 * 1000):03d}] [{script}] {message}"
+            for timestamp, script, message in cls.entries
+        )
+
+
+def alva_log(script, message):
+    '''
+    Prints message if Service Mode has that script's category switched on.
+
+    message can be a string, or a function that returns one. Pass a function (usually a lambda)
+    whenever building the string costs anything, like f-strings over lists of objects:
+
+        alva_log("mix", lambda: f"Keys: {[key.name for key in keys]}")
+
+    When the category is off, the lambda is never called, so the string is never built.
+    '''
+    if script not in LogCategories.known:
+        print(f"Logging Error: {script} is not a recognized script name for logging.")
+        return
+
+    if LogCategories.is_stale:
+        LogCategories.refresh()
+
+    if script not in LogCategories.enabled:
+        return
+
+    if callable(message):
+        message = message()
+    print(message)
+    LogBuffer.add(script, message)
@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np   # type: ignore
+
+'''
+Every frame during playback, Sorcerer has to do a lot of things before the next frame comes
+along: find controllers, read their animated properties, figure out what changed, make CPV
+requests, harmonize them, turn them into OSC, and send them. At 30 frames per second that all
+has to fit in about 33 milliseconds. When it doesn't, playback stutters. The question is always
+"which part took too long?"
+
+The profiler answers that. Wrap a chunk of code in a stage:
+
+    with FrameProfiler.stage("harmonize"):
+        ...
+
+and the time spent inside gets added to that stage's total for the current frame. When the frame
+ends, each stage's total goes into a rolling history of the last HISTORY_LENGTH frames. From that
+history we work out the percentiles:
+
+    p50: half of the frames were faster than this. The typical frame.
+    p95: only 1 in 20 frames was slower than this.
+    p99: only 1 in 100 frames was slower than this. These are the stutters you notice.
+
+A stage that runs many times per frame (like CPV generation, once per controller) is added up, so
+the numbers are always "time per frame", never "time per call".
+
+When the profiler is off (Service Mode checkbox), stage() hands back a do-nothing object, so it
+costs next to nothing in a show.
+'''
+
+HISTORY_LENGTH = 600  # 20 seconds at 30 fps
+PERCENTILES = (50, 95, 99)
+FRAME_TOTAL = "frame_total"
+
+
+class _Stage:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        FrameProfiler.add(self.name, time.perf_counter() - self._start)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+NO_STAGE = _NoStage()
+
+
+class FrameProfiler:
+    enabled = False
+    _histories = {}  # {stage name: deque of seconds per frame}
+    _current = {}  # {stage name: seconds so far this frame}
+    _frame_start = None
+
+    @classmethod
+    def stage(cls, name):
+        if not cls.enabled:
+            return NO_STAGE
+        return _Stage(name)
+
+    @classmethod
+    def add(cls, name, seconds):
+        cls._current[name] = cls._current.get(name, 0) + seconds
+
+
+    @classmethod
+    def begin_frame(cls):
+        if not cls.enabled:
+            return
+        cls._current = {}
+        cls._frame_start = time.perf_counter()
+
+    @classmethod
+    def end_frame(cls):
+        if not cls.enabled or cls._frame_start is None:
+            return
+        cls._current[FRAME_TOTAL] = time.perf_counter() - cls._frame_start
+        for name, seconds in cls._current.items():
+            if name not in cls._histories:
+                cls._histories[name] = deque(maxlen=HISTORY_LENGTH)
+            cls._histories[name].append(seconds)
+        cls._current = {}
+        cls._frame_start = None
+
+    @classmethod
+    def reset(cls):
+        cls._histories = {}
+        cls._current = {}
+        cls._frame_start = None
+
+
+    @classmethod
+    def stats(cls):
+        '''Returns {stage: {"frames", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"}}, slowest p95 first.'''
+        results = {}
+        for name, history in cls._histories.items():
+            samples_ms = np.fromiter(history, dtype=np.float64) * 1000
+            p50, p95, p99 = np.percentile(samples_ms, PERCENTILES)
+            results[name] = {
+                "frames": len(samples_ms),
+                "mean_ms": float(samples_ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(samples_ms.max())
+            }
+        return dict(sorted(results.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
+
+    @classmethod
+    def export_csv(cls, filepath):
+        stats = cls.stats()
+        with open(filepath, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["stage", "frames", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for name, row in stats.items():
+                writer.writerow([name] + [row[column] for column in ("frames", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")])
+
+    @classmethod
+    def export_json(cls, filepath):
+        '''Exports the summary and the raw per-frame history, so spikes can be lined up across stages.'''
+        data = {
+            "history_length": HISTORY_LENGTH,
+            "stats": cls.stats(),
+            "history_ms": {name: [seconds * 1000 for seconds in history] for name, history in cls._histories.items()}
+        }
+        with open(filepath, "w") as file:
+            json.dump(data, file, indent=2)
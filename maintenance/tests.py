@@ -12,6 +12,10 @@ from ..cpv.publish.publish import test_publisher
 from ..cpv.harmonize import test_harmonizer
 from ..cpv.influence import test_influencers
 from ..cpv.split_color import test_split_color
+from ..utils.channel_set import ChannelSet
+from ..utils.cpv_utils import simplify_channels_list
+from ..utils.rna_utils import parse_channels
+from ..utils.audio_mixdown import test_audio_mixdown
 
 
 # TODO: This currently does nothing. It should probably do stuff.
@@ -27,6 +31,7 @@ def test_sorcerer():
         MIXER_SENSITIVITY = .5,
         PUBLISHER_SENSITIVITY = .5,
         SPLIT_COLOR_SENSITIVITY = .5,
+        CHANNEL_PARSING_SENSITIVITY = .5,
         THRESHOLD = 3
     )
 
@@ -34,7 +39,8 @@ def test_sorcerer():
         RENDER_QMEO_SENSITIVITY = .5,
         STRIPS_SENSITIVITY = .5,
         RENDER_SEQUENCER_SENSITIVITY = .5,
-        PATCH_GROUPS_SENSITIVITY = .5
+        PATCH_GROUPS_SENSITIVITY = .5,
+        AUDIO_MIXDOWN_SENSITIVITY = .5
     )
 
     scene = bpy.context.scene.scene_props
@@ -76,6 +82,7 @@ def test_cpv(
         MIXER_SENSITIVITY,
         PUBLISHER_SENSITIVITY,
         SPLIT_COLOR_SENSITIVITY,
+        CHANNEL_PARSING_SENSITIVITY,
         THRESHOLD
     ): # Returns True for fail, False for pass, which I here is opposite of how it's supposed to be.
 
@@ -87,7 +94,8 @@ def test_cpv(
         'mapping_fails': test_mapping(MAPPING_SENSITIVITY),
         'mixer_fails': test_mixer(MIXER_SENSITIVITY),
         'publisher_fails': test_publisher(PUBLISHER_SENSITIVITY),
-        'split_color_fails': test_split_color(SPLIT_COLOR_SENSITIVITY)
+        'split_color_fails': test_split_color(SPLIT_COLOR_SENSITIVITY),
+        'channel_parsing_fails': test_channel_parsing(CHANNEL_PARSING_SENSITIVITY)
     }
 
     severity_dictionary = {
@@ -98,7 +106,8 @@ def test_cpv(
         'publisher_fails': (3, "Publisher has failed a quality control test."),
         'harmonizer_fails': (2, "Harmonizer has failed a quality control test."),
         'influencers_fails': (1, "Influencers has failed a quality control test."),
-        'split_color_fails': (1, "Split Color has failed a quality control test.")
+        'split_color_fails': (1, "Split Color has failed a quality control test."),
+        'channel_parsing_fails': (2, "Channel parsing has failed a quality control test.")
     }
 
     severity = sum(severity_dictionary[key][0] for key, value in test_results.items() if value)
@@ -112,14 +121,61 @@ def test_cpv(
         return True, "CPV fail", severity
 
 
+# What parse_channels() has always answered. The parser quirks (like "keep 5" being filtered back
+# out by "evens") are on purpose: people's saved selections depend on them.
+CHANNEL_PARSING_CASES = [
+    ("1 thru 10 evens not 4-7 keep 5", [2, 8, 10]),
+    ("I want odds from 1-10", [1, 3, 5, 7, 9]),
+    ("10-1", [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]),
+    ("1-5 + 8, 12", [1, 2, 3, 4, 5, 8, 12]),
+    ("1 thru 20 not 5 thru 15 odds", [1, 3, 17, 19]),
+    ("", []),
+    ("banana thru 5", None)
+]
+
+
+def test_channel_parsing(SENSITIVITY): # Return True for fail, False for pass
+    try:
+        for selection, expected in CHANNEL_PARSING_CASES:
+            if parse_channels(selection) != expected:
+                print(f"parse_channels({selection!r}) should be {expected}")
+                return True
+
+        if parse_channels("1-10 not 3-5", remove=True) != ([1, 2, 6, 7, 8, 9, 10], [3, 4, 5]):
+            return True
+
+        large_selection = parse_channels("1 thru 4000 except evens")  # "evens" filters, so this really is the evens
+        if len(large_selection) != 2000 or large_selection[0] != 2 or large_selection[-1] != 4000:
+            return True
+
+        scattered = ChannelSet.from_channels([15, 1, 2, 3, 10, 11])
+        checks = [
+            list(scattered.runs()) == [(1, 3), (10, 11), (15, 15)],
+            simplify_channels_list(scattered) == simplify_channels_list([1, 2, 3, 10, 11, 15]) == "1 Thru 3 + 10 Thru 11 + 15",
+            list(scattered.union(ChannelSet.from_range(4, 9))) == list(range(1, 12)) + [15],
+            list(ChannelSet.from_range(1, 20).difference(scattered)) == [4, 5, 6, 7, 8, 9, 12, 13, 14, 16, 17, 18, 19, 20],
+            list(ChannelSet.from_range(1, 9).odds().runs()) == [(1, 1), (3, 3), (5, 5), (7, 7), (9, 9)],
+            len(ChannelSet.from_range(1, 1000000).evens()) == 500000,
+            10 in scattered and 12 not in scattered
+        ]
+        return not all(checks)
+
+    except Exception as e:
+        print(f"Channel parsing test error: {e}")
+        return True
+
+
 def test_orb(
         RENDER_QMEO_SENSITIVITY,
         STRIPS_SENSITIVITY,
         RENDER_SEQUENCER_SENSITIVITY,
-        PATCH_GROUPS_SENSITIVITY
+        PATCH_GROUPS_SENSITIVITY,
+        AUDIO_MIXDOWN_SENSITIVITY
     ): # Returns True for fail, False for pass
     from ..orb import test_orb
 
     if test_orb():
         return True, "Orb fail", 3
+    if test_audio_mixdown(AUDIO_MIXDOWN_SENSITIVITY):
+        return True, "Audio mixdown fail", 1
     return False, "", 0
\ No newline at end of file
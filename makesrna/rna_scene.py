@@ -88,6 +88,7 @@ class SceneProperties(PropertyGroup):
     number_of_systems_down: IntProperty(default=0)
     user_limp_mode_explanation: StringProperty()
     errors_index: IntProperty(default=0)
+    profile_frames: BoolProperty(default=False, description="Record how long each stage of frame change takes, for finding what blows the frame budget", name="Profile Frames") 
     # OSC
     print_osc_lighting: BoolProperty(default=False, description="Enable built-in debug prints to external command line for this script", name="OSC Lighting") 
     print_osc_video: BoolProperty(default=False, description="Enable built-in debug prints to external command line for this script", name="OSC Video") 
@@ -129,6 +130,16 @@ class SceneProperties(PropertyGroup):
     
     int_argument_size: IntProperty(name="Maximum Argument Size", default=40, min=1, max=65, description="How many consecutive command line commands can be batched onto one OSC packet.") 
 
+    osc_tcp_framing: EnumProperty(
+        name="TCP Framing",
+        description="How OSC messages are separated on the TCP connection used for keys and Orb commands",
+        items=[
+            ('LENGTH', "OSC 1.0", "Size-prefixed messages. Eos listens for these on port 3032"),
+            ('SLIP', "OSC 1.1 (SLIP)", "SLIP-framed messages. Eos listens for these on port 3037")
+        ],
+        default='LENGTH'
+    )
+
     is_baking: BoolProperty(default=False, description="Sorcerer is currently baking")  
     is_cue_baking: BoolProperty(default=False, description="Sorcerer is currently baking")  
     is_event_baking: BoolProperty(default=False, description="Sorcerer is currently baking")  
@@ -10,7 +10,7 @@ from ..assets.items import Items as AlvaItems
 from ..updaters.node import NodeUpdaters
 from ..utils.rna_utils import register_properties
 from ..makesrna.property_groups import MixerParameters, CustomButtonPropertyGroup
-from ..cpv.find import FindConnectedNodes
+from ..cpv.find import ControllerRegistry, FindConnectedNodes, NodeGraphIndex
 from ..assets.tooltips import format_tooltip
 
 from ..as_ui.parameters import draw_parameters
@@ -143,6 +143,16 @@ class NodeBase:
     def poll(cls, ntree):
         return ntree.bl_idname == 'ShaderNodeTree'
 
+    def update(self):
+        '''Blender calls this when links or nodes are added to or removed from the tree.'''
+        NodeGraphIndex.invalidate()
+        ControllerRegistry.invalidate()  # May be holding a node that was just deleted
+
+    def free(self):
+        '''Blender calls this right before this node is deleted.'''
+        NodeGraphIndex.invalidate()
+        ControllerRegistry.invalidate()
+
 
 class NODE_NT_group_controller(NodeBase, Node):
     bl_idname = 'group_controller_type'
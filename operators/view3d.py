@@ -8,11 +8,14 @@ from bpy.types import Operator
 
 from ..cpv.find import Find 
 from ..utils.cpv_utils import simplify_channels_list
+from ..utils.event_utils import DriverIndex
 from ..utils.osc import OSC
 from ..assets.tooltips import find_tooltip
 
 # pyright: reportInvalidTypeForm=false
 
+LOG_TEXT_NAME = "Sorcerer Log"
+
 
 class VIEW3D_OT_alva_add_driver(Operator):
     '''Create a Sorcerer driver to control parameters with movement in 3D View'''
@@ -25,6 +28,7 @@ class VIEW3D_OT_alva_add_driver(Operator):
         except:
             return
             
+        DriverIndex.invalidate()  # Rebuilt on next use, after these drivers are added
         len_added = 0
         for obj in bpy.context.selected_objects:
             try:
@@ -254,6 +258,70 @@ class VIEW3D_OT_alva_duplicate_object(Operator):
             return {'CANCELLED'}
 
 
+class VIEW3D_OT_alva_dump_log(Operator):
+    '''Copy Sorcerer's recent log messages into a Text Editor datablock'''
+    bl_idname = "alva_object.dump_log"
+    bl_label = "Dump Log"
+
+    def execute(self, context):
+        from ..maintenance.logging import LogBuffer
+        text = bpy.data.texts.get(LOG_TEXT_NAME) or bpy.data.texts.new(LOG_TEXT_NAME)
+        text.clear()
+        text.write(LogBuffer.format())
+        self.report({'INFO'}, f"Wrote {len(LogBuffer.entries)} log messages to \"{LOG_TEXT_NAME}\" in Text Editor")
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_alva_clear_log(Operator):
+    '''Forget all of Sorcerer's recent log messages'''
+    bl_idname = "alva_object.clear_log"
+    bl_label = "Clear Log"
+
+    def execute(self, context):
+        from ..maintenance.logging import LogBuffer
+        LogBuffer.clear()
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_alva_export_profile(Operator):
+    '''Save the frame profiler's per-stage timings to a file'''
+    bl_idname = "alva_object.export_profile"
+    bl_label = "Export Frame Profile"
+
+    filepath: StringProperty(subtype='FILE_PATH')
+    file_format: EnumProperty(
+        items=[('CSV', "CSV", "Percentile summary, one row per stage"),
+               ('JSON', "JSON", "Percentile summary plus every recorded frame")],
+        name="Format",
+        default='CSV'
+    )
+
+    def invoke(self, context, event):
+        self.filepath = bpy.path.abspath(f"//sorcerer_profile.{self.file_format.lower()}")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        from ..maintenance.profiler import FrameProfiler
+        if self.file_format == 'CSV':
+            FrameProfiler.export_csv(self.filepath)
+        else:
+            FrameProfiler.export_json(self.filepath)
+        self.report({'INFO'}, f"Saved frame profile to {self.filepath}")
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_alva_reset_profile(Operator):
+    '''Throw away everything the frame profiler has recorded so far'''
+    bl_idname = "alva_object.reset_profile"
+    bl_label = "Reset Frame Profile"
+
+    def execute(self, context):
+        from ..maintenance.profiler import FrameProfiler
+        FrameProfiler.reset()
+        return {'FINISHED'}
+
+
 classes = (
     VIEW3D_OT_alva_add_driver,
     VIEW3D_OT_alva_toggle_object_mute,
@@ -263,7 +331,11 @@ classes = (
     VIEW3D_OT_alva_bump_lighting_modifier,
     VIEW3D_OT_alva_summon_movers,
     VIEW3D_OT_alva_object_controller,
-    VIEW3D_OT_alva_duplicate_object
+    VIEW3D_OT_alva_duplicate_object,
+    VIEW3D_OT_alva_dump_log,
+    VIEW3D_OT_alva_clear_log,
+    VIEW3D_OT_alva_export_profile,
+    VIEW3D_OT_alva_reset_profile
 )
 
 
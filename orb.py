@@ -147,12 +147,12 @@ class CueStrip:
         param = slowed_prop_name.replace("_slow", "")
 
         # Importing here for dependency reasons
-        from .utils.rna_utils import parse_channels
+        from .utils.rna_utils import compile_channels
         from .utils.cpv_utils import simplify_channels_list
 
-        groups = parse_channels(getattr(self.scene, f"{param}_groups"))
-        channels = parse_channels(getattr(self.scene, f"{param}_channels"))
-        submasters = parse_channels(getattr(self.scene, f"{param}_submasters"))
+        groups = compile_channels(getattr(self.scene, f"{param}_groups")).channels
+        channels = compile_channels(getattr(self.scene, f"{param}_channels")).channels
+        submasters = compile_channels(getattr(self.scene, f"{param}_submasters")).channels
 
         if groups:
             members_str = simplify_channels_list(groups)
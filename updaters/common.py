@@ -6,7 +6,7 @@ import bpy
 import time
 from bpy.props import *
 
-from ..utils.rna_utils import parse_channels, update_all_controller_channel_lists
+from ..utils.rna_utils import compile_channels, update_all_controller_channel_lists
 from ..utils.osc import OSC
 from ..utils.orb_utils import find_addresses
 
@@ -24,9 +24,11 @@ class CommonUpdaters:
         if not hasattr(self, "str_manual_fixture_selection") or not hasattr(self, "selected_group_enum"):
             return
         
+        old_patch = CommonUpdaters._find_patch_signature(self)
+
         if self.str_manual_fixture_selection != "":
             self.is_text_not_group = True # Used primarily by UI
-            channels_list = parse_channels(self.str_manual_fixture_selection)
+            channels_list = compile_channels(self.str_manual_fixture_selection).channels
 
             num_channels = len(channels_list)
             if num_channels > 1:
@@ -58,11 +60,29 @@ class CommonUpdaters:
         if hasattr(self, "object_identities_enum"):
             self.object_identities_enum = new_type
 
-        # Update channels list
-        self.list_group_channels.clear()
-        for chan in channels_list:
-            item = self.list_group_channels.add()
-            item.chan = chan
+        # Update channels list, but leave it alone if nothing changed. update_all_controller_channel_lists()
+        # comes through here for every controller whenever any group changes.
+        if len(self.list_group_channels) != len(channels_list) or any(
+                item.chan != chan for item, chan in zip(self.list_group_channels, channels_list)):
+            self.list_group_channels.clear()
+            for chan in channels_list:
+                item = self.list_group_channels.add()
+                item.chan = chan
+
+        if CommonUpdaters._find_patch_signature(self) != old_patch:
+            from ..utils.cpv_utils import PatchIndex, FixtureSpatialIndex
+            from ..cpv.find import ControllerRegistry
+            PatchIndex.invalidate()
+            FixtureSpatialIndex.invalidate()
+            ControllerRegistry.invalidate()  # May have become or stopped being an influencer
+
+    @staticmethod
+    def _find_patch_signature(controller):
+        '''What the PatchIndex and FixtureSpatialIndex care about: is this a Fixture, which channel, and how many channels.'''
+        identity = getattr(controller, "object_identities_enum", None)
+        num_channels = len(controller.list_group_channels)
+        first_channel = controller.list_group_channels[0].chan if num_channels > 0 else None
+        return identity, first_channel, num_channels
 
 
     @staticmethod
@@ -165,31 +185,34 @@ class CommonUpdaters:
         if item is None:
             return
         
-        channels_to_add, channels_to_remove = parse_channels(context.scene.scene_props.add_channel_ids, remove=True) # returns list of ints
+        selection = compile_channels(context.scene.scene_props.add_channel_ids) # ChannelSets, not lists
+        channels_to_add, channels_to_remove = selection.channels, selection.exclusions
         
-        if len(channels_to_add) == 0 and len(channels_to_remove) == 0:
+        if not channels_to_add and not channels_to_remove:
             return
         
         i = 0
-        if len(channels_to_add) > 0:
+        if channels_to_add:
+            existing = {ch.chan for ch in item.channels_list}
             for channel in channels_to_add:
                 # Check if the channel already exists
-                if any(ch.chan == channel for ch in item.channels_list):
+                if channel in existing:
                     continue
                 
                 new_channel = item.channels_list.add()
                 new_channel.chan = channel
                 i += 1
             
-        if i == 0 and len(channels_to_remove) == 0:
+        if i == 0 and not channels_to_remove:
             return
         
-        for channel in channels_to_remove:
-            for i, ch in enumerate(item.channels_list):
-                if ch.chan == channel:
-                    item.channels_list.remove(i)
-                    break
+        # Backwards, so removing one doesn't shift the ones still to check
+        for i in reversed(range(len(item.channels_list))):
+            if item.channels_list[i].chan in channels_to_remove:
+                item.channels_list.remove(i)
 
+        from ..utils.cpv_utils import PatchIndex
+        PatchIndex.invalidate()
         update_all_controller_channel_lists(context)
              
 
@@ -234,6 +257,11 @@ class CommonUpdaters:
         bpy.ops.alva_object.summon_movers()
 
 
+    def sem_updater(self, context):
+        from ..cpv.find import ControllerRegistry
+        ControllerRegistry.invalidate()  # SEM objects get updated every frame
+
+
     def speaker_number_updater(self, context):
         if self.int_speaker_number == 0:
             return
@@ -187,7 +187,18 @@ class SequencerUpdaters:
             return  # Stops infinite recursion
 
 
+    def eos_cue_number_updater(self, context):
+        from ..utils.strip_index import StripIndex
+        StripIndex.invalidate()  # Strip may have become or stopped being a livemap cue
+        SequencerUpdaters.motif_property_updater(self, context)
+
+
     def motif_type_enum_updater(self, context):
+        from ..utils.strip_index import StripIndex
+        from ..cpv.find import ControllerRegistry
+        StripIndex.invalidate()  # Strip moved to a different motif type
+        ControllerRegistry.invalidate()  # May have become or stopped being an animation strip
+
         active_strip = context.scene.sequence_editor.active_strip
         if not active_strip:
             return
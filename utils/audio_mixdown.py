@@ -0,0 +1,326 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import math
+import os
+import tempfile
+import types
+import wave
+
+import bpy
+import numpy as np   # type: ignore
+
+from ..maintenance.logging import alva_log
+from .audio_utils import BatchedVolumeRenderer, REMAP_MINIMUM
+from .event_utils import EventUtils
+
+'''
+Live Spatial Audio tells Qlab how loud each sound should be in each speaker, frame by frame, over
+the network. For the final show, a lot of people would rather not depend on Blender at all. They
+want one plain audio file per speaker that already has all the 3D movement mixed in, so any
+many-channel player can just press GO.
+
+That's what this makes: one WAV per speaker, for a frame range (the whole scene by default).
+
+We do it in two passes:
+
+    1. Gain envelopes. Go through the frame range (every frame, or every gain_step frames to go
+       faster) and ask BatchedVolumeRenderer how loud every sound strip is in every speaker,
+       using the exact same math as the live system. That's a 3D table:
+
+           gains[point in time, sound strip, speaker]
+
+       A two hour show at 30 fps with 12 strips and 32 speakers is about 330 MB of numbers, so
+       the table lives in a temporary file on disk (a NumPy memmap), not in RAM.
+
+    2. Audio. Walk through the output a couple of seconds at a time. For each chunk, read just
+       that chunk of each sound strip that's playing (Blender's aud module decodes any format
+       Blender can play, mixed down to mono and resampled to the scene's mix rate), multiply it
+       by its gain in each speaker, add it to that speaker's chunk, and write every speaker's
+       chunk to its file. Gains are smoothly interpolated between frames so fades don't step.
+
+Only one chunk of audio per strip and speaker is ever in memory, so a 2 hour show takes about as
+much RAM as a 2 minute one.
+
+aud can't hand us a sound a bit at a time, only "this stretch of it" (limit), and every limit
+starts the resampler over from nothing. Started cold, it spends its first few samples settling,
+and started at an arbitrary sample it can land a fraction of a sample away from where the last
+chunk left off. Both are clicks at every chunk boundary. So each read starts a little early, at a
+sample where the resampler lines up exactly with the original file (see StripAudioReader), and
+the extra samples are thrown away. Positions are counted in whole samples, never seconds, so
+one chunk always picks up exactly where the last one stopped.
+
+Gains are the live system's dB levels (0 to -59) turned into amplitudes, and 0 volume is silence,
+the same thing Qlab does at -59. Files are 24-bit mono PCM, named after each speaker's number.
+
+This only needs a scene, so it runs fine headless:
+
+    blender -b show.blend --python-expr "import bpy; bpy.ops.alva_sequencer.export_audio(filepath='/renders/')"
+
+Like the old bake, it moves the playhead through every frame (so animation and constraints are
+evaluated), then puts it back where it was.
+'''
+
+CHUNK_SECONDS = 2
+SAMPLE_WIDTH = 3  # 24-bit PCM
+FULL_SCALE = 2 ** 23 - 1
+PROGRESS_INTERVAL = 500  # frames
+RESAMPLER_SETTLE_SAMPLES = 2048  # Longer than the high quality resampler's filter
+
+
+class MixdownRenderer:
+    def __init__(self, scene, directory, frame_start=None, frame_end=None, gain_step=1, chunk_seconds=CHUNK_SECONDS):
+        self.scene = scene
+        self.directory = directory
+        self.frame_start = scene.frame_start if frame_start is None else frame_start
+        self.frame_end = scene.frame_end if frame_end is None else frame_end
+        self.gain_step = max(1, gain_step)
+        self.fps = EventUtils.get_frame_rate(scene)
+        self.sample_rate = scene.render.ffmpeg.audio_mixrate
+        self.chunk_samples = max(1, int(chunk_seconds * self.sample_rate))
+
+
+    def execute(self):
+        '''Returns the paths of the speaker files it wrote.'''
+        strips = self._find_strips()
+        if not strips:
+            return []
+
+        speakers = list(dict.fromkeys(speaker for _, _, strip_speakers in strips for speaker in strip_speakers))
+        os.makedirs(self.directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory() as scratch_directory:
+            sound_files = self._find_sound_files(strips, scratch_directory)  # Before anything is written
+            envelope_frames, gains = self._render_gain_envelopes(strips, speakers, scratch_directory)
+            paths = self._write_speaker_files(strips, speakers, sound_files, envelope_frames, gains)
+            del gains  # Let go of the memmap before its folder is deleted
+        return paths
+
+    def _find_strips(self):
+        '''Returns [(sound strip, sound object, [speakers])] for every unmuted sound strip on an audio object.'''
+        sequence_editor = getattr(self.scene, "sequence_editor", None)
+        if not sequence_editor:
+            return []
+
+        strips = []
+        for strip in sequence_editor.sequences_all:
+            if strip.type != 'SOUND' or strip.mute or not strip.selected_stage_object or not strip.sound:
+                continue
+            sound_object = strip.selected_stage_object
+            speakers = [
+                speaker.speaker_pointer
+                for speaker_list in sound_object.speaker_list if speaker_list.name == strip.name
+                for speaker in speaker_list.speakers if speaker.speaker_pointer
+            ]
+            if speakers:
+                strips.append((strip, sound_object, list(dict.fromkeys(speakers))))
+        return strips
+
+    def _find_sound_files(self, strips, scratch_directory):
+        '''
+        Returns {strip: path of a file aud can open}. Packed sounds are written out to the scratch
+        folder first. Raises RuntimeError naming the strip if a sound file is missing, so we find
+        out before any speaker file is started instead of halfway through the show.
+        '''
+        sound_files = {}
+        for index, (strip, _, _) in enumerate(strips):
+            sound = strip.sound
+            if sound.packed_file:
+                extension = os.path.splitext(sound.filepath)[1]
+                path = os.path.join(scratch_directory, f"packed_sound_{index}{extension}")
+                with open(path, 'wb') as packed_copy:
+                    packed_copy.write(bytes(sound.packed_file.data))
+            else:
+                path = bpy.path.abspath(sound.filepath)
+                if not os.path.isfile(path):
+                    raise RuntimeError(f"Sound strip \"{strip.name}\" can't find its audio file: {path}")
+            sound_files[strip] = path
+        return sound_files
+
+
+    def _render_gain_envelopes(self, strips, speakers, scratch_directory):
+        '''Pass 1. Returns (frames, gains[point, strip, speaker]) with gains as amplitudes, stored on disk.'''
+        envelope_frames = np.unique(np.append(np.arange(self.frame_start, self.frame_end, self.gain_step), self.frame_end))
+        sound_objects = list(dict.fromkeys(sound_object for _, sound_object, _ in strips))
+        object_rows = [sound_objects.index(sound_object) for _, sound_object, _ in strips]
+        speaker_columns = {speaker: column for column, speaker in enumerate(speakers)}
+
+        self._is_routed = np.zeros((len(strips), len(speakers)), dtype=bool)  # Strips only play in their own speakers
+        for row, (_, _, strip_speakers) in enumerate(strips):
+            self._is_routed[row, [speaker_columns[speaker] for speaker in strip_speakers]] = True
+
+        gains = np.lib.format.open_memmap(
+            os.path.join(scratch_directory, "gains.npy"), mode='w+', dtype=np.float32,
+            shape=(len(envelope_frames), len(strips), len(speakers))
+        )
+
+        original_frame = self.scene.frame_current
+        try:
+            for point, frame in enumerate(envelope_frames):
+                self.scene.frame_set(int(frame))
+                volumes = BatchedVolumeRenderer.render_matrix(sound_objects, speakers)[object_rows]
+                gains[point] = np.where(self._is_routed, MixdownRenderer.to_amplitude(volumes), 0)
+                if point % PROGRESS_INTERVAL == 0:
+                    alva_log('audio', lambda: f"AUDIO: Mixdown gains at frame {frame} of {self.frame_end}")
+        finally:
+            self.scene.frame_set(original_frame)
+
+        gains.flush()
+        return envelope_frames, gains
+
+    @staticmethod
+    def to_amplitude(volumes):
+        '''0-1 volume to linear amplitude, through the same dB range the live system sends to Qlab.'''
+        decibels = volumes * (0 - REMAP_MINIMUM) + REMAP_MINIMUM
+        return np.where(volumes > 0, 10 ** (decibels / 20), 0)
+
+
+    def _write_speaker_files(self, strips, speakers, sound_files, envelope_frames, gains):
+        '''Pass 2. Mixes the strips' audio chunk by chunk into one file per speaker. Deletes them all if it fails.'''
+        paths = [os.path.join(self.directory, f"{speaker.int_speaker_number}.wav") for speaker in speakers]
+        readers = {}
+        total_samples = int(round((self.frame_end + 1 - self.frame_start) / self.fps * self.sample_rate))
+        frames_per_sample = self.fps / self.sample_rate
+
+        speaker_files = []
+        is_finished = False
+        try:
+            for path in paths:
+                speaker_files.append(self._open_wav(path))
+            for chunk_start in range(0, total_samples, self.chunk_samples):
+                count = min(self.chunk_samples, total_samples - chunk_start)
+                sample_frames = self.frame_start + (chunk_start + np.arange(count)) * frames_per_sample
+                mix = np.zeros((len(speakers), count), dtype=np.float32)
+
+                for strip_index, (strip, _, _) in enumerate(strips):
+                    self._mix_strip(mix, strip_index, strip, readers, sound_files, chunk_start, sample_frames, envelope_frames, gains)
+
+                for speaker_file, samples in zip(speaker_files, mix):
+                    speaker_file.writeframes(MixdownRenderer.to_pcm(samples))
+
+                alva_log('audio', lambda: f"AUDIO: Mixdown wrote {(chunk_start + count) / self.sample_rate:.0f} of {total_samples / self.sample_rate:.0f} seconds")
+            is_finished = True
+        finally:
+            for speaker_file in speaker_files:
+                speaker_file.close()
+            if not is_finished:  # Don't leave half a show behind looking like a finished mixdown
+                for path in paths[:len(speaker_files)]:
+                    if os.path.exists(path):
+                        os.remove(path)
+
+        return paths
+
+    def _mix_strip(self, mix, strip_index, strip, readers, sound_files, chunk_start, sample_frames, envelope_frames, gains):
+        is_audible = (sample_frames >= strip.frame_final_start) & (sample_frames < strip.frame_final_end)
+        if not is_audible.any():
+            return
+
+        first, last = np.flatnonzero(is_audible)[[0, -1]]
+        frames = sample_frames[first:last + 1]
+        strip_start_sample = int(round((strip.frame_start - self.frame_start) / self.fps * self.sample_rate))
+
+        try:
+            if strip not in readers:
+                readers[strip] = StripAudioReader(sound_files[strip], self.sample_rate)
+            audio = readers[strip].read(chunk_start + first - strip_start_sample, len(frames))
+        except Exception as e:
+            raise RuntimeError(f"Couldn't read the audio for sound strip \"{strip.name}\": {e}") from e
+
+        # Only the few envelope points around this chunk, so the memmap only reads what it needs.
+        start_point = max(np.searchsorted(envelope_frames, frames[0], side='right') - 1, 0)
+        end_point = np.searchsorted(envelope_frames, frames[-1], side='left') + 1
+        local_frames = envelope_frames[start_point:end_point]
+        local_gains = np.asarray(gains[start_point:end_point, strip_index])
+
+        for speaker_index in np.flatnonzero(self._is_routed[strip_index]):
+            speaker_gains = np.interp(frames, local_frames, local_gains[:, speaker_index])
+            mix[speaker_index, first:last + 1] += audio * speaker_gains
+
+    @staticmethod
+    def to_pcm(samples):
+        '''Float samples to 24-bit little-endian PCM bytes.'''
+        integers = np.round(np.clip(samples, -1, 1) * FULL_SCALE).astype('<i4')
+        return integers.view(np.uint8).reshape(-1, 4)[:, :SAMPLE_WIDTH].tobytes()
+
+    def _open_wav(self, path):
+        speaker_file = wave.open(path, 'wb')
+        speaker_file.setnchannels(1)
+        speaker_file.setsampwidth(SAMPLE_WIDTH)
+        speaker_file.setframerate(self.sample_rate)
+        return speaker_file
+
+
+class StripAudioReader:
+    '''
+    Reads any stretch of a sound file as mono float samples, without decoding the rest of the file.
+
+    Each read starts up to RESAMPLER_SETTLE_SAMPLES (plus one alignment step) early and throws
+    those samples away, so the resampler has settled by the first sample we keep. The early start
+    is rounded down to a multiple of alignment_samples, which is how often a sample at our rate
+    falls exactly on a sample of the file (160 samples for 44.1 kHz into 48 kHz). Starting there,
+    the resampler is in exactly the state it would be in if it had played through from the top.
+    '''
+    def __init__(self, path, sample_rate):
+        import aud
+        self.sample_rate = sample_rate
+        sound = aud.Sound(path)
+        file_rate = int(sound.specs[0])
+        self.alignment_samples = sample_rate // math.gcd(file_rate, sample_rate)
+        self.sound = sound.rechannel(1).resample(sample_rate, True)  # True for the high quality resampler
+
+    def read(self, position, count):
+        '''Returns count samples starting at sample position of the resampled sound. Before the start and past the end is silence.'''
+        samples = np.zeros(count, dtype=np.float32)
+        first = max(position, 0)
+        end = position + count
+        if first >= end:
+            return samples
+
+        start = max(first - RESAMPLER_SETTLE_SAMPLES, 0) // self.alignment_samples * self.alignment_samples
+        # A quarter sample in, since aud turns seconds into samples by rounding down. The end can run over, we cut it.
+        stretch = self.sound.limit((start + 0.25) / self.sample_rate, (end + 1) / self.sample_rate)
+        data = np.asarray(stretch.data(), dtype=np.float32).reshape(-1)[first - start:]
+        length = min(end - first, len(data))
+        samples[first - position:first - position + length] = data[:length]
+        return samples
+
+
+def test_audio_mixdown(SENSITIVITY): # Return True for fail, False for pass
+    '''Mixes a steady tone in short chunks and checks that nothing jumps where one chunk meets the next.'''
+    tone_rate, mix_rate, pitch, amplitude = 44100, 48000, 441, .5
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            tone_path = os.path.join(directory, "tone.wav")
+            tone = amplitude * np.sin(2 * np.pi * pitch * np.arange(3 * tone_rate) / tone_rate)
+            with wave.open(tone_path, 'wb') as tone_file:
+                tone_file.setnchannels(1)
+                tone_file.setsampwidth(2)
+                tone_file.setframerate(tone_rate)
+                tone_file.writeframes(np.round(tone * 32767).astype('<i2').tobytes())
+
+            render = types.SimpleNamespace(fps=24, fps_base=1, ffmpeg=types.SimpleNamespace(audio_mixrate=mix_rate))
+            scene = types.SimpleNamespace(frame_start=1, frame_end=48, render=render)
+            class ToneStrip:  # Mixdown keeps dictionaries by strip, so this has to be hashable
+                name, frame_start, frame_final_start, frame_final_end = "Tone", 1, 1, 49
+            strip = ToneStrip()
+            speaker = types.SimpleNamespace(int_speaker_number=1)
+
+            renderer = MixdownRenderer(scene, directory, chunk_seconds=.1)
+            renderer._is_routed = np.ones((1, 1), dtype=bool)
+            path, = renderer._write_speaker_files(
+                [(strip, None, [speaker])], [speaker], {strip: tone_path}, np.array([1, 48]), np.ones((2, 1, 1), dtype=np.float32)
+            )
+
+            with wave.open(path, 'rb') as speaker_file:
+                pcm = np.frombuffer(speaker_file.readframes(speaker_file.getnframes()), dtype=np.uint8).reshape(-1, SAMPLE_WIDTH)
+        samples = (np.pad(pcm, ((0, 0), (1, 0))).view('<i4').reshape(-1) >> 8) / FULL_SCALE
+
+        largest_step = 2 * np.pi * pitch / mix_rate * amplitude  # Steepest a sine this loud ever gets between two samples
+        boundaries = np.arange(renderer.chunk_samples, len(samples), renderer.chunk_samples)
+        jumps = np.abs(samples[boundaries] - samples[boundaries - 1])
+        return len(samples) != 2 * mix_rate or jumps.max() > largest_step * (1 + SENSITIVITY)
+
+    except Exception as e:
+        print(f"Audio mixdown test error: {e}")
+        return True
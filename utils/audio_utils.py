@@ -4,6 +4,10 @@
 
 import bpy
 import math
+import numpy as np   # type: ignore
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+from mathutils.kdtree import KDTree
 
 from ..maintenance.logging import alva_log
 from .osc import OSC
@@ -30,9 +34,9 @@ class VolumeRenderer:
         1. Use matrix to ensure constraints have a say since we want user to be able 
            to put both speaker rigs themselves AND audio objects on Follow Path constraints.
 
-        2. Use the closest vertice as sound_object center if scaling is not uniform since 
-           we don't have a better way figure out how close a point is to an iregular mesh.
-           User can subdivide the audio object mesh for a smoother experience.
+        2. Use the closest point on the sound_object's surface as its center if scaling is not
+           uniform, since the origin says nothing about how close an irregular mesh is. See
+           ClosestPointIndex for how we find that point without checking every vertex.
 
         3. Multiply sound_object scale by 5 for better experience if scaling is uniform since
            the default scale of 1 results in too small a fade radius. Fade radius meaning
@@ -64,8 +68,8 @@ class VolumeRenderer:
         scale_factor = self._find_scale_factor(adjustment_multiplier)
         volume = max(distance / scale_factor, 1e-6)
         logarithmic_volume = self._apply_logarithmic_falloff(volume)
-        alva_log('audio', f"\nAUDIO: distance: {distance}; scale_factor: {scale_factor}, logarithmic_volume: {logarithmic_volume}")
-        expanded_volume = self._map_volume(logarithmic_volume)
+        alva_log('audio', lambda: f"\nAUDIO: distance: {distance}; scale_factor: {scale_factor}, logarithmic_volume: {logarithmic_volume}")
+        expanded_volume = self.map_volume(logarithmic_volume)
         self._redraw_ui()
         OSCInterface.publish_volume(self.speaker.int_speaker_number, self.audio_cue, expanded_volume)
         return logarithmic_volume
@@ -76,8 +80,8 @@ class VolumeRenderer:
             sound_object_world_location = self.sound_object.matrix_world.to_translation()
             adjusted_multiplier = SPEAKER_SCALE_MULTIPLIER
         else:
-            closest_vertex = GeometryHelper.find_closest_vertex_to_speaker(self.speaker, self.sound_object)
-            sound_object_world_location = closest_vertex
+            closest_point = GeometryHelper.find_closest_point_to_speaker(self.speaker, self.sound_object)
+            sound_object_world_location = closest_point if closest_point is not None else self.sound_object.matrix_world.to_translation()
             adjusted_multiplier = 1
 
         return sound_object_world_location, adjusted_multiplier
@@ -91,7 +95,8 @@ class VolumeRenderer:
         volume = 1 - math.log10(adjusted_distance + 1)
         return max(0, min(round(volume, 2), 1))  # Clamp the volume between 0 and 1
 
-    def _map_volume(self, volume):
+    @staticmethod
+    def map_volume(volume):
         remapped_volume = volume * (0 - REMAP_MINIMUM) + REMAP_MINIMUM
         return max(REMAP_MINIMUM, min(remapped_volume, 0))
 
@@ -102,23 +107,233 @@ class VolumeRenderer:
                     area.tag_redraw()
 
 
-class GeometryHelper:
+class BatchedVolumeRenderer:
+    '''
+    VolumeRenderer answers "how loud is this one sound object in this one speaker?" That's fine
+    for the sequencer operators that render one strip at a time. But the event manager asks
+    it for every sound object and every speaker on every frame and every depsgraph update. With
+    32 speakers and a dozen moving objects, that's hundreds of VolumeRenderers, hundreds of
+    Vector subtractions, hundreds of OSC messages, and hundreds of redraw requests per frame,
+    even when nothing moved.
+
+    This does the same math for everybody at once:
+
+        1. Gather every sound object and every speaker once, with their world locations and
+           average scales, into NumPy arrays.
+
+        2. Make the object x speaker distance matrix in one go. Row 3, column 7 is how far
+           object 3 is from speaker 7. Objects with non-uniform scale still use the closest
+           point on their surface to each speaker, like VolumeRenderer does, so their rows are
+           filled in from ClosestPointIndex instead.
+
+        3. Divide by the scale factors and apply the same logarithmic falloff, as whole-matrix
+           operations.
+
+        4. Only map to dB and send a speaker's level for a cue if it's different from what we
+           sent last time, and only touch the UI (dummy_volume, sequencer redraw) if something
+           actually changed.
+
+    The results match VolumeRenderer.render(). If you change the math there, change it here too.
+
+    _last_sent remembers what we told the audio system, keyed by (speaker number, cue). It's
+    cleared on playback start and on undo/redo/load, the same as the lighting console mirror.
+    '''
+    _last_sent = {}  # {(int_speaker_number, audio_cue): 0-1 volume}
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def execute(self):
+        jobs = self._find_jobs()
+        if not jobs:
+            return
+
+        sound_objects = list(dict.fromkeys(sound_object for _, sound_object, _ in jobs))
+        speakers = list(dict.fromkeys(speaker.speaker_pointer for speaker, _, _ in jobs))
+        object_rows = {sound_object: row for row, sound_object in enumerate(sound_objects)}
+        speaker_columns = {speaker: column for column, speaker in enumerate(speakers)}
+
+        volumes = BatchedVolumeRenderer.render_matrix(sound_objects, speakers)
+
+        rows = [object_rows[sound_object] for _, sound_object, _ in jobs]
+        columns = [speaker_columns[speaker.speaker_pointer] for speaker, _, _ in jobs]
+        job_volumes = volumes[rows, columns].tolist()
+
+        if self._publish_changes(jobs, job_volumes):
+            self._redraw_ui()
+
+    def _find_jobs(self):
+        '''Returns [(speaker list item, sound object, audio cue)], one per speaker per sound strip.'''
+        jobs = []
+        for strip in self.scene.sequence_editor.sequences_all:
+            if strip.type != 'SOUND' or not strip.selected_stage_object:
+                continue
+            sound_object = strip.selected_stage_object
+            for speaker_list in sound_object.speaker_list:
+                if speaker_list.name == strip.name:
+                    jobs.extend((speaker, sound_object, strip.int_sound_cue) for speaker in speaker_list.speakers if speaker.speaker_pointer)
+        return jobs
+
+    @staticmethod
+    def render_matrix(sound_objects, speakers):
+        '''Returns the 0-1 volume of every sound object (rows) in every speaker (columns). Sends nothing.'''
+        speaker_locations = np.array([tuple(speaker.matrix_world.to_translation()) for speaker in speakers], dtype=float)
+        speaker_scales = np.array([sum(speaker.scale) / 3 for speaker in speakers], dtype=float)
+        object_scales = np.array([sum(sound_object.scale) / 3 for sound_object in sound_objects], dtype=float)
+        is_uniform = np.array([BatchedVolumeRenderer.is_uniformly_scaled(sound_object) for sound_object in sound_objects], dtype=bool)
+
+        distances = np.empty((len(sound_objects), len(speakers)))
+        if is_uniform.any():
+            object_locations = np.array([
+                tuple(sound_object.matrix_world.to_translation()) if uniform else (0, 0, 0)
+                for sound_object, uniform in zip(sound_objects, is_uniform)
+            ], dtype=float)
+            distances[is_uniform] = np.linalg.norm(object_locations[is_uniform, None, :] - speaker_locations[None, :, :], axis=2)
+
+        if not is_uniform.all():
+            for row in np.flatnonzero(~is_uniform):
+                distances[row] = BatchedVolumeRenderer._closest_point_distances(sound_objects[row], speaker_locations)
+
+        multipliers = np.where(is_uniform, SPEAKER_SCALE_MULTIPLIER, 1)
+        scale_factors = (multipliers * object_scales)[:, None] * speaker_scales[None, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volumes = np.maximum(np.round(distances, 2) / scale_factors, 1e-6)
+        volumes = np.nan_to_num(volumes, nan=np.inf)  # A zero scale is as far away as it gets
+        return np.clip(np.round(1 - np.log10(volumes + 1), 2), 0, 1)
+
+    @staticmethod
+    def _closest_point_distances(sound_object, speaker_locations):
+        '''Distance from each speaker to the closest point on the object's surface, like GeometryHelper.find_closest_point_to_speaker.'''
+        closest_points = ClosestPointIndex.find_closest_points(sound_object, speaker_locations)
+        if closest_points is None:
+            closest_points = [tuple(sound_object.matrix_world.to_translation())] * len(speaker_locations)
+        return np.linalg.norm(speaker_locations - np.array(closest_points, dtype=float), axis=1)
+
     @staticmethod
-    def find_closest_vertex_to_speaker(speaker, sound_object):
-        '''Find the vertex closest to the speaker in world space'''
-        object_mesh = sound_object.data
-        closest_vertex = None
-        min_distance = float('inf')
+    def is_uniformly_scaled(sound_object):
+        scale_x, scale_y, scale_z = sound_object.scale
+        return round(scale_x, 2) == round(scale_y, 2) == round(scale_z, 2)
 
-        for vertex in object_mesh.vertices:
-            vertex_world_position = sound_object.matrix_world @ vertex.co
-            distance_to_speaker = (speaker.location - vertex_world_position).length
+    def _publish_changes(self, jobs, job_volumes):
+        anything_changed = False
+        for (speaker, _, audio_cue), volume in zip(jobs, job_volumes):
+            if round(speaker.dummy_volume, 2) != volume:  # Stored as a 32-bit float
+                speaker.dummy_volume = volume
+                anything_changed = True
 
-            if distance_to_speaker < min_distance:
-                min_distance = distance_to_speaker
-                closest_vertex = vertex_world_position
+            key = (speaker.speaker_pointer.int_speaker_number, audio_cue)
+            if BatchedVolumeRenderer._last_sent.get(key) == volume:
+                continue
+            BatchedVolumeRenderer._last_sent[key] = volume
+            expanded_volume = VolumeRenderer.map_volume(volume)
+            OSCInterface.publish_volume(key[0], audio_cue, expanded_volume)
+            anything_changed = True
 
-        return closest_vertex
+        alva_log('audio', lambda: f"\nAUDIO: batched {len(jobs)} speaker volumes. Changed: {anything_changed}")
+        return anything_changed
+
+    def _redraw_ui(self):
+        if bpy.context.screen:
+            for area in bpy.context.screen.areas:
+                if area.type == 'SEQUENCE_EDITOR':
+                    area.tag_redraw()
+
+
+    @classmethod
+    def reset(cls):
+        cls._last_sent = {}
+
+
+class ClosestPointIndex:
+    '''
+    When an audio object is squashed or stretched (non-uniform scale), we measure from the
+    closest point on its surface to each speaker instead of from its origin. We used to find
+    that point by moving every vertex into world space and checking how far each one was from
+    the speaker, for every speaker, on every update. A 10,000 vertex mesh and 32 speakers made
+    that 320,000 Python steps per object per frame. Users were also told to subdivide their
+    audio object meshes for smoother fades, which made it even slower.
+
+    Instead, we build a BVH tree (a box of boxes of boxes around the mesh's faces) once per mesh
+    and keep it. Asking it "what's the closest point on your surface to here?" only opens the
+    few boxes near "here", so it's fast even for very detailed meshes, and we get the true
+    closest point on the faces rather than just the closest corner.
+
+    The tree is built from the mesh as it is stored, in local space, so it stays good no matter
+    how the object is moved, rotated, or scaled. To ask it something, we move the speaker into
+    the object's local space, ask, and move the answer back out to world space. With
+    non-uniform scale, "closest" in local space can be a little different from "closest" in
+    world space. That's fine for a fade, and it's what makes the tree reusable between frames.
+
+    Meshes with no faces (just vertices or edges) get a kd-tree of their vertices instead, so
+    they behave like before.
+
+    The trees are thrown away when the event manager sees a mesh was edited, and on undo, redo,
+    and file load. As a backup, a tree is also rebuilt if its mesh's vertex or face count no
+    longer matches.
+    '''
+    _trees = {}  # {mesh: (vertex count, polygon count, tree)}
+
+    @classmethod
+    def find_closest_points(cls, sound_object, world_points):
+        '''Returns the closest surface point to each of world_points, in world space. None if the mesh is empty.'''
+        tree = cls._find_tree(sound_object.data)
+        if tree is None:
+            return None
+
+        matrix = sound_object.matrix_world
+        to_local = matrix.inverted()
+        closest_points = []
+        for world_point in world_points:
+            location = tree.find_nearest(to_local @ Vector(world_point))[0]  # BVHTree and KDTree both lead with the location
+            closest_points.append(tuple(matrix @ location) if location is not None else tuple(matrix.to_translation()))
+        return closest_points
+
+    @classmethod
+    def _find_tree(cls, mesh):
+        vertex_count, polygon_count = len(mesh.vertices), len(mesh.polygons)
+        cached = cls._trees.get(mesh)
+        if cached is not None and cached[:2] == (vertex_count, polygon_count):
+            return cached[2]
+
+        tree = cls._build_tree(mesh) if vertex_count else None
+        cls._trees[mesh] = (vertex_count, polygon_count, tree)
+        return tree
+
+    @staticmethod
+    def _build_tree(mesh):
+        vertices = [vertex.co.copy() for vertex in mesh.vertices]
+        if len(mesh.polygons):
+            return BVHTree.FromPolygons(vertices, [tuple(polygon.vertices) for polygon in mesh.polygons])
+
+        tree = KDTree(len(vertices))
+        for index, co in enumerate(vertices):
+            tree.insert(co, index)
+        tree.balance()
+        return _KDTreeNearest(tree)
+
+
+    @classmethod
+    def invalidate(cls):
+        cls._trees = {}
+
+
+class _KDTreeNearest:
+    '''Gives a KDTree the same find_nearest() as a BVHTree.'''
+    def __init__(self, tree):
+        self.tree = tree
+
+    def find_nearest(self, point):
+        return self.tree.find(point)
+
+
+class GeometryHelper:
+    @staticmethod
+    def find_closest_point_to_speaker(speaker, sound_object):
+        '''Find the point on the sound object's surface closest to the speaker, in world space. None if the mesh is empty.'''
+        speaker_location = tuple(speaker.matrix_world.to_translation())
+        closest_points = ClosestPointIndex.find_closest_points(sound_object, [speaker_location])
+        return Vector(closest_points[0]) if closest_points else None
 
 
 class OSCInterface:
@@ -0,0 +1,185 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bisect
+import heapq
+import numbers
+
+'''
+People type channel selections like "1 thru 4000 except evens" or "1-100 not 50-60 keep 55", and
+parse_channels() used to answer with a plain list of every single channel. That meant building
+a 4,000 item list for a range, filtering it for evens or odds, and then checking every channel
+against every exclusion one at a time. Fine for "1-10", slow for a big rig, and it happened
+every time the selection was looked at.
+
+A ChannelSet stores ranges instead of channels. The trick is that evens and odds are stored
+separately, each as a sorted list of (first, last) ranges over "which even/odd number is this":
+
+    evens: k stands for channel 2k
+    odds:  k stands for channel 2k + 1
+
+So "1 thru 4000" is one range in each list, "1 thru 4000 except evens" is that same thing with
+the evens list emptied, and "odds from 1 to a million" is still just one range. Union and
+difference are done range by range on each list, and evens()/odds() just drop the other list,
+so none of them ever look at individual channels.
+
+Channels only get spelled out one at a time when somebody actually loops over the set (like
+filling in list_group_channels). len(), "in", and turning the set into "1 Thru 3 + 10" for a
+console command are all worked out from the ranges.
+
+ChannelSets never change after they're made (union() and friends return new ones), so it's
+safe for compile_channels() in rna_utils.py to hand the same one to everybody who typed the
+same thing.
+'''
+
+
+class ChannelSet:
+    __slots__ = ("_evens", "_odds")
+
+    def __init__(self, evens=(), odds=()):
+        self._evens = tuple(evens)  # Sorted, non-overlapping, non-touching (first, last) ranges of k
+        self._odds = tuple(odds)
+
+    @classmethod
+    def from_range(cls, start, end):
+        '''Every channel from start to end, including both. Backwards ranges like "10-1" work too.'''
+        low, high = min(start, end), max(start, end)
+        return cls(_make_range(-(-low // 2), high // 2), _make_range(-(-(low - 1) // 2), (high - 1) // 2))
+
+    @classmethod
+    def from_channels(cls, channels):
+        evens, odds = [], []
+        for channel in sorted(set(channels)):
+            ranges, k = (evens, channel // 2) if channel % 2 == 0 else (odds, (channel - 1) // 2)
+            if ranges and ranges[-1][1] == k - 1:
+                ranges[-1] = (ranges[-1][0], k)
+            else:
+                ranges.append((k, k))
+        return cls(evens, odds)
+
+
+    def union(self, other):
+        return ChannelSet(_union(self._evens, other._evens), _union(self._odds, other._odds))
+
+    def difference(self, other):
+        return ChannelSet(_difference(self._evens, other._evens), _difference(self._odds, other._odds))
+
+    def evens(self):
+        return ChannelSet(self._evens, ())
+
+    def odds(self):
+        return ChannelSet((), self._odds)
+
+    __or__ = union
+    __sub__ = difference
+
+
+    def runs(self):
+        '''Yields (first, last) for every stretch of back-to-back channels, in order.'''
+        run_start = run_end = None
+        for start, end in self._segments():
+            if run_start is not None and start == run_end + 1:
+                run_end = end
+                continue
+            if run_start is not None:
+                yield run_start, run_end
+            run_start, run_end = start, end
+        if run_start is not None:
+            yield run_start, run_end
+
+    def _segments(self):
+        '''
+        Walks the number line from one range edge to the next. Between two edges, either both
+        lists cover it (every channel is in, so it's one stretch), only one does (every other
+        channel, so each is its own stretch), or neither does.
+        '''
+        edges = []
+        for first, last in self._evens:
+            edges += ((2 * first, 0, 1), (2 * last + 1, 0, -1))
+        for first, last in self._odds:
+            edges += ((2 * first + 1, 1, 1), (2 * last + 2, 1, -1))
+        edges.sort()
+
+        is_covered = [0, 0]  # [evens, odds]
+        for index, (position, parity, change) in enumerate(edges):
+            is_covered[parity] += change
+            if index + 1 == len(edges) or edges[index + 1][0] == position:
+                continue
+            next_position = edges[index + 1][0]
+            if is_covered[0] and is_covered[1]:
+                yield position, next_position - 1
+            elif is_covered[0] or is_covered[1]:
+                parity = 0 if is_covered[0] else 1
+                first = position + (position - parity) % 2  # First channel of the covered parity
+                for channel in range(first, next_position, 2):
+                    yield channel, channel
+
+
+    def to_list(self):
+        return list(self)
+
+    def __iter__(self):
+        evens = (2 * k for first, last in self._evens for k in range(first, last + 1))
+        odds = (2 * k + 1 for first, last in self._odds for k in range(first, last + 1))
+        return heapq.merge(evens, odds)
+
+    def __len__(self):
+        return sum(last - first + 1 for first, last in self._evens + self._odds)
+
+    def __contains__(self, channel):
+        if not isinstance(channel, numbers.Integral):
+            return False
+        ranges, k = (self._evens, channel // 2) if channel % 2 == 0 else (self._odds, (channel - 1) // 2)
+        row = bisect.bisect_right(ranges, (k, float('inf'))) - 1
+        return row >= 0 and ranges[row][1] >= k
+
+    def __bool__(self):
+        return bool(self._evens or self._odds)
+
+    def __eq__(self, other):
+        if not isinstance(other, ChannelSet):
+            return NotImplemented
+        return self._evens == other._evens and self._odds == other._odds
+
+    def __hash__(self):
+        return hash((self._evens, self._odds))
+
+    def __repr__(self):
+        stretches = " + ".join(str(first) if first == last else f"{first} Thru {last}" for first, last in self.runs())
+        return f"ChannelSet({stretches})"
+
+
+def _make_range(first, last):
+    return ((first, last),) if first <= last else ()
+
+
+def _union(ranges, other_ranges):
+    merged = []
+    for first, last in heapq.merge(ranges, other_ranges):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _difference(ranges, other_ranges):
+    result = []
+    row = 0
+    for first, last in ranges:
+        while row < len(other_ranges) and other_ranges[row][1] < first:
+            row += 1
+        check = row
+        while check < len(other_ranges) and other_ranges[check][0] <= last:
+            cut_first, cut_last = other_ranges[check]
+            if cut_first > first:
+                result.append((first, cut_first - 1))
+            first = max(first, cut_last + 1)
+            if first > last:
+                break
+            check += 1
+        if first <= last:
+            result.append((first, last))
+    return result
@@ -4,12 +4,18 @@
 
 import bpy
 import mathutils
+from functools import lru_cache
+from mathutils import kdtree
+import numpy as np   # type: ignore
 
 from ..assets.sli import SLI
 from ..cpv.find import Find 
+from .channel_set import ChannelSet
 
 from ..as_ui.utils import find_extendables_class
 
+FIXTURE = "Fixture"
+
 
 def find_parent(object):
     """
@@ -73,6 +79,167 @@ def find_controller_type(parent, property_name):
         
 
 
+class PatchIndex:
+    '''
+    Group nodes, mixers, strips, and influencers don't know anything about the fixtures
+    they control. They only know channel numbers. So when the publisher needs something
+    like pan_max or a color profile for channel 12, it has to go find the Fixture object
+    that is patched as channel 12 (the "patch controller").
+
+    We used to find it by looking at every object in bpy.data.objects, for every channel,
+    for every CPV. That's a lot of looking on a big rig. This remembers the answer in a 
+    {channel: Fixture object} dictionary instead.
+
+    The index is thrown away (invalidated) whenever channel assignments could have changed 
+    (controller_ids_updater, channel_ids_updater) and whenever objects are added to or 
+    removed from the file (depsgraph). It is rebuilt lazily the next time someone asks.
+    '''
+    _patch_objects = {}
+    _object_count = -1
+    _is_valid = False
+
+    @classmethod
+    def find(cls, channel):
+        if not cls._is_valid:
+            cls.rebuild()
+
+        obj = cls._patch_objects.get(channel)
+        if obj is None or cls._is_still_patched(obj, channel):
+            return obj
+
+        cls.rebuild()
+        return cls._patch_objects.get(channel)
+
+    @staticmethod
+    def _is_still_patched(obj, channel):
+        try:
+            return (
+                obj.object_identities_enum == FIXTURE and
+                len(obj.list_group_channels) > 0 and
+                obj.list_group_channels[0].chan == channel
+            )
+        except ReferenceError:  # The object was deleted out from under us
+            return False
+
+    @classmethod
+    def rebuild(cls):
+        cls._patch_objects = {}
+        for obj in bpy.data.objects:
+            if obj.object_identities_enum == FIXTURE and len(obj.list_group_channels) > 0:
+                cls._patch_objects.setdefault(obj.list_group_channels[0].chan, obj)
+        cls._object_count = len(bpy.data.objects)
+        cls._is_valid = True
+
+    @classmethod
+    def invalidate(cls):
+        cls._is_valid = False
+
+    @classmethod
+    def invalidate_if_objects_changed(cls):
+        if cls._is_valid and len(bpy.data.objects) != cls._object_count:
+            cls.invalidate()
+
+
+class FixtureSpatialIndex:
+    '''
+    Influencers need to know which fixtures are inside them. To answer that quickly, we keep
+    every fixture-like mesh (a mesh patched as exactly one channel) in a KD-tree, which is a
+    little map of points that can answer "what's near here?" without checking every point.
+
+    We used to build a brand new KD-tree for every influencer, every time it moved, from every
+    mesh in bpy.data.objects, and we built it in that influencer's local space, so nothing could
+    be reused. But the fixtures aren't the thing moving. The influencer is.
+
+    So now there is one KD-tree for everyone, in world space. It only changes when:
+
+        1. Objects are added or removed, or channel assignments change (invalidate). The whole
+           index is rebuilt the next time someone asks.
+        2. A fixture itself moves (update_transforms, from the depsgraph handler). We just fix
+           that fixture's row in the positions array and rebuild the tree from the array.
+
+    To ask "what's inside this influencer?", we turn the influencer's bounding box into a world
+    space sphere, ask the tree for everything in that sphere, and then move just those few
+    points into the influencer's local space with one inverted matrix to do the exact box test.
+    '''
+    _objects = []
+    _rows = {}  # {original object: row in _positions}. Not the name, so renaming a fixture doesn't lose it.
+    _positions = np.empty((0, 3))
+    _kd_tree = None
+    _object_count = -1
+    _is_valid = False
+
+    @classmethod
+    def find_inside_box(cls, matrix_world, bbox_min, bbox_max):
+        '''Returns the indexed objects whose origins are inside the local-space box [bbox_min, bbox_max].'''
+        if not cls._is_valid:
+            cls.rebuild()
+        if not cls._objects:
+            return []
+        if cls._kd_tree is None:
+            cls._build_kd_tree()
+
+        local_center = (bbox_min + bbox_max) / 2
+        local_radius = (bbox_max - local_center).length
+        world_center = matrix_world @ local_center
+        world_radius = local_radius * max(abs(axis) for axis in matrix_world.to_scale())
+
+        rows = [index for _, index, _ in cls._kd_tree.find_range(world_center, world_radius)]
+        if not rows:
+            return []
+
+        inverse = np.array(matrix_world.inverted())
+        world_points = cls._positions[rows]
+        local_points = world_points @ inverse[:3, :3].T + inverse[:3, 3]
+
+        is_inside = np.all((local_points >= np.array(bbox_min)) & (local_points <= np.array(bbox_max)), axis=1)
+        return [cls._objects[row] for row, inside in zip(rows, is_inside) if inside]
+
+    @classmethod
+    def rebuild(cls):
+        cls._objects = [
+            obj for obj in bpy.data.objects
+            if obj.type == 'MESH' and len(obj.list_group_channels) == 1
+        ]
+        cls._rows = {obj: row for row, obj in enumerate(cls._objects)}
+        cls._positions = np.array(
+            [obj.matrix_world.translation[:] for obj in cls._objects], dtype=np.float64
+        ).reshape(len(cls._objects), 3)
+        cls._kd_tree = None
+        cls._object_count = len(bpy.data.objects)
+        cls._is_valid = True
+
+    @classmethod
+    def _build_kd_tree(cls):
+        kd = kdtree.KDTree(len(cls._objects))
+        for row, position in enumerate(cls._positions.tolist()):
+            kd.insert(position, row)
+        kd.balance()
+        cls._kd_tree = kd
+
+    @classmethod
+    def update_transforms(cls, objects):
+        '''Called with the objects whose transforms just changed. Only fixtures we know about matter.'''
+        if not cls._is_valid:
+            return
+        for obj in objects:
+            row = cls._rows.get(getattr(obj, "original", obj))
+            if row is None:
+                continue
+            position = obj.matrix_world.translation[:]
+            if tuple(cls._positions[row]) != tuple(position):
+                cls._positions[row] = position
+                cls._kd_tree = None
+
+    @classmethod
+    def invalidate(cls):
+        cls._is_valid = False
+
+    @classmethod
+    def invalidate_if_objects_changed(cls):
+        if cls._is_valid and len(bpy.data.objects) != cls._object_count:
+            cls.invalidate()
+
+
 def color_object_to_tuple_and_scale_up(v):
     if type(v) == mathutils.Color:
         return (v.r * 100, v.g * 100, v.b * 100)
@@ -128,6 +295,8 @@ def simplify_channels_list(channels):
     #[1, 2, 3, 10, 11, 15, 16, 17, 18] -> "1 Thru 3 + 10 Thru 11 + 15 Thru 18"
     if not channels:
         return ""
+    if isinstance(channels, ChannelSet):  # Already knows its own stretches, no need to spell it out
+        return " + ".join(str(start) if start == end else f"{start} Thru {end}" for start, end in channels.runs())
     channels.sort()
     combined_channels = []
     start = channels[0]
@@ -148,4 +317,22 @@ def simplify_channels_list(channels):
     else:
         combined_channels.append(f"{start} Thru {end}")
 
-    return " + ".join(combined_channels)
\ No newline at end of file
+    return " + ".join(combined_channels)
+
+
+@lru_cache(maxsize=4096)
+def expand_channels_string(channels):
+    # "1 Thru 3 + 10" -> (1, 2, 3, 10). The opposite of simplify_channels_list.
+    if isinstance(channels, int):
+        return (channels,)
+    expanded = []
+    try:
+        for part in str(channels).split("+"):
+            if "Thru" in part:
+                start, end = part.split("Thru")
+                expanded.extend(range(int(start), int(end) + 1))
+            elif part.strip():
+                expanded.append(int(part))
+    except ValueError:  # Not something simplify_channels_list made, like "1.1" for a part
+        return ()
+    return tuple(expanded)
@@ -11,36 +11,166 @@ from ..utils.osc import OSC
 from ..maintenance.logging import alva_log
 
 
-class EventUtils:
-    @staticmethod
-    def convert_to_props(scene, controllers):
-        '''Find the animated properties inside the controllers.'''
-        props = []
+class AnimatedPropertyIndex:
+    '''
+    To find out what changed on a frame, the event manager needs to know which controller
+    properties are actually animated. Finding that out means digging through every action's
+    fcurves for every property on every controller, which is slow. But the answer almost never 
+    changes while you're scrubbing or playing back. It only changes when keyframes are added 
+    or removed, or when the controllers themselves change.
+
+    So we dig once and remember the answer as a list of entries:
+
+        (controller, where the property lives, its parameter toggle, property name)
+
+    Each frame, we only read the values of those entries (and check the toggle, since the user
+    can flip those without touching any keyframes). The index is rebuilt when the list of 
+    controllers changes or when the depsgraph tells us an action was updated.
+    '''
+    def __init__(self):
+        self.controllers = None
+        self.entries = []
+
+    def is_current(self, controllers):
+        if self.controllers is None:
+            return False
+        return self.controllers is controllers or self.controllers == controllers
+
+    def invalidate(self):
+        self.controllers = None
+        self.entries = []
+
+    def build(self, controllers):
+        self.entries = []
 
         for controller in controllers:
-            if hasattr(controller, 'bl_idname') and controller.bl_idname == 'mixer_type':
-                props.extend(EventUtils._find_props(controller, is_mixer=True))
-            else:
-                props.extend(EventUtils._find_props(controller, is_mixer=False))
-        return props
+            is_mixer = hasattr(controller, 'bl_idname') and controller.bl_idname == 'mixer_type'
+            props_location = controller.parameters if is_mixer else controller
+
+            for toggle, toggle_types in Dictionaries.parameter_toggles.items():
+                for property in toggle_types:
+                    if EventUtils._find_animation_source(props_location, property) is not None:
+                        self.entries.append((controller, props_location, toggle, property))
+
+        self.controllers = controllers
+
+
+class DriverIndex:
+    '''
+    Sorcerer drivers let you move an object in 3D View to control a parameter. Blender updates the
+    driven property by itself, but it doesn't run Sorcerer's updaters for it. So whenever objects
+    move (depsgraph) or the frame changes, we have to find the objects whose drivers read from
+    the objects that moved, and poke them with trigger_special_update.
+
+    We used to find them by looking at every object, every driver, every variable, and every
+    target, every time anything moved. In a scene with lots of drivers, grabbing any object cost
+    a full scan. Drivers almost never change while you're moving things, though, so we turn the
+    question around once and remember it:
+
+        {target object: {objects with drivers that read from it}}
+
+    Then "who cares that these objects moved?" is just a few dictionary lookups.
+
+    The depsgraph gives us evaluated copies of objects, so we always look them up by .original.
+
+    The index is thrown away when the Quick Driver operator adds drivers, when objects are added
+    or deleted, and on undo, redo, and file load. Drivers can also be added or retargeted by hand
+    in Blender's own UI. When that happens, the object with the driver shows up in the depsgraph
+    updates, so for each updated object we compare its driver targets with what we remember and
+    rebuild if they differ. That only looks at the drivers of the objects that just changed.
+    '''
+    _driven_by_target = {}  # {target ID: {driven objects}}
+    _targets_by_owner = {}  # {object with drivers: (target IDs, in driver order)}
+    _object_count = -1
+    _is_valid = False
+
+    @classmethod
+    def find_driven_objects(cls, updated_objects, check_for_changes=True):
+        '''Returns the objects with drivers that read from any of updated_objects.'''
+        if not cls._is_valid:
+            cls.rebuild()
+
+        originals = {getattr(obj, "original", obj) for obj in updated_objects}
+        if check_for_changes and any(cls._drivers_changed(obj) for obj in originals):
+            cls.rebuild()
+
+        driven_objects = set()
+        for obj in originals:
+            driven_objects.update(cls._driven_by_target.get(obj, ()))
+        return driven_objects
+
+    @classmethod
+    def objects_with_drivers(cls, scene):
+        '''Objects in this scene that have drivers. The index covers every scene, so objects elsewhere are left out.'''
+        if not cls._is_valid:
+            cls.rebuild()
+        scene_objects = scene.objects
+        return {obj for obj in cls._targets_by_owner if scene_objects.get(obj.name) == obj}
+
+    @classmethod
+    def _drivers_changed(cls, obj):
+        try:
+            return DriverIndex._find_targets(obj) != cls._targets_by_owner.get(obj, ())
+        except ReferenceError:  # Deleted out from under us
+            return True
 
     @staticmethod
-    def _find_props(controller, is_mixer=False):
+    def _find_targets(obj):
+        if not obj.animation_data or not obj.animation_data.drivers:
+            return ()
+        return tuple(
+            target.id
+            for fcurve in obj.animation_data.drivers
+            for variable in fcurve.driver.variables
+            for target in variable.targets
+            if target.id is not None
+        )
+
+    @classmethod
+    def rebuild(cls):
+        cls._driven_by_target = {}
+        cls._targets_by_owner = {}
+        for obj in bpy.data.objects:
+            try:
+                targets = DriverIndex._find_targets(obj)
+            except Exception as e:
+                print(f"Error processing driver on '{obj.name}': {e}")
+                continue
+            if not targets:
+                continue
+            cls._targets_by_owner[obj] = targets
+            for target in targets:
+                cls._driven_by_target.setdefault(target, set()).add(obj)
+        cls._object_count = len(bpy.data.objects)
+        cls._is_valid = True
+
+    @classmethod
+    def invalidate(cls):
+        cls._is_valid = False
+        cls._driven_by_target = {}
+        cls._targets_by_owner = {}
+
+    @classmethod
+    def invalidate_if_objects_changed(cls):
+        if cls._is_valid and len(bpy.data.objects) != cls._object_count:
+            cls.invalidate()
+
+
+class EventUtils:
+    @staticmethod
+    def convert_to_props(scene, controllers, animated_properties):
+        '''Find the animated properties inside the controllers.'''
+        if not animated_properties.is_current(controllers):
+            animated_properties.build(controllers)
+
         props = []
-        if is_mixer:
-            props_location = controller.parameters
-        else: 
-            props_location = controller
-            
-        for toggle, toggle_types in Dictionaries.parameter_toggles.items():
+        for controller, props_location, toggle, property in animated_properties.entries:
             if getattr(props_location, toggle, False):
-                for property in toggle_types:
-                    if EventUtils._has_keyframes(props_location, property):
-                        raw_value = getattr(props_location, property, None)
-                        value = EventUtils._extract_value(raw_value)
-                        props.append((controller, property, value))
+                raw_value = getattr(props_location, property, None)
+                value = EventUtils._extract_value(raw_value)
+                props.append((controller, property, value))
         return props
-    
+
     @staticmethod
     def _extract_value(raw_value):
         '''Extract the numerical value or a simple representation from the property value.
@@ -59,11 +189,17 @@ class EventUtils:
 
     @staticmethod
     def _has_keyframes(controller, property):
+        return EventUtils._find_animation_source(controller, property) is not None
+
+    @staticmethod
+    def _find_animation_source(controller, property):
+        '''Returns the fcurve animating this property, True for color strips (which are always
+           treated as animated), or None if nothing animates it.'''
         if hasattr(controller, "animation_data") and controller.animation_data:
             if hasattr(controller.animation_data, "action") and controller.animation_data.action:
                 for fcurve in controller.animation_data.action.fcurves:
                     if fcurve.data_path.endswith(property):
-                        return len(fcurve.keyframe_points) > 0
+                        return fcurve if len(fcurve.keyframe_points) > 0 else None
 
         if isinstance(controller, bpy.types.ColorSequence):
             return True
@@ -73,11 +209,12 @@ class EventUtils:
             if hasattr(node_tree, "animation_data") and node_tree.animation_data:
                 action = node_tree.animation_data.action
                 if action:
+                    node_path = controller.path_from_id()
                     for fcurve in action.fcurves:
                         # Check if the data path corresponds to the node and the property
-                        if fcurve.data_path.startswith(controller.path_from_id()) and fcurve.data_path.endswith(property):
-                            return len(fcurve.keyframe_points) > 0
-        return False
+                        if fcurve.data_path.startswith(node_path) and fcurve.data_path.endswith(property):
+                            return fcurve if len(fcurve.keyframe_points) > 0 else None
+        return None
     
     @staticmethod
     def trigger_special_mixer_props(mixers_and_motors):
@@ -154,41 +291,16 @@ class EventUtils:
         OSC.send_osc_lighting("/eos/newcmd", f"Chan {chan_num} X_Focus {x_focus} Enter, Chan {chan_num} Y_Focus {y_focus} Enter, Chan {chan_num} Z_Focus {z_focus} Enter, Chan {chan_num} X_Orientation {x_orientation} Enter, Chan {chan_num} Y_Orientation {y_orientation} Enter, Chan {chan_num} Z_Orientation {z_orientation} Enter", user=0)
                 
     @staticmethod
-    def check_and_trigger_drivers(updated_objects):
-        evaluated_to_original = [obj.name for obj in updated_objects]
-        for obj in bpy.data.objects:
-            if hasattr(obj, "object_identities_enum"):
-                if obj.animation_data and obj.animation_data.drivers:
-                    alva_log("event_manager", "Found animation data in check_and_trigger_drivers.")
-                    for driver in obj.animation_data.drivers:
-                        alva_log("event_manager", "Found driver in check_and_trigger_drivers.")
-                        data_path = driver.data_path
-                        try:
-                            for var in driver.driver.variables:
-                                for target in var.targets:
-                                    if target.id.name in evaluated_to_original:
-                                        EventUtils.trigger_special_update(obj)
-                        except IndexError:
-                            print(f"Failed to parse data path '{data_path}' for drivers on '{obj.name}'")
-                        except Exception as e:
-                            print(f"Error processing driver on '{obj.name}': {e}")
+    def check_and_trigger_drivers(updated_objects, check_for_changes=True):
+        for obj in DriverIndex.find_driven_objects(updated_objects, check_for_changes):
+            alva_log("event_manager", lambda: f"Driver on {obj.name} reads from an updated object.")
+            EventUtils.trigger_special_update(obj)
 
 
     @staticmethod
-    def find_relevant_clock_objects(scene):    
-        relevant_lighting_clock_object = None
-        relevant_audio_strip = None
-        for strip in scene.sequence_editor.sequences:
-            if (strip.type == 'SOUND' and
-                not strip.mute and 
-                getattr(strip, 'int_event_list', 0) != 0 and
-                strip.frame_start <= scene.frame_current < strip.frame_final_end):
-                relevant_lighting_clock_object = strip
-            if (strip.type == 'SOUND' and
-                not strip.mute and 
-                getattr(strip, 'int_sound_cue', 0) != 0 and
-                strip.frame_start <= scene.frame_current < strip.frame_final_end):
-                relevant_audio_strip = strip
+    def find_relevant_clock_objects(scene):
+        from .strip_index import StripIndex
+        relevant_lighting_clock_object, relevant_audio_strip = StripIndex.find_clock_strips(scene, scene.frame_current)
         if not relevant_lighting_clock_object and scene.use_default_clock:
             relevant_lighting_clock_object = scene
         return relevant_lighting_clock_object, relevant_audio_strip
@@ -196,13 +308,8 @@ class EventUtils:
 
     @staticmethod
     def find_livemap_cue(scene, current_frame, active_strip):
-        relevant_strips = [strip for strip in scene.sequence_editor.sequences if getattr(strip, 'eos_cue_number', 0) != 0 and strip.my_settings.motif_type_enum == 'option_cue' and not strip.mute]
-        closest_strip = None
-        for strip in relevant_strips:
-            if strip.frame_start <= current_frame:
-                if closest_strip is None or strip.frame_start > closest_strip.frame_start:
-                    closest_strip = strip
-        return closest_strip
+        from .strip_index import StripIndex
+        return StripIndex.find_livemap_cue(scene, current_frame)
 
                         
     @staticmethod                   
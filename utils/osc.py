@@ -5,18 +5,64 @@
 import bpy 
 import socket
 import struct
-import time
+from functools import lru_cache
 
 from ..maintenance.logging import alva_log
+from .osc_sender import OSCSender
+from .osc_tcp import TCPConnections, LENGTH, TCP_TIMEOUT
 
 DEBUG = False
 
-_eos_sock = None  # Persistent connection reference
-ETC_EOS_TCP_PORT = 3032
-TCP_TIMEOUT = 5 # Not sure why this has to be 5, but setting it to 1 or below seems to break Eos. Extremely fickle on ETC's end.
-
 buttons_are_tcp = True
 
+BUNDLE_HEADER = b"#bundle\0"
+TIMETAG_IMMEDIATELY = struct.pack(">Q", 1)  # OSC's special "right now" time tag
+MAX_DATAGRAM_SIZE = 1472  # 1500 byte Ethernet MTU minus IP and UDP headers, so bundles never fragment
+STRING_TYPE_TAG = b",s\0\0"
+
+
+def pad(data):
+    return data + b"\0" * (4 - (len(data) % 4 or 4))
+
+
+@lru_cache(maxsize=256)
+def encode_address(osc_addr):
+    '''Addresses repeat constantly (/eos/user/0/newcmd), so we only encode each one once.'''
+    if not osc_addr.startswith("/"):
+        osc_addr = "/" + osc_addr
+    return pad(osc_addr.encode() + b"\0")
+
+
+def encode_message(osc_addr, string):
+    return encode_address(osc_addr) + STRING_TYPE_TAG + pad(string.encode() + b"\0")
+
+
+def encode_bundles(messages, max_size=MAX_DATAGRAM_SIZE):
+    '''
+    Packs already-encoded OSC messages into as few OSC bundles as possible without any one
+    bundle getting bigger than a single UDP datagram. A bundle is:
+
+        "#bundle\\0" + 8-byte time tag + (4-byte size + message) + (4-byte size + message) + ...
+
+    A message too big to share a bundle gets a bundle of its own.
+    '''
+    bundles = []
+    elements = []
+    size = len(BUNDLE_HEADER) + len(TIMETAG_IMMEDIATELY)
+
+    for message in messages:
+        element = struct.pack(">I", len(message)) + message
+        if elements and size + len(element) > max_size:
+            bundles.append(b"".join([BUNDLE_HEADER, TIMETAG_IMMEDIATELY] + elements))
+            elements = []
+            size = len(BUNDLE_HEADER) + len(TIMETAG_IMMEDIATELY)
+        elements.append(element)
+        size += len(element)
+
+    if elements:
+        bundles.append(b"".join([BUNDLE_HEADER, TIMETAG_IMMEDIATELY] + elements))
+    return bundles
+
 
 class OSC:
     def correct_argument_because_etc_is_weird(argument):
@@ -24,18 +70,36 @@ class OSC:
         return argument.replace(" at - 00", " at + 00")
         
 
-    def send_osc_lighting(address, argument, user=1, tcp=False):
+    def send_osc_lighting(address, argument, user=1, tcp=False, coalesce_key=None):
         argument = OSC.correct_argument_because_etc_is_weird(argument)
         address = address.replace("/eos", f"/eos/user/{user}")
         scene = bpy.context.scene.scene_props
         ip_address = scene.str_osc_ip_address
         port = scene.int_osc_port
         if DEBUG: alva_log("osc_lighting", argument)
-        OSC.send_osc_string(address, ip_address, port, argument, tcp=tcp)
+        OSC.send_osc_string(address, ip_address, port, argument, tcp=tcp, coalesce_key=coalesce_key)
         #from bpy import spy
         #bpy.spy.make_eos_macros((1, 10), (1, 10), "Go_to_Cue * Enter")
 
 
+    def send_osc_lighting_bundle(pairs, user=1):
+        '''Sends a whole frame's (address, argument) pairs as a handful of UDP datagrams 
+           instead of one datagram per message. The console must support OSC bundles.'''
+        scene = bpy.context.scene.scene_props
+        ip_address = scene.str_osc_ip_address
+        port = scene.int_osc_port
+
+        messages = []
+        for address, argument in pairs:
+            argument = OSC.correct_argument_because_etc_is_weird(argument)
+            address = address.replace("/eos", f"/eos/user/{user}")
+            if DEBUG: alva_log("osc_lighting", argument)
+            messages.append(encode_message(address, argument))
+
+        for bundle in encode_bundles(messages):
+            OSCSender.enqueue(OSC.sock.sendto, bundle, (ip_address, port))
+
+
     def press_lighting_key(key):
         OSC.send_osc_lighting(f"/eos/key/{key}", "1", tcp=buttons_are_tcp)
         OSC.send_osc_lighting(f"/eos/key/{key}", "0", tcp=buttons_are_tcp)
@@ -69,26 +133,23 @@ class OSC:
         OSC.send_osc_string(address, ip_address, port, argument)
 
 
-    def send_osc_string(osc_addr, addr, port, string, tcp=False):
+    def send_osc_string(osc_addr, addr, port, string, tcp=False, coalesce_key=None):
+        '''Hands the message to the background sender so the caller never waits on the network.
+           Pass a coalesce_key (like (channel, parameter)) to let newer values replace older ones
+           that haven't gone out yet.'''
+        if coalesce_key is not None:
+            coalesce_key = (tcp, addr, port, osc_addr, coalesce_key)
+
         if tcp:
-            OSC.send_tcp(osc_addr, addr, string)
+            framing = bpy.context.scene.scene_props.osc_tcp_framing
+            OSCSender.enqueue(OSC.send_tcp, osc_addr, addr, string, framing, coalesce_key=coalesce_key)
         else:
-            OSC.send_udp(osc_addr, addr, port, string)
+            OSCSender.enqueue(OSC.send_udp, osc_addr, addr, port, string, coalesce_key=coalesce_key)
 
 
     def send_udp(osc_addr, addr, port, string):
         if DEBUG: alva_log("osc", f"\nOSC:\n   -Address: {osc_addr}\n   -String: {string}")
-        def pad(data):
-            return data + b"\0" * (4 - (len(data) % 4 or 4))
-
-        if not osc_addr.startswith("/"):
-            osc_addr = "/" + osc_addr
-
-        osc_addr = osc_addr.encode() + b"\0"
-        string = string.encode() + b"\0"
-        tag = ",s".encode()
-
-        message = b"".join(map(pad, (osc_addr, tag, string)))
+        message = encode_message(osc_addr, string)
         try:
             OSC.sock.sendto(message, (addr, port))
 
@@ -99,71 +160,18 @@ class OSC:
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
 
-    def send_tcp(osc_addr, ip, string):
-        """Send a single OSC message to Eos via persistent TCP connection."""
-        global _eos_sock
+    def send_tcp(osc_addr, ip, string, framing=LENGTH):
+        """Queue a single OSC message on the persistent TCP connection. The sender thread writes 
+           everything queued back-to-back once its queue runs dry."""
+        if DEBUG: print(f"[DEBUG] Sending to Eos: {osc_addr} | '{string}'")
+        OSC.connect_eos(ip, framing=framing).send(encode_message(osc_addr, string))
 
-        if _eos_sock is None:
-            OSC.connect_eos(ip)
-        
-        if not osc_addr.startswith("/"):
-            osc_addr = "/" + osc_addr
-
-        # Prepare an OSC message with size prefix
-        def pad(data):
-            return data + b"\x00" * (4 - (len(data) % 4 or 4))
 
-        encoded_addr = osc_addr.encode() + b"\0"
-        encoded_string = string.encode() + b"\0"
-        tag = b",s"
+    def connect_eos(ip, port=None, timeout=TCP_TIMEOUT, framing=LENGTH):
+        return TCPConnections.get(ip, port, framing, timeout)
 
-        message = b"".join(map(pad, (encoded_addr, tag, encoded_string)))
-        message_with_size = struct.pack(">I", len(message)) + message
+    def disconnect_eos():
+        TCPConnections.close_all()
 
-        # Actually send over the persistent socket
-        try:
-            if DEBUG: print(f"[DEBUG] Sending to Eos: {osc_addr} | '{string}'")
-            _eos_sock.sendall(message_with_size)
-
-        except socket.timeout:
-            if DEBUG:
-                print("[DEBUG] Error: send operation timed out.")
-            OSC.disconnect_eos()
-        except (ConnectionResetError, ConnectionRefusedError):
-            if DEBUG:
-                print("[DEBUG] Error: Eos connection reset/refused.")
-            OSC.disconnect_eos()
-        except Exception as e:
-            if DEBUG:
-                print(f"[DEBUG] General error during send: {e}")
-            OSC.disconnect_eos()
-
-        time.sleep(.1)
-
-
-    def connect_eos(ip, port=ETC_EOS_TCP_PORT, timeout=TCP_TIMEOUT):
-        global _eos_sock
-        if _eos_sock is not None:
-            return
-        
-        if DEBUG:
-            print(f"[DEBUG] Connecting to Eos at {ip}:{port} ...")
-        try:
-            _eos_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            _eos_sock.settimeout(timeout)
-            _eos_sock.connect((ip, port))
-            if DEBUG:
-                print("[DEBUG] Eos connection successful!")
-        except Exception as e:
-            if DEBUG:
-                print(f"[DEBUG] Failed to connect: {e}")
-            _eos_sock = None
 
-    def disconnect_eos():
-        global _eos_sock
-        if _eos_sock:
-            try:
-                _eos_sock.close()
-            except:
-                pass
-        _eos_sock = None
\ No newline at end of file
+OSCSender.add_drain_hook(TCPConnections.flush_all)
@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+import itertools
+from collections import OrderedDict
+
+'''
+Sending OSC used to happen right inside whatever called OSC.send_osc_lighting(), which is almost
+always Blender's main thread: a frame change handler, a slider update, an Orb operator. Most of the
+time sendto() returns instantly, so nobody noticed. But when the network hiccups, or when a TCP key
+press has to wait on Eos, the main thread just sits there waiting on the socket, and that means
+the UI freezes and playback stutters.
+
+So now the main thread only ever drops messages into a little waiting line (the "queue") and
+goes right back to what it was doing. One background thread, the sender, takes messages off the
+front of the line and actually puts them on the wire.
+
+Two extra rules keep that line from getting silly:
+
+    1. Coalescing. If a message is still waiting in line and a newer message comes in for the
+       same thing (same destination, same address, same channel/parameter), the older one is
+       thrown out and the newer one goes to the back of the line. Nobody needs to hear "1 at 40",
+       "1 at 41", "1 at 42" if by the time we get around to sending, the answer is already
+       "1 at 43". It has to go to the back, not into the old one's spot, or "1 at 43" could jump
+       ahead of a key press or macro fire that was queued after "1 at 40".
+
+    2. A size limit. If the line ever gets longer than MAX_QUEUED_MESSAGES (say the console went
+       away and TCP is timing out), the oldest message with a coalesce key falls out of line.
+       Old lighting state is the least useful thing to hold on to, and the next value for that
+       channel will say the same thing anyway. Messages without a key are never dropped, since
+       losing a key up or a macro fire could leave the console stuck. If the line is full of
+       nothing but those, it's allowed to grow and we print a warning.
+
+The sender takes everything waiting in line at once, sends it, and then runs its drain hooks. That's how the TCP connections
+know it's a good moment to write everything they've collected in one go (see osc_tcp.py).
+
+Messages without a coalesce key (key presses, bundles, macro commands) never replace each other,
+so key down always arrives before key up. The sender never touches bpy, so callers must look up
+IP addresses and ports before they enqueue.
+'''
+
+DEBUG = False
+
+MAX_QUEUED_MESSAGES = 4096
+STOP_TIMEOUT = 1
+
+UNIQUE = object()  # First part of the made-up key for messages that must never be coalesced or dropped
+
+
+class OSCSender:
+    _pending = OrderedDict()  # {coalesce key: (send function, args)}
+    _condition = threading.Condition()
+    _unique_keys = itertools.count()
+    _drain_hooks = []
+    _thread = None
+    _running = False
+    _warned_full = False
+
+    @classmethod
+    def enqueue(cls, send_function, *args, coalesce_key=None):
+        if coalesce_key is None:
+            coalesce_key = (UNIQUE, next(cls._unique_keys))
+
+        with cls._condition:
+            cls._pending[coalesce_key] = (send_function, args)
+            cls._pending.move_to_end(coalesce_key)
+            if len(cls._pending) > MAX_QUEUED_MESSAGES:
+                cls._drop_oldest_coalescable()
+            cls._ensure_running()
+            cls._condition.notify()
+
+    @classmethod
+    def _drop_oldest_coalescable(cls):
+        '''Call with _condition held. Messages without a coalesce key are never dropped.'''
+        for key in cls._pending:
+            if not (isinstance(key, tuple) and key[0] is UNIQUE):
+                del cls._pending[key]
+                if DEBUG: print(f"OSC sender queue is full. Dropping {key}")
+                return
+
+        if not cls._warned_full:
+            cls._warned_full = True
+            print(f"Sorcerer: More than {MAX_QUEUED_MESSAGES} OSC messages are waiting to be sent. Is the console still there?")
+
+    @classmethod
+    def _ensure_running(cls):
+        '''
+        Call with _condition held. The sender clears _thread itself, under the same lock, right
+        before it ends. So if _thread is set, that thread will see this message, even if stop()
+        gave up waiting on it while it was stuck in a TCP send. Only one sender ever writes to
+        the TCP connections.
+        '''
+        cls._running = True
+        if cls._thread is None:
+            cls._thread = threading.Thread(target=cls._run, name="Sorcerer OSC sender", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls):
+        while True:
+            with cls._condition:
+                while cls._running and not cls._pending:
+                    cls._condition.wait()
+                jobs = list(cls._pending.values())
+                cls._pending.clear()
+                cls._warned_full = False
+
+            if not jobs:
+                cls._run_drain_hooks()
+                with cls._condition:
+                    if cls._running or cls._pending:  # Somebody enqueued while the hooks ran
+                        continue
+                    cls._thread = None
+                return
+
+            for send_function, args in jobs:
+                try:
+                    send_function(*args)
+                except Exception:
+                    import traceback
+                    traceback.print_exc()
+
+            cls._run_drain_hooks()
+
+    @classmethod
+    def _run_drain_hooks(cls):
+        for hook in cls._drain_hooks:
+            try:
+                hook()
+            except Exception:
+                import traceback
+                traceback.print_exc()
+
+
+    @classmethod
+    def add_drain_hook(cls, hook):
+        if hook not in cls._drain_hooks:
+            cls._drain_hooks.append(hook)
+
+
+    @classmethod
+    def pending_count(cls):
+        with cls._condition:
+            return len(cls._pending)
+
+    @classmethod
+    def stop(cls):
+        '''Sends whatever is still waiting (for up to STOP_TIMEOUT seconds), then lets the thread end.'''
+        with cls._condition:
+            cls._running = False
+            cls._condition.notify()
+            thread = cls._thread
+        if thread is not None:
+            thread.join(timeout=STOP_TIMEOUT)  # If it's still stuck after this, it keeps _thread until it ends
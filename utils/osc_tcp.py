@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import socket
+import select
+import struct
+import time
+
+'''
+TCP is how we press keys and send Orb commands to Eos, because unlike UDP, TCP promises that
+every message arrives, and arrives in order. But TCP is a stream, not a stack of separate
+packets, so the console needs some way to tell where one OSC message ends and the next one
+begins. That's called "framing", and there are two ways to do it:
+
+    1. LENGTH (OSC 1.0). Put the message's size in 4 bytes in front of it. Eos listens for
+       this on port 3032.
+
+    2. SLIP (OSC 1.1). Put a special END byte (0xC0) before and after the message, and if the
+       message itself happens to contain END or ESC bytes, swap them for two-byte escape codes
+       so they can't be mistaken for the real END. Eos listens for this on port 3037.
+
+We used to send one message, block until it was written, and then sleep for a tenth of a second
+no matter what. With a couple thousand frames in a qmeo build, that's minutes of doing nothing.
+
+Now each connection keeps a little outbox. send() just frames the message and adds it to the
+outbox, and flush() writes the whole outbox with one sendall() call, back to back. TCP itself
+is the flow control: if Eos is busy and stops reading, its receive window fills up and sendall()
+simply waits (up to the timeout) until there's room again. No guessing with sleeps.
+
+If the connection breaks, flush() reconnects and tries the outbox one more time. If the console
+is gone altogether, we stop hammering it for RECONNECT_INTERVAL seconds instead of waiting out a
+full connect timeout for every single message.
+
+This all runs on the OSC sender thread (see osc_sender.py), never on Blender's main thread.
+'''
+
+DEBUG = False
+
+LENGTH = 'LENGTH'
+SLIP = 'SLIP'
+
+ETC_EOS_TCP_PORT = 3032
+ETC_EOS_SLIP_PORT = 3037
+TCP_TIMEOUT = 5 # Not sure why this has to be 5, but setting it to 1 or below seems to break Eos. Extremely fickle on ETC's end.
+RECONNECT_INTERVAL = 1
+MAX_OUTBOX_BYTES = 64 * 1024
+
+SLIP_END = b"\xc0"
+SLIP_ESC = b"\xdb"
+SLIP_ESC_END = b"\xdb\xdc"
+SLIP_ESC_ESC = b"\xdb\xdd"
+
+
+def frame_length_prefixed(message):
+    return struct.pack(">I", len(message)) + message
+
+
+def frame_slip(message):
+    '''OSC 1.1 uses "double END" SLIP: an END byte on both sides of the escaped message.'''
+    escaped = message.replace(SLIP_ESC, SLIP_ESC_ESC).replace(SLIP_END, SLIP_ESC_END)
+    return SLIP_END + escaped + SLIP_END
+
+
+FRAMERS = {
+    LENGTH: frame_length_prefixed,
+    SLIP: frame_slip
+}
+
+DEFAULT_PORTS = {
+    LENGTH: ETC_EOS_TCP_PORT,
+    SLIP: ETC_EOS_SLIP_PORT
+}
+
+
+class TCPConnection:
+    def __init__(self, ip, port, framing=LENGTH, timeout=TCP_TIMEOUT):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self._frame = FRAMERS[framing]
+        self._sock = None
+        self._outbox = bytearray()
+        self._next_connect_attempt = 0
+
+    @property
+    def is_connected(self):
+        return self._sock is not None
+
+
+    def send(self, message):
+        self._outbox += self._frame(message)
+        if len(self._outbox) >= MAX_OUTBOX_BYTES:
+            self.flush()
+
+    def flush(self):
+        if not self._outbox:
+            return
+
+        for attempt in range(2):
+            if not self.connect():
+                break
+            try:
+                self._discard_incoming()
+                self._sock.sendall(self._outbox)
+                self._outbox.clear()
+                return
+            except (socket.timeout, ConnectionError, OSError) as e:
+                if DEBUG: print(f"[DEBUG] TCP send to {self.ip}:{self.port} failed (attempt {attempt + 1}): {e}")
+                self.disconnect()
+
+        if DEBUG: print(f"[DEBUG] Dropping {len(self._outbox)} bytes for {self.ip}:{self.port}")
+        self._outbox.clear()
+
+
+    def connect(self):
+        if self._sock is not None:
+            return True
+
+        if time.monotonic() < self._next_connect_attempt:
+            return False
+
+        if DEBUG: print(f"[DEBUG] Connecting to {self.ip}:{self.port} ...")
+        try:
+            sock = socket.create_connection((self.ip, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sock = sock
+            if DEBUG: print("[DEBUG] TCP connection successful!")
+            return True
+        except OSError as e:
+            if DEBUG: print(f"[DEBUG] Failed to connect: {e}")
+            self._next_connect_attempt = time.monotonic() + RECONNECT_INTERVAL
+            return False
+
+    def disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+
+
+    def _discard_incoming(self):
+        '''Eos talks back over the same socket. We don't use what it says (yet), but if we never
+           read it, its send buffer fills up and it can stop reading from us.'''
+        while True:
+            readable, _, _ = select.select([self._sock], [], [], 0)
+            if not readable:
+                return
+            if not self._sock.recv(65536):
+                raise ConnectionResetError("Console closed the connection.")
+
+
+class TCPConnections:
+    '''One connection per (ip, port, framing), reused for as long as Sorcerer is running.'''
+    _connections = {}
+
+    @classmethod
+    def get(cls, ip, port=None, framing=LENGTH, timeout=TCP_TIMEOUT):
+        if port is None:
+            port = DEFAULT_PORTS[framing]
+        key = (ip, port, framing)
+        if key not in cls._connections:
+            cls._connections[key] = TCPConnection(ip, port, framing, timeout)
+        return cls._connections[key]
+
+    @classmethod
+    def flush_all(cls):
+        for connection in list(cls._connections.values()):
+            connection.flush()
+
+    @classmethod
+    def close_all(cls):
+        for connection in list(cls._connections.values()):
+            connection.flush()
+            connection.disconnect()
+        cls._connections.clear()
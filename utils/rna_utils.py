@@ -3,6 +3,9 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import re
+from functools import lru_cache
+
+from .channel_set import ChannelSet
 
 
 def register_properties(cls, *properties, register=True):
@@ -15,12 +18,49 @@ def register_properties(cls, *properties, register=True):
                 delattr(cls, prop_name)
 
 
-def parse_channels(input_string, remove=False):
+VERSIONS_OF_THROUGH = (
+    "through", "thru", "-", "tthru", "throu", "--", "por", "thr", 
+    "to", "until", "up to", "till", "over"
+)
+VERSIONS_OF_NOT = (
+    "not", "minus", "except", "excluding", "casting", "aside", 
+    "without", "leave", "omit", "remove", "other", "than", "delete",
+    "deleting", "take"
+)
+VERSIONS_OF_ADD = (
+    "add", "adding", "including", "include", 
+    "save", "preserve", "plus", "with", "addition", "+", "want",
+    "do"
+)
+VERSIONS_OF_KEEP = ("keep", "keeping")
+KEYWORDS_EVENS = {"even", "evens"}
+KEYWORDS_ODDS = {"odd", "odds"}
+
+MAX_COMPILED_SELECTIONS = 1024
+
+
+class ChannelSelection:
     '''
-    Parses input to extract specified ranges, exclusions, additions, and filters for evens/odds.
-    Examples:
-    "I want 1-10 evens but I don't want 4-7 but keep 5" => [2, 6, 8, 10]
-    "I want odds from 1-10" => [1, 3, 5, 7, 9]
+    What compile_channels() made out of one selection string. channels is what the user wants,
+    exclusions is everything they said not to want (the group editor removes those). Both are
+    ChannelSets. If the text couldn't be understood, error says why and both sets are empty.
+
+    These are shared by everyone who typed the same text, so nothing should change them.
+    '''
+    __slots__ = ("channels", "exclusions", "error")
+
+    def __init__(self, channels, exclusions, error=None):
+        self.channels = channels
+        self.exclusions = exclusions
+        self.error = error
+
+
+@lru_cache(maxsize=MAX_COMPILED_SELECTIONS)
+def compile_channels(input_string):
+    '''
+    Parses a channel selection once and remembers it. The rules are the same ones parse_channels()
+    always used, but ranges, exclusions, and evens/odds are all done with ChannelSets, so 
+    "1 thru 4000 except evens" is a couple of ranges instead of a 4,000 item list.
     '''
     try:
         input_string = replace_words_with_numbers(input_string)
@@ -34,27 +74,10 @@ def parse_channels(input_string, remove=False):
         
         # Split by commas and whitespace
         tokens = re.split(r'[,\s]+', formatted_input)
-        
-        versions_of_through = (
-            "through", "thru", "-", "tthru", "throu", "--", "por", "thr", 
-            "to", "until", "up to", "till", "over"
-        )
-        versions_of_not = (
-            "not", "minus", "except", "excluding", "casting", "aside", 
-            "without", "leave", "omit", "remove", "other", "than", "delete",
-            "deleting", "take"
-        )
-        versions_of_add = (
-            "add", "adding", "including", "include", 
-            "save", "preserve", "plus", "with", "addition", "+", "want",
-            "do"
-        )
-        keywords_evens = {"even", "evens"}
-        keywords_odds = {"odd", "odds"}
-
-        channels = []
-        exclusions = []
-        additions = []
+
+        channels = ChannelSet()
+        exclusions = ChannelSet()
+        additions = ChannelSet()
         i = 0
         exclude_mode = False
         add_mode = False
@@ -63,71 +86,75 @@ def parse_channels(input_string, remove=False):
         
         while i < len(tokens):
             token = tokens[i]
+            found = None  # Channels this token names, if any
             
-            if token in versions_of_add:
+            if token in VERSIONS_OF_ADD:
                 exclude_mode = False
                 add_mode = False
-            elif token in ["keep", "keeping"]:
+            elif token in VERSIONS_OF_KEEP:
                 exclude_mode = False
                 add_mode = True
-            elif token in versions_of_not:
+            elif token in VERSIONS_OF_NOT:
                 exclude_mode = True
                 add_mode = False
-            elif token in versions_of_through and i > 0 and i < len(tokens) - 1:
-                start = int(tokens[i-1])
-                end = int(tokens[i+1])
-                step = 1 if start < end else -1
-                range_list = list(range(start, end + step, step))
+            elif token in VERSIONS_OF_THROUGH and i > 0 and i < len(tokens) - 1:
+                found = ChannelSet.from_range(int(tokens[i-1]), int(tokens[i+1]))
                 if filter_evens:
-                    range_list = [n for n in range_list if n % 2 == 0]
+                    found = found.evens()
                 elif filter_odds:
-                    range_list = [n for n in range_list if n % 2 != 0]
-                if exclude_mode:
-                    exclusions.extend(range_list)
-                elif add_mode:
-                    additions.extend(range_list)
-                else:
-                    channels.extend(range_list)
+                    found = found.odds()
                 i += 1  # Skip the end token of the range
             elif token.isdigit():
-                num = int(token)
-                if exclude_mode:
-                    exclusions.append(num)
-                elif add_mode:
-                    additions.append(num)
-                else:
-                    channels.append(num)
-            elif token in keywords_evens:
+                found = ChannelSet.from_range(int(token), int(token))
+            elif token in KEYWORDS_EVENS:
                 filter_evens = True
                 filter_odds = False
-            elif token in keywords_odds:
+            elif token in KEYWORDS_ODDS:
                 filter_odds = True
                 filter_evens = False
+
+            if found is not None:
+                if exclude_mode:
+                    exclusions = exclusions.union(found)
+                elif add_mode:
+                    additions = additions.union(found)
+                else:
+                    channels = channels.union(found)
             i += 1
         
-        # Apply exclusions
-        channels = [ch for ch in channels if ch not in exclusions]
-        
-        # Apply additions
-        channels.extend(additions)
-        
-        # Deduplicate, sort, and apply final filters
-        channels = list(set(channels))
-        channels.sort()
+        # Apply exclusions, then additions, then the final filters
+        channels = channels.difference(exclusions).union(additions)
         if filter_evens:
-            channels = [ch for ch in channels if ch % 2 == 0]
+            channels = channels.evens()
         elif filter_odds:
-            channels = [ch for ch in channels if ch % 2 != 0]
-        
-        if not remove:
-            return channels
-        else:
-            return channels, exclusions
+            channels = channels.odds()
+
+        return ChannelSelection(channels, exclusions)
     
     except Exception as e:
         print(f"An error has occurred within parse_channels: {e}")
+        return ChannelSelection(ChannelSet(), ChannelSet(), error=str(e))
+
+
+def parse_channels(input_string, remove=False):
+    '''
+    Parses input to extract specified ranges, exclusions, additions, and filters for evens/odds.
+    Examples:
+    "I want 1-10 evens but I don't want 4-7 but keep 5" => [2, 6, 8, 10]
+    "I want odds from 1-10" => [1, 3, 5, 7, 9]
+
+    Returns a fresh list every time. Code that doesn't need a list should use compile_channels().
+    '''
+    selection = compile_channels(input_string)
+    if selection.error is not None:
         return None
 
+    channels = selection.channels.to_list()
+    if not remove:
+        return channels
+    else:
+        return channels, selection.exclusions.to_list()
+
 
 def parse_mixer_channels(input_string):
     try:
@@ -48,7 +48,7 @@ class StripMapper:
         self.event_manager = event_manager
         self.orb = orb
         self.mapping = defaultdict(list)
-        self.sequences = scene.sequence_editor.sequences
+        self.scene = scene
         self.strip_classes = self.find_registered_strip_classes()
 
     def find_registered_strip_classes(self):
@@ -77,7 +77,8 @@ class StripMapper:
                 (self.orb and 'ORB' in class_options))
 
     def filter_strips(self, strip_type):
-        return [strip for strip in self.sequences if strip.type == VALID_STRIP_TYPE and strip.my_settings.motif_type_enum == strip_type and not strip.mute]
+        from .strip_index import StripIndex
+        return StripIndex.strips_of_motif_type(self.scene, strip_type)
 
     def process_a_side_of_the_strip(self, StripClass, strip, side):
         '''Processes a single side (start or end) of the given strip.'''
@@ -7,17 +7,20 @@ from bpy.props import IntProperty, EnumProperty, FloatVectorProperty
 from bpy.types import Object, ColorSequence, Light, Node
 
 from ..makesrna.property_groups import MixerParameters
+from ..cpv.publish.compile_templates import compile_console_templates
 
 REGISTERED_LIGHTING_CONSOLES = {}
 REGISTERED_STRIPS = {}
 REGISTERED_PARAMETERS = {}
 REGISTERED_CONTROLLERS = {}
+COMPILED_ARGUMENT_TEMPLATES = {}  # {(console as_idname, property_name): ArgumentTemplate}
 
 
 class SpyDataStructure:
     class types:
         class LightingConsole:
             rounding_points = 0
+            supports_osc_bundles = False  # Lets the event manager send a whole frame as a few #bundle packets
             
             def format_value(value):
                 return str(value)
@@ -63,6 +66,8 @@ class SpyDataStructure:
 
 
         class FixtureParameter:
+            deadband = 0  # Changes this small (after rounding) aren't resent. See cpv/publish/console_mirror.py
+
             def draw_row(self, context):
                 pass
 
@@ -85,6 +90,7 @@ class SpyDataStructure:
                 if cls.as_idname in REGISTERED_LIGHTING_CONSOLES:
                     del REGISTERED_LIGHTING_CONSOLES[cls.as_idname]
                 REGISTERED_LIGHTING_CONSOLES[cls.as_idname] = cls
+                register_argument_templates(cls)
 
             elif cls_id == SpyDataStructure.types.SequencerStrip:
                 if cls.as_idname in REGISTERED_STRIPS:
@@ -171,6 +177,7 @@ class SpyDataStructure:
         def as_unregister_class(cls):
             if cls.as_idname in REGISTERED_LIGHTING_CONSOLES:
                 del REGISTERED_LIGHTING_CONSOLES[cls.as_idname]
+                unregister_argument_templates(cls)
             elif cls.as_idname in REGISTERED_STRIPS:
                 del REGISTERED_STRIPS[cls.as_idname]
             elif cls.as_idname in REGISTERED_PARAMETERS:
@@ -181,6 +188,17 @@ class SpyDataStructure:
                 print(f"\nWARNING: Class '{cls.__name__}' with ID '{cls.as_idname}' was not found in registration.")
 
 
+def register_argument_templates(cls):
+    unregister_argument_templates(cls)
+    for property_name, argument_template in compile_console_templates(cls).items():
+        COMPILED_ARGUMENT_TEMPLATES[(cls.as_idname, property_name)] = argument_template
+
+
+def unregister_argument_templates(cls):
+    for key in [key for key in COMPILED_ARGUMENT_TEMPLATES if key[0] == cls.as_idname]:
+        del COMPILED_ARGUMENT_TEMPLATES[key]
+
+
 def register_bpy_property(cls):
     as_idname = getattr(cls, 'as_idname', None)
     name = getattr(cls, 'as_label', "")
@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2025 Alva Theaters
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bisect
+
+from .sequencer_mapping import VALID_STRIP_TYPE
+
+'''
+Three different things keep asking the sequencer the same kinds of questions:
+
+    1. Livemap (every frame change while not playing): "Which cue strip started most recently?"
+    2. Timecode sync (play, stop, scrub): "Which sound strip is playing right now?"
+    3. StripMapper (play, Orb): "Which strips are macro strips? Cue strips? Flash strips?"
+
+Each of those used to look at every strip in the sequencer, every time. Shows can have thousands
+of cue and macro strips, so scrubbing got visibly laggy.
+
+The answers only change when the strips themselves change, so now we sort the strips out once
+and keep them:
+
+    - Cue strips for livemap, sorted by start frame, with a matching list of just the start
+      frames. "Most recent cue at frame 500" is then a binary search (bisect) in that list,
+      which takes about 12 steps for 4,000 cues instead of 4,000.
+    - Sound strips, the only ones timecode sync cares about. There are usually only a handful.
+    - Color strips, grouped by motif type ({'option_macro': [...], 'option_cue': [...]}), so
+      StripMapper gets each strip class's strips with one dictionary lookup.
+
+Instead of patching the index one strip at a time, we throw it away (invalidate) when a strip
+changes in a way it cares about, and build it again the next time somebody asks:
+
+    - The motif type updater (a strip became a different kind of strip) and the cue number
+      updater (a strip became or stopped being a livemap cue).
+    - Strips were moved, trimmed, muted, added, or deleted. Blender has no updater for those,
+      only a depsgraph update to the whole scene, and the scene gets updated for almost anything
+      (including the add-on writing its own scene properties). So on a scene update the event
+      manager calls invalidate_if_strips_changed(), which compares a cheap signature of every
+      strip, (strip, frame_start, frame_final_end, mute), with the last one it saw. That's a few
+      reads per strip, with no sorting and no digging into strip settings, and the index is only
+      rebuilt when the strips really changed.
+    - Undo, redo, and file load.
+    - The number of strips changed, or a different scene is asking.
+
+Like the other indexes, it holds on to strips, so everything in it is only trusted until the
+next invalidate.
+'''
+
+CUE = 'option_cue'
+SOUND = 'SOUND'
+
+
+class StripIndex:
+    _scene_name = None
+    _strip_count = -1
+    _is_valid = False
+    _cue_strips = []  # Livemap cues, sorted by frame_start. Ties keep sequencer order.
+    _cue_starts = []
+    _sound_strips = []  # (frame_start, frame_final_end, strip), in sequencer order
+    _strips_by_motif = {}  # {motif_type_enum: [strips in sequencer order]}
+    _strip_signature = None  # What the strips looked like at the last invalidate_if_strips_changed()
+
+    @classmethod
+    def find_livemap_cue(cls, scene, current_frame):
+        '''The unmuted cue strip with the latest start at or before current_frame, or None.'''
+        cls._ensure_valid(scene)
+        row = bisect.bisect_right(cls._cue_starts, current_frame)
+        if row == 0:
+            return None
+        first_of_ties = bisect.bisect_left(cls._cue_starts, cls._cue_starts[row - 1])  # First in sequencer order wins ties
+        return cls._cue_strips[first_of_ties]
+
+    @classmethod
+    def find_clock_strips(cls, scene, current_frame):
+        '''Returns (last sound strip with a lighting clock, last sound strip with a sound cue) under current_frame.'''
+        cls._ensure_valid(scene)
+        lighting_clock_strip = None
+        audio_strip = None
+        for frame_start, frame_final_end, strip in cls._sound_strips:
+            if frame_start <= current_frame < frame_final_end:
+                if getattr(strip, 'int_event_list', 0) != 0:
+                    lighting_clock_strip = strip
+                if getattr(strip, 'int_sound_cue', 0) != 0:
+                    audio_strip = strip
+        return lighting_clock_strip, audio_strip
+
+    @classmethod
+    def strips_of_motif_type(cls, scene, motif_type):
+        '''Unmuted color strips of one motif type, in sequencer order.'''
+        cls._ensure_valid(scene)
+        return cls._strips_by_motif.get(motif_type, [])
+
+
+    @classmethod
+    def _ensure_valid(cls, scene):
+        if (not cls._is_valid or
+            cls._scene_name != scene.name or
+            cls._strip_count != len(scene.sequence_editor.sequences)):
+            cls.rebuild(scene)
+
+    @classmethod
+    def rebuild(cls, scene):
+        sequences = scene.sequence_editor.sequences
+        cue_strips = []
+        sound_strips = []
+        strips_by_motif = {}
+
+        for strip in sequences:
+            if strip.mute:
+                continue
+
+            if strip.type == SOUND:
+                sound_strips.append((strip.frame_start, strip.frame_final_end, strip))
+
+            motif_type = strip.my_settings.motif_type_enum
+            if strip.type == VALID_STRIP_TYPE:
+                strips_by_motif.setdefault(motif_type, []).append(strip)
+            if motif_type == CUE and getattr(strip, 'eos_cue_number', 0) != 0:
+                cue_strips.append(strip)
+
+        cue_strips.sort(key=lambda strip: strip.frame_start)  # sort() is stable, so ties stay in sequencer order
+
+        cls._cue_strips = cue_strips
+        cls._cue_starts = [strip.frame_start for strip in cue_strips]
+        cls._sound_strips = sound_strips
+        cls._strips_by_motif = strips_by_motif
+        cls._scene_name = scene.name
+        cls._strip_count = len(sequences)
+        cls._is_valid = True
+
+    @classmethod
+    def invalidate_if_strips_changed(cls, scene):
+        '''Returns True if any strip was moved, trimmed, muted, added, or deleted since the last call.'''
+        signature = cls._find_signature(scene)
+        if signature == cls._strip_signature:
+            return False
+        cls._strip_signature = signature
+        cls.invalidate()
+        return True
+
+    @staticmethod
+    def _find_signature(scene):
+        sequence_editor = scene.sequence_editor
+        if sequence_editor is None:
+            return (scene.name,)
+        return (scene.name,) + tuple(
+            (strip.as_pointer(), strip.frame_start, strip.frame_final_end, strip.mute)
+            for strip in sequence_editor.sequences_all
+        )
+
+    @classmethod
+    def invalidate(cls):
+        cls._is_valid = False
+        cls._cue_strips = []
+        cls._cue_starts = []
+        cls._sound_strips = []
+        cls._strips_by_motif = {}